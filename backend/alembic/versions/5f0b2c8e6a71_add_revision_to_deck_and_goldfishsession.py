@@ -0,0 +1,36 @@
+"""Add revision to deck and goldfishsession
+
+Revision ID: 5f0b2c8e6a71
+Revises: c41e7a9d2b05
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0b2c8e6a71'
+down_revision: Union[str, Sequence[str], None] = 'c41e7a9d2b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'deck',
+        sa.Column('revision', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.add_column(
+        'goldfishsession',
+        sa.Column('revision', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('goldfishsession', 'revision')
+    op.drop_column('deck', 'revision')
@@ -0,0 +1,32 @@
+"""Add content_hash to card
+
+Revision ID: 9a3d7c1e4b28
+Revises: 5f0b2c8e6a71
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3d7c1e4b28'
+down_revision: Union[str, Sequence[str], None] = '5f0b2c8e6a71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'card',
+        sa.Column('content_hash', sqlmodel.sql.sqltypes.AutoString(length=40), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('card', 'content_hash')
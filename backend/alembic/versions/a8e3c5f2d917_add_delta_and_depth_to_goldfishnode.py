@@ -0,0 +1,36 @@
+"""Add delta and depth to goldfishnode
+
+Revision ID: a8e3c5f2d917
+Revises: f3a9d1b7c524
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e3c5f2d917'
+down_revision: Union[str, Sequence[str], None] = 'f3a9d1b7c524'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing nodes all hold full snapshots, i.e. are keyframes, so they
+    # reconstruct correctly whatever their depth; 0 is fine for them.
+    op.add_column('goldfishnode', sa.Column('delta', sa.JSON(), nullable=True))
+    op.add_column(
+        'goldfishnode',
+        sa.Column('depth', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Delta nodes would lose their state; materialize them before downgrading.
+    op.drop_column('goldfishnode', 'depth')
+    op.drop_column('goldfishnode', 'delta')
@@ -0,0 +1,45 @@
+"""Add color_identity and mana_value to card, search indexes
+
+Revision ID: b7c2e9f1d3a6
+Revises: e2b8f4a61c93
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c2e9f1d3a6'
+down_revision: Union[str, Sequence[str], None] = 'e2b8f4a61c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('card', sa.Column('color_identity', sa.JSON(), nullable=True))
+    op.add_column('card', sa.Column('mana_value', sa.Float(), nullable=True))
+    op.create_index(op.f('ix_card_mana_value'), 'card', ['mana_value'], unique=False)
+    # Local Scryfall-syntax search (app/services/card_query.py) compiles t:
+    # and o: to ILIKE '%text%', same as the name lookup that
+    # 34f74e54c976's trigram index backs. Existing rows pick the new
+    # columns up on the next bulk ingestion: card_row now includes them, so
+    # every stored content hash differs and each row is rewritten once.
+    op.execute(
+        "CREATE INDEX ix_card_type_line_trgm ON card USING gin (type_line gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_card_oracle_text_trgm ON card USING gin (oracle_text gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_card_oracle_text_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_card_type_line_trgm")
+    op.drop_index(op.f('ix_card_mana_value'), table_name='card')
+    op.drop_column('card', 'mana_value')
+    op.drop_column('card', 'color_identity')
@@ -0,0 +1,30 @@
+"""Add card_hashes to deckstats
+
+Revision ID: b9d4e7a1c352
+Revises: c6f1e8a4b239
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d4e7a1c352'
+down_revision: Union[str, Sequence[str], None] = 'c6f1e8a4b239'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing snapshots keep NULL, which marks them for a rebuild on their
+    # next read or edit.
+    op.add_column('deckstats', sa.Column('card_hashes', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('deckstats', 'card_hashes')
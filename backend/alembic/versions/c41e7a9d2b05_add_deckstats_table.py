@@ -0,0 +1,36 @@
+"""Add deckstats table
+
+Revision ID: c41e7a9d2b05
+Revises: 1d1448d72c58
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7a9d2b05'
+down_revision: Union[str, Sequence[str], None] = '1d1448d72c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No backfill: GET /decks/{id}/stats builds a missing snapshot on first
+    # request, so existing decks pick one up lazily.
+    op.create_table('deckstats',
+    sa.Column('deck_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('totals', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['deck_id'], ['deck.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('deck_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('deckstats')
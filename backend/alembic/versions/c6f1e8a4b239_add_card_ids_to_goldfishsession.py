@@ -0,0 +1,30 @@
+"""Add card_ids to goldfishsession
+
+Revision ID: c6f1e8a4b239
+Revises: a8e3c5f2d917
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f1e8a4b239'
+down_revision: Union[str, Sequence[str], None] = 'a8e3c5f2d917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing sessions keep NULL: their nodes store card ids, which the
+    # decoder passes through unchanged.
+    op.add_column('goldfishsession', sa.Column('card_ids', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('goldfishsession', 'card_ids')
@@ -0,0 +1,59 @@
+"""Add per-format legality bitmasks to card
+
+Revision ID: d4a8c6e2f915
+Revises: b7c2e9f1d3a6
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a8c6e2f915'
+down_revision: Union[str, Sequence[str], None] = 'b7c2e9f1d3a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app/core/legality.py's FORMATS at the time of this
+# migration: bit i belongs to FORMATS[i].
+FORMATS = (
+    "standard", "future", "historic", "timeless", "gladiator", "pioneer",
+    "explorer", "modern", "legacy", "pauper", "vintage", "penny", "commander",
+    "oathbreaker", "standardbrawl", "brawl", "alchemy", "paupercommander",
+    "duel", "oldschool", "premodern", "predh",
+)
+
+
+def _mask_sql(statuses: str) -> str:
+    return " + ".join(
+        f"(CASE WHEN legalities->>'{fmt}' IN ({statuses}) THEN {1 << i} ELSE 0 END)"
+        for i, fmt in enumerate(FORMATS)
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in ('legal_mask', 'restricted_mask', 'banned_mask'):
+        op.add_column(
+            'card',
+            sa.Column(column, sa.BigInteger(), nullable=False, server_default='0'),
+        )
+    # Backfill from the JSON so format checks are right before the next
+    # ingestion rewrites every row with card_row's own masks.
+    legal = _mask_sql("'legal', 'restricted'")
+    restricted = _mask_sql("'restricted'")
+    banned = _mask_sql("'banned'")
+    op.execute(
+        f"UPDATE card SET legal_mask = {legal}, restricted_mask = {restricted}, "
+        f"banned_mask = {banned} WHERE legalities IS NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('card', 'banned_mask')
+    op.drop_column('card', 'restricted_mask')
+    op.drop_column('card', 'legal_mask')
@@ -0,0 +1,31 @@
+"""Add cards_version to deck
+
+Revision ID: e3a7f5c1d806
+Revises: b9d4e7a1c352
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a7f5c1d806'
+down_revision: Union[str, Sequence[str], None] = 'b9d4e7a1c352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'deck',
+        sa.Column('cards_version', sa.Integer(), server_default='0', nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('deck', 'cards_version')
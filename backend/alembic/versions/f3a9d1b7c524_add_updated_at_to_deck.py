@@ -0,0 +1,43 @@
+"""Add updated_at to deck
+
+Revision ID: f3a9d1b7c524
+Revises: d4a8c6e2f915
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9d1b7c524'
+down_revision: Union[str, Sequence[str], None] = 'd4a8c6e2f915'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing decks get the migration time; the server default only
+    # backfills them, the app always sets the column itself.
+    op.add_column(
+        'deck',
+        sa.Column(
+            'updated_at',
+            sa.DateTime(),
+            server_default=sa.text("(now() at time zone 'utc')"),
+            nullable=False,
+        ),
+    )
+    op.alter_column('deck', 'updated_at', server_default=None)
+    op.create_index(
+        'ix_deck_user_id_updated_at', 'deck', ['user_id', 'updated_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_deck_user_id_updated_at', table_name='deck')
+    op.drop_column('deck', 'updated_at')
@@ -1,17 +1,36 @@
 import asyncio
-import gzip
 import json
-from typing import Any, Dict, List
+import multiprocessing
+import os
+import sys
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
 import httpx
-from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import col
 
 from app.core.db import SessionLocal
 from app.core.logging import logger
-from app.models.card import Card
-from app.services.scryfall import resolve_card_fields
+from app.services.card_store import (
+    CardDiff,
+    card_row,
+    diff_card_rows,
+    upsert_card_rows,
+)
 
 BULK_DATA_URL = "https://api.scryfall.com/bulk-data"
 
@@ -35,92 +54,349 @@ async def fetch_bulk_data_uri(
     raise ValueError(f"No {bulk_type!r} bulk-data entry found")
 
 
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+async def iter_bulk_lines(
+    client: httpx.AsyncClient, download_uri: str
+) -> AsyncIterator[bytes]:
+    """
+    Streams a gzipped-JSONL Scryfall bulk-data file one raw JSON line at a
+    time: network chunks are gunzipped incrementally and split on newlines
+    as they arrive, so memory holds one chunk plus one partial line rather
+    than the whole file (the `all_cards` file is several GB uncompressed).
+    If the body turns out not to be gzip — e.g. a proxy already decoded it
+    via Content-Encoding — the bytes are passed through as-is. Lines are
+    left undecoded so parsing can happen off the event loop (see
+    ingest_bulk_stream).
+    """
+    async with client.stream("GET", download_uri) as response:
+        response.raise_for_status()
+        decompressor = None
+        pending = b""
+        async for chunk in response.aiter_bytes():
+            if decompressor is None:
+                decompressor = (
+                    zlib.decompressobj(16 + zlib.MAX_WBITS)
+                    if chunk.startswith(_GZIP_MAGIC)
+                    else False
+                )
+            pending += decompressor.decompress(chunk) if decompressor else chunk
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if decompressor:
+            pending += decompressor.flush()
+        for line in pending.split(b"\n"):
+            if line.strip():
+                yield line
+
+
+async def iter_bulk_cards(
+    client: httpx.AsyncClient, download_uri: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """iter_bulk_lines, decoded: one Scryfall card object at a time."""
+    async for line in iter_bulk_lines(client, download_uri):
+        yield json.loads(line)
+
+
 async def download_bulk_cards(
     client: httpx.AsyncClient, download_uri: str
 ) -> List[Dict[str, Any]]:
-    """Downloads and parses a gzipped-JSONL Scryfall bulk-data file (one print per line)."""
-    response = await client.get(download_uri)
-    response.raise_for_status()
-    decompressed = gzip.decompress(response.content)
-    return [json.loads(line) for line in decompressed.splitlines() if line]
-
-
-def _card_row(card_data: Dict[str, Any]) -> Dict[str, Any]:
-    # Multi-faced cards (transform/modal-DFC/reversible/art-series) don't
-    # always carry top-level name/type_line/image_uris — see
-    # `resolve_card_fields`'s docstring for the live-API-confirmed cases.
-    fields = resolve_card_fields(card_data)
-    return {
-        "id": card_data["id"],
-        "name": fields["name"],
-        "mana_cost": card_data.get("mana_cost"),
-        "type_line": fields["type_line"],
-        "oracle_text": card_data.get("oracle_text"),
-        "colors": card_data.get("colors"),
-        "produced_mana": card_data.get("produced_mana"),
-        "image_uris": fields["image_uris"],
-        "legalities": card_data.get("legalities"),
-        "card_faces": fields["card_faces"],
-    }
+    """
+    Downloads and parses a whole bulk-data file into a list (one print per
+    entry). Convenient for small files and tests; ingestion itself uses
+    iter_bulk_cards through ingest_bulk_stream so it never holds the file.
+    """
+    return [card async for card in iter_bulk_cards(client, download_uri)]
+
+
+# Kept under its old name for existing imports; the mapping itself now
+# lives in app/services/card_store.py alongside the bulk upsert.
+_card_row = card_row
 
 
 async def upsert_cards(
     session: AsyncSession, cards: List[Dict[str, Any]], batch_size: int = 1000
 ) -> int:
     """
-    Upserts card rows in batches. `sync_cards`' per-row select-then-update is
-    fine for a handful of deck cards but far too slow for a ~30k+ row bulk
-    file, so this splits each batch into "already exists" (bulk UPDATE, one
-    executemany round trip) vs. "new" (bulk INSERT via add_all) instead of
-    one round trip per row. Plain ORM update/insert rather than a
-    dialect-specific ON CONFLICT upsert so this stays testable against the
-    SQLite test engine, not just Postgres.
+    Upserts a bulk file's card objects through the shared card store
+    (see upsert_card_rows), committing after every batch so a ~30k+ row
+    ingestion never holds one giant transaction open.
     """
-    rows = [_card_row(c) for c in cards if c.get("id")]
+    rows = [card_row(c) for c in cards if c.get("id")]
+    return await upsert_card_rows(session, rows, batch_size=batch_size, commit=True)
+
+
+# Cap on how many card names each report list keeps; counts stay exact.
+_REPORT_SAMPLE_SIZE = 100
+# Log a progress line every this many written batches.
+_PROGRESS_EVERY = 20
 
-    for i in range(0, len(rows), batch_size):
-        batch = rows[i : i + batch_size]
-        batch_ids = [row["id"] for row in batch]
 
-        result = await session.execute(
-            select(Card.id).where(col(Card.id).in_(batch_ids))
+@dataclass
+class IngestionReport:
+    """
+    What one ingestion pass did. `new`/`changed`/`unchanged` partition every
+    card seen; `oracle_changed` and `legality_changed` are subsets of
+    `changed`. The name lists are capped samples for logs and dashboards.
+    """
+
+    bulk_type: str = "default_cards"
+    seen: int = 0
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    oracle_changed: int = 0
+    legality_changed: int = 0
+    new_cards: List[str] = field(default_factory=list)
+    oracle_changed_cards: List[str] = field(default_factory=list)
+    legality_changed_cards: List[str] = field(default_factory=list)
+    stages: Dict[str, "StageStats"] = field(default_factory=dict)
+
+    @property
+    def written(self) -> int:
+        return self.new + self.changed
+
+    def record(self, diff: CardDiff) -> None:
+        self.seen += len(diff.new) + len(diff.changed) + diff.unchanged
+        self.new += len(diff.new)
+        self.changed += len(diff.changed)
+        self.unchanged += diff.unchanged
+        for row in diff.new:
+            _sample(self.new_cards, row["name"])
+        for row, (oracle_text, legalities) in diff.changed:
+            if row["oracle_text"] != oracle_text:
+                self.oracle_changed += 1
+                _sample(self.oracle_changed_cards, row["name"])
+            if row["legalities"] != legalities:
+                self.legality_changed += 1
+                _sample(self.legality_changed_cards, row["name"])
+
+    def as_dict(self) -> Dict[str, Any]:
+        """JSON-ready form, with each stage's derived rate included."""
+        data = asdict(self)
+        for name, stage in self.stages.items():
+            data["stages"][name]["rate"] = round(stage.rate, 1)
+        return data
+
+    def summary(self) -> str:
+        text = (
+            f"{self.seen} seen: {self.new} new, {self.changed} changed "
+            f"({self.oracle_changed} oracle, {self.legality_changed} legality), "
+            f"{self.unchanged} unchanged"
         )
-        existing_ids = set(result.scalars().all())
+        if self.stages:
+            text += "; " + ", ".join(s.summary() for s in self.stages.values())
+        return text
 
-        to_update = [row for row in batch if row["id"] in existing_ids]
-        to_insert = [row for row in batch if row["id"] not in existing_ids]
 
-        if to_update:
-            await session.execute(update(Card), to_update)
-        if to_insert:
-            session.add_all(Card(**row) for row in to_insert)
+def _sample(names: List[str], name: str) -> None:
+    if len(names) < _REPORT_SAMPLE_SIZE:
+        names.append(name)
 
-        await session.commit()
 
-    return len(rows)
+@dataclass
+class StageStats:
+    """
+    Throughput of one pipeline stage. `seconds` is time spent doing the
+    stage's own work — waiting on the network for download, CPU time
+    summed across workers for transform, DB time for write — so `rate`
+    shows which stage is the bottleneck rather than the overall wall rate.
+    """
 
+    name: str
+    items: int = 0
+    batches: int = 0
+    seconds: float = 0.0
 
-async def run_ingestion() -> int:
+    @property
+    def rate(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def add(self, items: int, seconds: float) -> None:
+        self.items += items
+        self.batches += 1
+        self.seconds += seconds
+
+    def summary(self) -> str:
+        return f"{self.name}: {self.items} in {self.seconds:.1f}s ({self.rate:.0f}/s)"
+
+
+def transform_lines(lines: List[bytes]) -> Tuple[List[Dict[str, Any]], float]:
     """
-    Refreshes the local `Card` table from Scryfall's `default_cards` bulk
-    file. Deliberately not wired into any container startup command or
-    scheduler — run by hand (`uv run python -m
-    app.ai.ingestion.scryfall_ingestion`) for now. Real recurring scheduling
-    is deferred until there's an actual deployment target to schedule
-    against (see PLAN.md's Deferred section).
+    Decode + transform stage, run in a worker process: raw JSONL lines to
+    `card_row`s (entries without an id dropped), plus the CPU seconds it
+    took. Module-level so ProcessPoolExecutor can pickle it by reference.
     """
-    async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
-        download_uri = await fetch_bulk_data_uri(client)
-        logger.info(f"Downloading bulk cards from {download_uri}")
-        cards = await download_bulk_cards(client, download_uri)
-        logger.info(f"Downloaded {len(cards)} card entries")
+    started = time.perf_counter()
+    rows = []
+    for line in lines:
+        card = json.loads(line)
+        if card.get("id"):
+            rows.append(card_row(card))
+    return rows, time.perf_counter() - started
+
+
+def default_workers() -> int:
+    """One transform process per core, leaving one for the event loop/DB writer."""
+    return max(1, (os.cpu_count() or 2) - 1)
 
-    async with SessionLocal() as session:
-        count = await upsert_cards(session, cards)
 
-    logger.info(f"Upserted {count} cards")
-    return count
+async def ingest_bulk_stream(
+    session: AsyncSession,
+    lines: AsyncIterator[bytes],
+    batch_size: int = 1000,
+    workers: int = 0,
+    queue_size: int = 4,
+    report: Optional[IngestionReport] = None,
+    skip_lines: int = 0,
+    on_checkpoint: Optional[Callable[[int], Awaitable[None]]] = None,
+) -> IngestionReport:
+    """
+    Three-stage pipeline over a stream of raw JSONL lines:
+
+    - download: collects lines into `batch_size` batches;
+    - transform: json.loads + card_row for each batch, fanned out over a
+      ProcessPoolExecutor of `workers` processes (0 runs it inline on the
+      event loop — fine for tests and small files) with at most two batches
+      per worker in flight, results kept in stream order;
+    - write: compares each batch's content hashes against the stored ones
+      (one query per batch) and only writes new or changed rows — a nightly
+      refresh where a few hundred of ~100k cards changed touches just those.
+
+    Stages hand off through bounded queues, so memory stays flat whichever
+    stage is slowest, and either side failing cancels the rest. Per-stage
+    throughput lands in `report.stages`.
+
+    Resumable: the first `skip_lines` lines are read past without being
+    transformed or written, and `on_checkpoint(lines_done)` is awaited after
+    each batch's writes but before its commit — so whatever it records
+    (see app/ai/ingestion/worker.py) commits atomically with the batch.
+    """
+    report = report or IngestionReport()
+    download = report.stages.setdefault("download", StageStats("download"))
+    transform = report.stages.setdefault("transform", StageStats("transform"))
+    write_stats = report.stages.setdefault("write", StageStats("write"))
+    line_batches: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    row_batches: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    loop = asyncio.get_running_loop()
+
+    async def read() -> None:
+        batch: List[bytes] = []
+        skipped = 0
+        waited = time.perf_counter()
+        async for line in lines:
+            if skipped < skip_lines:
+                skipped += 1
+                continue
+            batch.append(line)
+            if len(batch) >= batch_size:
+                download.add(len(batch), time.perf_counter() - waited)
+                await line_batches.put(batch)
+                batch = []
+                waited = time.perf_counter()
+        if batch:
+            download.add(len(batch), time.perf_counter() - waited)
+            await line_batches.put(batch)
+        await line_batches.put(None)
+
+    async def convert(pool: Optional[ProcessPoolExecutor]) -> None:
+        in_flight: Deque[Tuple[asyncio.Future, int]] = deque()
+
+        async def finish_oldest() -> None:
+            future, line_count = in_flight.popleft()
+            rows, seconds = await future
+            transform.add(len(rows), seconds)
+            await row_batches.put((rows, line_count))
+
+        while (batch := await line_batches.get()) is not None:
+            if pool is None:
+                rows, seconds = transform_lines(batch)
+                transform.add(len(rows), seconds)
+                await row_batches.put((rows, len(batch)))
+                continue
+            in_flight.append(
+                (loop.run_in_executor(pool, transform_lines, batch), len(batch))
+            )
+            if len(in_flight) >= 2 * workers:
+                await finish_oldest()
+        while in_flight:
+            await finish_oldest()
+        await row_batches.put(None)
+
+    async def write() -> None:
+        lines_done = skip_lines
+        while (item := await row_batches.get()) is not None:
+            batch, line_count = item
+            started = time.perf_counter()
+            # Dedupe within the batch first so the diff and the write agree.
+            batch = list({row["id"]: row for row in batch}.values())
+            diff = await diff_card_rows(session, batch)
+            report.record(diff)
+            rows = diff.rows_to_write
+            if rows:
+                await upsert_card_rows(session, rows, batch_size=batch_size)
+            lines_done += line_count
+            if on_checkpoint is not None:
+                await on_checkpoint(lines_done)
+            await session.commit()
+            write_stats.add(len(batch), time.perf_counter() - started)
+            if write_stats.batches % _PROGRESS_EVERY == 0:
+                logger.info(f"Ingestion progress: {report.summary()}")
+
+    # forkserver rather than fork: the event loop (and aiosqlite/asyncpg
+    # threads) are already running here, and forking a threaded process can
+    # deadlock the child.
+    pool = (
+        ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("forkserver")
+        )
+        if workers > 0
+        else None
+    )
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(read())
+            group.create_task(convert(pool))
+            group.create_task(write())
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    return report
+
+
+async def run_ingestion(
+    bulk_type: str = "default_cards", workers: Optional[int] = None
+) -> IngestionReport:
+    """
+    Refreshes the local `Card` table from a Scryfall bulk file —
+    `default_cards` by default, or e.g. `all_cards` (every printing in every
+    language) — streamed through ingest_bulk_stream's download/transform/
+    write pipeline (`workers` transform processes, one per spare core by
+    default), and returns the change report. This is the one-off, by-hand
+    entry point (`uv run python -m app.ai.ingestion.scryfall_ingestion
+    [bulk_type]`): it takes no lock and records no IngestionRun. Recurring
+    runs go through the scheduler in app/ai/ingestion/worker.py instead
+    (run_scryfall_job, enabled by INGESTION_SCHEDULE_ENABLED), which adds
+    the lease lock, checkpoints and mid-file resume.
+    """
+    report = IngestionReport(bulk_type=bulk_type)
+    async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
+        download_uri = await fetch_bulk_data_uri(client, bulk_type)
+        logger.info(f"Streaming bulk cards from {download_uri}")
+        async with SessionLocal() as session:
+            await ingest_bulk_stream(
+                session,
+                iter_bulk_lines(client, download_uri),
+                workers=default_workers() if workers is None else workers,
+                report=report,
+            )
+
+    logger.info(f"Ingestion finished: {report.summary()}")
+    return report
 
 
 if __name__ == "__main__":
-    asyncio.run(run_ingestion())
+    asyncio.run(run_ingestion(*sys.argv[1:2]))
@@ -0,0 +1,319 @@
+import asyncio
+import os
+import socket
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from app.ai.ingestion.scryfall_ingestion import (
+    IngestionReport,
+    default_workers,
+    fetch_bulk_data_uri,
+    ingest_bulk_stream,
+    iter_bulk_lines,
+)
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.logging import logger
+from app.models.ingestion import IngestionLock, IngestionRun, _utcnow_naive
+from app.services.card_store import refresh_card_snapshots
+
+SessionFactory = Callable[[], Any]  # async context manager yielding AsyncSession
+JobRunner = Callable[[AsyncSession, IngestionRun], Awaitable[Dict[str, Any]]]
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _lease() -> timedelta:
+    return timedelta(seconds=settings.INGESTION_LOCK_LEASE_SECONDS)
+
+
+async def acquire_lock(session: AsyncSession, job: str, owner: str) -> bool:
+    """
+    Takes (or re-takes) `job`'s lease if it's free, expired, or already ours.
+    Race-safe on any engine: the takeover is a single conditional UPDATE, and
+    the first-ever acquisition relies on the primary key to reject a second
+    concurrent INSERT.
+    """
+    now = _utcnow_naive()
+    result = await session.execute(
+        update(IngestionLock)
+        .where(col(IngestionLock.job) == job)
+        .where(
+            or_(col(IngestionLock.expires_at) < now, col(IngestionLock.owner) == owner)
+        )
+        .values(owner=owner, expires_at=now + _lease())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 1:
+        await session.commit()
+        return True
+
+    held = await session.execute(
+        select(IngestionLock.job).where(IngestionLock.job == job)
+    )
+    if held.first() is not None:
+        await session.rollback()
+        return False
+    session.add(IngestionLock(job=job, owner=owner, expires_at=now + _lease()))
+    try:
+        await session.commit()
+    except IntegrityError:
+        await session.rollback()
+        return False
+    return True
+
+
+async def renew_lock(session: AsyncSession, job: str, owner: str) -> bool:
+    """Pushes our lease forward; False means another worker has taken it over."""
+    result = await session.execute(
+        update(IngestionLock)
+        .where(col(IngestionLock.job) == job)
+        .where(col(IngestionLock.owner) == owner)
+        .values(expires_at=_utcnow_naive() + _lease())
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return result.rowcount == 1
+
+
+async def release_lock(session: AsyncSession, job: str, owner: str) -> None:
+    await session.execute(
+        delete(IngestionLock)
+        .where(col(IngestionLock.job) == job)
+        .where(col(IngestionLock.owner) == owner)
+    )
+    await session.commit()
+
+
+async def _resume_point(session: AsyncSession, job: str, source: str) -> int:
+    """
+    Where to pick up: the latest unfinished run's checkpoint, but only if it
+    was reading the very same file (Scryfall's bulk URIs change with every
+    daily export, and line N of a different export is a different card).
+    """
+    result = await session.execute(
+        select(IngestionRun)
+        .where(IngestionRun.job == job)
+        .where(col(IngestionRun.status) != "running")
+        .order_by(col(IngestionRun.id).desc())
+        .limit(1)
+    )
+    previous = result.scalars().first()
+    if previous and previous.status == "failed" and previous.source == source:
+        return previous.checkpoint
+    return 0
+
+
+async def run_scryfall_job(session: AsyncSession, run: IngestionRun) -> Dict[str, Any]:
+    """Bulk card ingestion, checkpointed every batch and resumable mid-file."""
+    async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
+        source = await fetch_bulk_data_uri(client, settings.SCRYFALL_BULK_TYPE)
+        resume = await _resume_point(session, run.job, source)
+        run.source = source
+        run.resumed_from = run.checkpoint = resume
+        session.add(run)
+        await session.commit()
+        if resume:
+            logger.info(f"Resuming {run.job} ingestion at line {resume}")
+
+        report = IngestionReport(bulk_type=settings.SCRYFALL_BULK_TYPE)
+
+        async def checkpoint(lines_done: int) -> None:
+            # Same transaction as the batch ingest_bulk_stream just wrote.
+            run.checkpoint = lines_done
+            run.report = report.as_dict()
+            session.add(run)
+
+        workers = settings.INGESTION_WORKERS
+        await ingest_bulk_stream(
+            session,
+            iter_bulk_lines(client, source),
+            workers=default_workers() if workers is None else workers,
+            report=report,
+            skip_lines=resume,
+            on_checkpoint=checkpoint,
+        )
+    return report.as_dict()
+
+
+def _run_rules_ingestion() -> None:
+    # Imported here: the rules pipeline pulls in chromadb and
+    # sentence-transformers, which nothing else in the API process needs.
+    from app.ai.ingestion.rules_ingestion import run_ingestion
+
+    run_ingestion()
+
+
+async def run_rules_job(session: AsyncSession, run: IngestionRun) -> Dict[str, Any]:
+    """
+    Comprehensive Rules → Chroma. Synchronous and CPU-heavy (embedding), so
+    it runs in a thread; it upserts by stable chunk ids, so a rerun after a
+    crash simply redoes it rather than resuming.
+    """
+    await asyncio.to_thread(_run_rules_ingestion)
+    return {}
+
+
+JOBS: Dict[str, JobRunner] = {
+    "scryfall": run_scryfall_job,
+    "rules": run_rules_job,
+}
+
+
+def job_intervals() -> Dict[str, float]:
+    """Hours between successful runs per job; 0 or less disables a job."""
+    return {
+        "scryfall": settings.SCRYFALL_INGESTION_INTERVAL_HOURS,
+        "rules": settings.RULES_INGESTION_INTERVAL_HOURS,
+    }
+
+
+async def _heartbeat(
+    session_factory: SessionFactory,
+    job: str,
+    owner: str,
+    job_task: asyncio.Task,
+    lost: List[bool],
+) -> None:
+    """Renews the lease while `job_task` runs; cancels it if the lease is lost."""
+    while True:
+        await asyncio.sleep(settings.INGESTION_LOCK_LEASE_SECONDS / 3)
+        async with session_factory() as session:
+            if not await renew_lock(session, job, owner):
+                logger.error(f"Lost the {job} ingestion lock; stopping")
+                lost.append(True)
+                job_task.cancel()
+                return
+
+
+async def _finish(
+    session: AsyncSession, run_id: int, status: str, **values: Any
+) -> None:
+    await session.execute(
+        update(IngestionRun)
+        .where(col(IngestionRun.id) == run_id)
+        .values(status=status, finished_at=_utcnow_naive(), **values)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+
+async def run_job(
+    job: str,
+    session_factory: SessionFactory = SessionLocal,
+    owner: str = WORKER_ID,
+) -> Optional[int]:
+    """
+    Runs one ingestion job under its lease lock and records it as an
+    IngestionRun. Returns the run id, or None if another worker holds the
+    lock. Runs left "running" by a crashed worker are marked failed first,
+    which is what lets the scryfall job resume from their checkpoint.
+    """
+    runner = JOBS[job]
+    async with session_factory() as session:
+        if not await acquire_lock(session, job, owner):
+            logger.info(f"{job} ingestion already running elsewhere; skipping")
+            return None
+        try:
+            await session.execute(
+                update(IngestionRun)
+                .where(col(IngestionRun.job) == job)
+                .where(col(IngestionRun.status) == "running")
+                .values(status="failed", error="abandoned", finished_at=_utcnow_naive())
+                .execution_options(synchronize_session=False)
+            )
+            run = IngestionRun(job=job, worker_id=owner)
+            session.add(run)
+            await session.commit()
+            await session.refresh(run)
+            run_id = run.id
+
+            lost: List[bool] = []
+            job_task = asyncio.create_task(runner(session, run))
+            heartbeat = asyncio.create_task(
+                _heartbeat(session_factory, job, owner, job_task, lost)
+            )
+            try:
+                report = await job_task
+            except asyncio.CancelledError:
+                await session.rollback()
+                error = "lost lock" if lost else "interrupted"
+                await _finish(session, run_id, "failed", error=error)
+                if lost:
+                    return run_id
+                raise
+            except Exception as e:
+                logger.exception(f"{job} ingestion failed")
+                await session.rollback()
+                await _finish(session, run_id, "failed", error=str(e)[:2000])
+                return run_id
+            finally:
+                heartbeat.cancel()
+
+            await _finish(session, run_id, "succeeded", report=report or run.report)
+            logger.info(f"{job} ingestion run {run_id} succeeded")
+            if job == "scryfall":
+                await refresh_card_snapshots()
+            return run_id
+        finally:
+            await release_lock(session, job, owner)
+
+
+async def due_jobs(session: AsyncSession) -> List[str]:
+    """
+    Jobs whose last success is older than their interval, unless they failed
+    within the last INGESTION_RETRY_MINUTES (so a persistent failure retries
+    at that pace instead of every poll).
+    """
+    now = _utcnow_naive()
+    due = []
+    for job, hours in job_intervals().items():
+        if hours <= 0:
+            continue
+        result = await session.execute(
+            select(IngestionRun.status, IngestionRun.finished_at)
+            .where(IngestionRun.job == job)
+            .where(col(IngestionRun.status) != "running")
+            .order_by(col(IngestionRun.id).desc())
+            .limit(1)
+        )
+        last = result.first()
+        if last is None:
+            due.append(job)
+        elif last.status == "succeeded":
+            if last.finished_at < now - timedelta(hours=hours):
+                due.append(job)
+        elif last.finished_at < now - timedelta(minutes=settings.INGESTION_RETRY_MINUTES):
+            due.append(job)
+    return due
+
+
+async def run_scheduler(session_factory: SessionFactory = SessionLocal) -> None:
+    """
+    Polls every INGESTION_POLL_SECONDS and runs whichever jobs are due, one
+    at a time. Safe to run in every API process (see app/main.py's lifespan)
+    or standalone (`python -m app.ai.ingestion.worker`) — the lease lock
+    keeps concurrent schedulers from ingesting the same job twice.
+    """
+    logger.info(f"Ingestion scheduler started ({WORKER_ID})")
+    while True:
+        try:
+            async with session_factory() as session:
+                jobs = await due_jobs(session)
+            for job in jobs:
+                await run_job(job, session_factory)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Ingestion scheduler tick failed")
+        await asyncio.sleep(settings.INGESTION_POLL_SECONDS)
+
+
+if __name__ == "__main__":
+    asyncio.run(run_scheduler())
@@ -1,21 +1,15 @@
-import re
 from typing import Optional
 
 import httpx
-from sqlmodel import col, select
 
 from app.ai.tools.db import get_tool_session
 from app.core.config import settings
 from app.core.logging import logger
 from app.models.card import Card
+from app.services.card_index import latest_ingestion_run_id
+from app.services.card_query import QuerySyntaxError, search_local
 from app.services.scryfall import ScryfallService
 
-# Scryfall search syntax uses "key:value" operators (t:creature, c:red,
-# f:pauper, ...). The local cache only supports plain name substring
-# matching, not that grammar, so anything using an operator skips the local
-# lookup and goes straight to live Scryfall to keep results correct.
-_SCRYFALL_OPERATOR_RE = re.compile(r"\b[a-zA-Z]+:")
-
 
 def _card_to_dict(card: Card) -> dict:
     return {
@@ -28,11 +22,16 @@ def _card_to_dict(card: Card) -> dict:
 
 
 async def _search_local(query: str, limit: int = 10) -> list[dict]:
+    """
+    Raises QuerySyntaxError for syntax the local engine can't evaluate.
+    Empty until a Scryfall bulk ingestion has succeeded: before that the
+    table only holds synced deck and collection cards, not the full pool.
+    """
     async with get_tool_session() as session:
-        result = await session.execute(
-            select(Card).where(col(Card.name).ilike(f"%{query}%")).limit(limit)
-        )
-        return [_card_to_dict(card) for card in result.scalars().all()]
+        if not await latest_ingestion_run_id(session):
+            return []
+        cards = await search_local(session, query, limit=limit)
+        return [_card_to_dict(card) for card in cards]
 
 
 def _format_card(card: dict, format: Optional[str]) -> str:
@@ -53,20 +52,25 @@ def _format_card(card: dict, format: Optional[str]) -> str:
 
 async def search_cards(query: str, format: Optional[str] = None) -> str:
     """
-    Searches for cards matching a query (Scryfall search syntax). Plain name
-    queries check the locally-ingested card cache first, falling back to live
-    Scryfall if nothing matches there or the query uses Scryfall's operator
-    syntax (t:, c:, f:, ...). Returns formatted results: name, mana cost,
+    Searches for cards matching a query (Scryfall search syntax). Queries
+    are evaluated against the locally-ingested card table first — names and
+    the common operators (t:, o:, c:, id:, mv, f:, produces:, and/or/-) are
+    understood locally, see app/services/card_query.py — falling back to
+    live Scryfall if nothing matches there, no bulk ingestion has run yet, or
+    the query uses syntax outside that subset. Returns formatted results: name, mana cost,
     type line, oracle text, and — if a format is given — that format's
     legality, so the agent can filter candidates itself instead of relying on
     internal memory for card details.
     """
     logger.info(f"Tool 'search_cards' called with query={query!r} format={format!r}")
 
-    if not _SCRYFALL_OPERATOR_RE.search(query):
+    try:
         local_cards = await _search_local(query)
-        if local_cards:
-            return "\n\n".join(_format_card(card, format) for card in local_cards)
+    except QuerySyntaxError as e:
+        logger.info(f"Query {query!r} not searchable locally ({e}); asking Scryfall")
+        local_cards = []
+    if local_cards:
+        return "\n\n".join(_format_card(card, format) for card in local_cards)
 
     async with httpx.AsyncClient(
         base_url=settings.SCRYFALL_BASE_URL, timeout=10.0
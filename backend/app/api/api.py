@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.routes import auth, users, cards, decks, ai, collection, goldfish
+from app.api.routes import auth, users, cards, decks, ai, collection, goldfish, ingestion
 
 api_router = APIRouter()
 
@@ -10,4 +10,4 @@ api_router.include_router(decks.router, prefix="/decks", tags=["decks"])
 api_router.include_router(collection.router, prefix="/collection", tags=["collection"])
 api_router.include_router(ai.router, prefix="/ai", tags=["ai"])
 api_router.include_router(goldfish.router, prefix="/goldfish", tags=["goldfish"])
-
+api_router.include_router(ingestion.router, prefix="/ingestion", tags=["ingestion"])
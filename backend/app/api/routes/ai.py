@@ -2,6 +2,7 @@ from app.ai.agents.deck_advisor.deck_advisor_agent import deck_advisor_agent
 from app.ai.agents.rules.rules_agent import rules_agent
 from app.api.deps import get_current_user
 from app.core.db import get_db
+from app.core.legality import format_key
 from app.models.deck import Deck, DeckCard
 from app.models.user import User
 from app.schemas.ai import (
@@ -27,14 +28,13 @@ def _build_deck_context(deck: Deck, stats: dict, query: str) -> str:
     # Full details for every card already in the deck, straight from data this app
     # already synced from Scryfall (no extra query/network call) — this is what lets
     # the agent skip a search_cards round trip for cards it's already been given.
-    fmt_key = (deck.format or "").lower()
+    fmt_key = format_key(deck.format)
     card_lines = []
     for dc in main_cards:
         card = dc.card
         line = f"{dc.quantity}x {card.name} {card.mana_cost or ''} — {card.type_line or ''}".strip()
         if fmt_key:
-            legality = (card.legalities or {}).get(fmt_key, "unknown")
-            line += f" [{deck.format} legality: {legality}]"
+            line += f" [{deck.format} legality: {card.legality(fmt_key)}]"
         card_lines.append(line)
 
     curve = stats.get("mana_curve", {})
@@ -4,23 +4,58 @@ import httpx
 from app.core.db import get_db
 from app.models.card import Card
 from app.models.deck import ScryfallCardPublic
+from app.services.cache import get_response_cache
+from app.services.card_index import card_name_index, latest_ingestion_run_id
+from app.services.card_query import QuerySyntaxError, search_local_page
 from app.services.scryfall import ScryfallService, get_scryfall_service
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import col, select
 
 router = APIRouter()
 
+# Scryfall's own page size for /cards/search.
+SEARCH_PAGE_SIZE = 175
+
+
 @router.get("/search")
 async def search_cards(
-    q: str, scryfall: ScryfallService = Depends(get_scryfall_service)
+    q: str,
+    request: Request,
+    page: int = Query(1, ge=1),
+    db: AsyncSession = Depends(get_db),
+    scryfall: ScryfallService = Depends(get_scryfall_service),
 ):
     """
-    Search for cards using Scryfall.
+    Search for cards with Scryfall's query syntax. Queries the local engine
+    understands (app/services/card_query.py) are answered from the ingested
+    Card table in Scryfall's paginated list shape — `total_cards` counts
+    every matching name, and `has_more`/`next_page` lead to the next `page`.
+    Only once a Scryfall bulk ingestion has succeeded, though: before that
+    the table holds just the cards decks and collections synced, and a
+    local answer would pass a handful of rows off as the full result.
+    Anything else, or a query with no local matches, goes to Scryfall.
     """
+    cards, total = [], 0
+    if await latest_ingestion_run_id(db):
+        try:
+            cards, total = await search_local_page(
+                db, q, SEARCH_PAGE_SIZE, (page - 1) * SEARCH_PAGE_SIZE
+            )
+        except QuerySyntaxError:
+            pass
+    if total:
+        body = {
+            "object": "list",
+            "total_cards": total,
+            "has_more": page * SEARCH_PAGE_SIZE < total,
+            "data": [ScryfallCardPublic.model_validate(card) for card in cards],
+        }
+        if body["has_more"]:
+            body["next_page"] = str(request.url.include_query_params(page=page + 1))
+        return body
     try:
-        data = await scryfall.search_cards(q)
+        data = await scryfall.search_cards(q, page)
         return data
     except httpx.HTTPStatusError as e:
         raise HTTPException(
@@ -39,29 +74,34 @@ async def local_search_cards(q: str, db: AsyncSession = Depends(get_db)):
     Scryfall's full-text search endpoint. Same underlying Scryfall data,
     served from the already-downloaded copy — for interactive typeahead
     (the deck-builder search box, one request per keystroke) this avoids an
-    external network round trip entirely. Backed by a trigram index
-    (migration 34f74e54c976); without it this same query is a multi-second
-    sequential scan over ~116k rows, slower than just calling Scryfall.
+    external network round trip entirely.
 
-    Grouping by name (picking one id per name) collapses reprints down to
-    one row per card name, matching Scryfall's own default `unique=cards`
-    search behavior. Written as a group-by-then-join rather than Postgres's
-    DISTINCT ON so it stays testable against the SQLite test engine, same
-    reasoning as upsert_cards() in app/ai/ingestion/scryfall_ingestion.py.
+    Matching and ranking happen in the in-process CardNameIndex
+    (app/services/card_index.py): exact, then prefix, then substring, then
+    typo-tolerant matches, more-played names first within each. Reprints
+    collapse to one row per card name, matching Scryfall's own default
+    `unique=cards` search behavior. The only query left per keystroke is a
+    primary-key fetch of the (at most 20) winning rows.
     """
     if not q.strip():
         return []
-    matching_ids = (
-        select(func.min(Card.id))
-        .where(col(Card.name).ilike(f"%{q}%"))
-        .group_by(col(Card.name))
-        .order_by(col(Card.name))
-        .limit(20)
-    )
-    result = await db.execute(
-        select(Card).where(col(Card.id).in_(matching_ids)).order_by(col(Card.name))
-    )
-    return result.scalars().all()
+    index = await card_name_index.ensure_fresh(db)
+    ids = index.search(q, limit=20)
+    if not ids:
+        return []
+    result = await db.execute(select(Card).where(col(Card.id).in_(ids)))
+    by_id = {card.id: card for card in result.scalars().all()}
+    return [by_id[card_id] for card_id in ids if card_id in by_id]
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Hit/miss counters and sizes for this worker's Scryfall response cache
+    (per namespace: card, search, rulings). Memory-tier numbers are
+    per-process; the disk tier, when SCRYFALL_CACHE_PATH is set, is shared.
+    """
+    return get_response_cache().snapshot()
 
 
 @router.get("/{card_id}")
@@ -10,7 +10,8 @@ from app.models.collection import CollectionCard
 from app.models.card import Card
 from app.schemas.collection import CollectionCardCreate, CollectionCardRead, CollectionCardUpdate
 from app.api.deps import get_current_user
-from app.services.scryfall import ScryfallService, get_scryfall_service, resolve_card_fields
+from app.services.card_store import fetched_card_rows, upsert_card_rows
+from app.services.scryfall import ScryfallService, get_scryfall_service
 
 router = APIRouter()
 
@@ -42,25 +43,12 @@ async def add_to_collection(
     # Check if card exists in local DB, if not fetch and cache it
     card = await db.get(Card, item_in.card_id)
     if not card:
-        # Fetch from Scryfall
+        # Fetch from Scryfall; stored through the same card store as deck
+        # syncs, so the row is complete (produced_mana, legalities included).
         scryfall_card = await scryfall.get_card_by_id(item_in.card_id)
-        # Multi-faced cards (transform/modal-DFC/reversible/art-series) don't
-        # always carry top-level name/type_line/image_uris — see
-        # `resolve_card_fields`'s docstring for the live-API-confirmed cases.
-        fields = resolve_card_fields(scryfall_card)
-        card = Card(
-            id=scryfall_card["id"],
-            name=fields["name"],
-            mana_cost=scryfall_card.get("mana_cost"),
-            type_line=fields["type_line"],
-            oracle_text=scryfall_card.get("oracle_text"),
-            colors=scryfall_card.get("colors"),
-            image_uris=fields["image_uris"],
-            card_faces=fields["card_faces"],
-        )
-        db.add(card)
+        await upsert_card_rows(db, fetched_card_rows([scryfall_card]))
         await db.commit()
-        await db.refresh(card)
+        card = await db.get(Card, scryfall_card["id"])
 
     # Check if user already has this card
     statement = select(CollectionCard).where(
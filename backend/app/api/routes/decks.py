@@ -1,25 +1,55 @@
-from typing import List
+from typing import List, Optional
 
 from app.api.deps import get_current_user
 from app.core.db import get_db
+from app.core.etag import etag_matches, make_etag, not_modified
+from app.core.legality import FORMAT_BITS, format_key, legality_status
 from app.models.card import Card
 from app.models.deck import (
     Deck,
     DeckCard,
+    DeckCardPublic,
     DeckCreate,
     DeckPublic,
+    DeckStats,
     DeckUpdate,
+    _utcnow_naive,
 )
 from app.models.user import User
 from app.schemas.deck_import import DeckImportRequest, DeckImportResponse
+from app.schemas.deck_summary import DeckSummary, DeckSummaryPage
+from app.schemas.legality import (
+    CardLegalityIssue,
+    DeckLegality,
+    DeckValidationResult,
+    DeckViolation,
+)
+from app.schemas.simulation import DeckSimulationResult
+from app.schemas.stats import DrawOddsRequest, DrawOddsResponse
+from app.services.card_store import fetched_card_rows, upsert_card_rows
 from app.services.deck_import import parse_decklist, resolve_entries
-from app.services.scryfall import (
-    ScryfallService,
-    get_scryfall_service,
-    resolve_card_fields,
+from app.services.deck_stats import (
+    apply_deck_stats_delta,
+    card_quantities,
+    rebuild_deck_stats,
+    stale_card_ids,
+)
+from app.services.deck_summary import InvalidCursor, decode_cursor, list_deck_summaries
+from app.services.deck_validation import validate_user_decks
+from app.services.scryfall import ScryfallService, get_scryfall_service
+from app.services.simulation import (
+    DEFAULT_GAMES,
+    MAX_GAMES,
+    MAX_TURNS,
+    MulliganPolicy,
+    deck_arrays,
+    simulate_games,
 )
-from app.services.stats import calculate_stats
-from fastapi import APIRouter, Depends, HTTPException
+from app.services.probability import cards_seen
+from app.services.stats import calculate_land_requirement_odds, render_stats
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from sqlmodel import col, select
@@ -50,64 +80,35 @@ async def sync_cards(db: AsyncSession, card_ids: List[str], scryfall: ScryfallSe
     # Fetch missing cards from Scryfall
     scryfall_cards = await scryfall.get_cards_by_ids(ids_to_fetch)
 
-    # Process fetched cards
-    for card_data in scryfall_cards:
-        # Check if card already exists (but was incomplete) to avoid PK violation
-        # We can use upsert or just checking existence.
-        # Since we filtered by "is_not(None)", the card MIGHT exist but have NULL.
-        # So we should try to get it first or use merge.
-
-        # Simpler approach: check if it exists in DB (even with NULL)
-        existing_check = await db.execute(
-            select(Card).where(Card.id == card_data["id"])
-        )
-        existing_card = existing_check.scalar_one_or_none()
-
-        produced_mana = card_data.get("produced_mana", [])
-        # Multi-faced cards (transform/modal-DFC/reversible/art-series) don't
-        # always carry top-level name/type_line/image_uris — see
-        # `resolve_card_fields`'s docstring for the live-API-confirmed cases.
-        fields = resolve_card_fields(card_data)
-
-        if existing_card:
-            # Update existing
-            existing_card.name = fields["name"]
-            existing_card.mana_cost = card_data.get("mana_cost")
-            existing_card.type_line = fields["type_line"]
-            existing_card.oracle_text = card_data.get("oracle_text")
-            existing_card.colors = card_data.get("colors")
-            existing_card.produced_mana = produced_mana
-            existing_card.image_uris = fields["image_uris"]
-            existing_card.legalities = card_data.get("legalities")
-            existing_card.card_faces = fields["card_faces"]
-            db.add(existing_card)
-        else:
-            # Create new
-            card = Card(
-                id=card_data["id"],
-                name=fields["name"],
-                mana_cost=card_data.get("mana_cost"),
-                type_line=fields["type_line"],
-                oracle_text=card_data.get("oracle_text"),
-                colors=card_data.get("colors"),
-                produced_mana=produced_mana,
-                image_uris=fields["image_uris"],
-                legalities=card_data.get("legalities"),
-                card_faces=fields["card_faces"],
-            )
-            db.add(card)
-
+    # One batched upsert rather than a SELECT per card: the cards may exist
+    # already with NULL produced_mana (never synced), so this has to update
+    # as well as insert.
+    await upsert_card_rows(db, fetched_card_rows(scryfall_cards))
     await db.commit()
 
 
 @router.get("/", response_model=List[DeckPublic])
 async def read_decks(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Retrieve decks (fast, from local DB).
+    Retrieve decks (fast, from local DB). Honors If-None-Match: the ETag
+    covers every deck's id, revision and cards_version, so an unchanged list
+    is answered with a 304 off one narrow query, before any card is loaded.
     """
+    revisions = await db.execute(
+        select(Deck.id, Deck.revision, Deck.cards_version)
+        .where(Deck.user_id == current_user.id)
+        .order_by(col(Deck.id))
+    )
+    etag = make_etag("decks", current_user.id, *revisions.all())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     # Eager load cards AND the nested card definition
     result = await db.execute(
         select(Deck)
@@ -120,6 +121,79 @@ async def read_decks(
     return decks
 
 
+# Declared ahead of the /{deck_id} routes so "summary" and "validate" aren't
+# taken for an id.
+@router.get("/summary", response_model=DeckSummaryPage)
+async def read_deck_summaries(
+    cursor: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    include_cards: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    The deck list, paginated and slim: title, format, card count, colour
+    identity, cover image and updated_at per deck, most recently updated
+    first, aggregated in SQL rather than loading every card of every deck
+    (app/services/deck_summary.py). Pass `next_cursor` back as `cursor` for
+    the next page; `include_cards` adds each deck's full card list.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    rows, next_cursor = await list_deck_summaries(
+        db, current_user.id, limit, after, include_cards
+    )
+    return DeckSummaryPage(
+        data=[
+            DeckSummary(
+                id=row.id,
+                title=row.title,
+                format=row.format,
+                card_count=row.card_count,
+                color_identity=row.color_identity,
+                cover_image=row.cover_image,
+                updated_at=row.updated_at,
+                cards=(
+                    None
+                    if row.cards is None
+                    else [DeckCardPublic.model_validate(dc) for dc in row.cards]
+                ),
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/validate", response_model=List[DeckValidationResult])
+async def validate_decks(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Validates every deck the user owns against its format's construction
+    rules — legality, copy limits, deck and sideboard size, singleton, and
+    commander count/colour identity — in one request and two queries
+    (app/services/deck_validation.py), instead of one read_deck per deck.
+    """
+    results = await validate_user_decks(db, current_user.id)
+    return [
+        DeckValidationResult(
+            deck_id=r.deck_id,
+            title=r.title,
+            format=r.format,
+            valid=r.valid,
+            violations=[
+                DeckViolation(code=v.code, message=v.message, card_ids=v.card_ids)
+                for v in r.violations
+            ],
+        )
+        for r in results
+    ]
+
+
 @router.post("/", response_model=DeckPublic)
 async def create_deck(
     deck_in: DeckCreate,
@@ -148,6 +222,8 @@ async def create_deck(
         ]
 
     db.add(db_deck)
+    await db.flush()
+    await apply_deck_stats_delta(db, db_deck.id, {}, card_quantities(db_deck.cards))
     await db.commit()
     await db.refresh(db_deck)
 
@@ -193,6 +269,8 @@ async def import_deck(
     ]
 
     db.add(db_deck)
+    await db.flush()
+    await apply_deck_stats_delta(db, db_deck.id, {}, merged)
     await db.commit()
     await db.refresh(db_deck)
 
@@ -202,12 +280,28 @@ async def import_deck(
 @router.get("/{deck_id}", response_model=DeckPublic)
 async def read_deck(
     deck_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Get deck by ID (fast).
+    Get deck by ID (fast). Honors If-None-Match against the deck's revision
+    and cards_version, checked before the cards are loaded.
     """
+    head = await db.execute(
+        select(Deck.user_id, Deck.revision, Deck.cards_version).where(Deck.id == deck_id)
+    )
+    row = head.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    if row.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    etag = make_etag("deck", deck_id, row.revision, row.cards_version)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
     result = await db.execute(
         select(Deck)
         .where(Deck.id == deck_id)
@@ -232,21 +326,34 @@ async def update_deck(
     """
     Update deck. Syncs new cards if added.
     """
-    result = await db.execute(
-        select(Deck).where(Deck.id == deck_id).options(selectinload(Deck.cards))  # type: ignore[arg-type]
-    )
-    db_deck = result.scalar_one_or_none()
+    db_deck = await db.get(Deck, deck_id)
     if not db_deck:
         raise HTTPException(status_code=404, detail="Deck not found")
     if db_deck.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    # Sync any new cards in the update payload
+    # Sync any new cards in the update payload. This commits, so it runs
+    # before the lock below rather than releasing it.
     if deck_in.cards:
         card_ids = [dc.card_id for dc in deck_in.cards]
         await sync_cards(db, card_ids, scryfall)
 
+    # Locked and re-read in the transaction that commits the edit, so a
+    # concurrent edit can't change the cards between reading `cards_before`
+    # and applying the stats delta against it.
+    result = await db.execute(
+        select(Deck)
+        .where(Deck.id == deck_id)
+        .options(selectinload(Deck.cards))  # type: ignore[arg-type]
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    db_deck = result.scalar_one_or_none()
+    if not db_deck:
+        raise HTTPException(status_code=404, detail="Deck not found")
+
     update_data = deck_in.model_dump(exclude_unset=True)
+    cards_before = card_quantities(db_deck.cards)
 
     if "cards" in update_data:
         # Replace strategy with manual merge to ensure updates persist
@@ -272,7 +379,15 @@ async def update_deck(
 
         del update_data["cards"]
 
+        await apply_deck_stats_delta(
+            db, db_deck.id, cards_before, card_quantities(db_deck.cards)
+        )
+
     db_deck.sqlmodel_update(update_data)
+    # Incremented in SQL, not from the value read above, so concurrent edits
+    # each get their own revision (and so their own ETag).
+    db_deck.revision = Deck.revision + 1
+    db_deck.updated_at = _utcnow_naive()
     db.add(db_deck)
     await db.commit()
     await db.refresh(db_deck)
@@ -301,6 +416,9 @@ async def delete_deck(
         raise HTTPException(status_code=404, detail="Deck not found")
     if deck.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
+    # Explicit rather than relying on the FK's ON DELETE CASCADE alone, which
+    # SQLite (the test engine) doesn't enforce by default.
+    await db.execute(delete(DeckStats).where(col(DeckStats.deck_id) == deck_id))
     await db.delete(deck)
     await db.commit()
     return {"status": "ok"}
@@ -313,7 +431,124 @@ async def get_deck_stats(
     current_user: User = Depends(get_current_user),
 ):
     """
-    Get deck statistics.
+    Get deck statistics. Served from the deck's persisted DeckStats snapshot
+    (kept current by the create/update/import routes) — a single-row read
+    plus an id/hash check of its cards, not a reload of every card. Decks
+    created before snapshots existed, and snapshots counting a card whose
+    row has since changed, get rebuilt on request.
+    """
+    result = await db.execute(
+        select(DeckStats, Deck.user_id)
+        .join(Deck, col(Deck.id) == col(DeckStats.deck_id))
+        .where(DeckStats.deck_id == deck_id)
+    )
+    row = result.first()
+    if row is not None:
+        snapshot, owner_id = row
+    else:
+        owner_result = await db.execute(select(Deck.user_id).where(Deck.id == deck_id))
+        owner_id = owner_result.scalar_one_or_none()
+        if owner_id is None:
+            raise HTTPException(status_code=404, detail="Deck not found")
+        snapshot = None
+    if owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    if snapshot is None or await stale_card_ids(db, snapshot) != set():
+        snapshot = await rebuild_deck_stats(db, deck_id)
+        await db.commit()
+
+    stats = render_stats(snapshot.totals)
+    stats["version"] = snapshot.version
+    return stats
+
+
+@router.get("/{deck_id}/legality", response_model=DeckLegality)
+async def check_deck_legality(
+    deck_id: int,
+    format: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Checks every card in the deck (maybeboard aside) against a format — the
+    deck's own unless `format` is given — in one query over the cards'
+    legality bitmasks, returning only the offenders: cards banned or not
+    legal there, and restricted cards run at more than one copy (counted by
+    name across boards and printings). Same rules as /decks/validate
+    (app/services/deck_validation.py): cards with no legality data synced
+    yet are skipped rather than reported.
+    """
+    result = await db.execute(select(Deck.user_id, Deck.format).where(Deck.id == deck_id))
+    row = result.first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    if row.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    fmt = format_key(format or row.format)
+    if fmt is None:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown format: {format or row.format}"
+        )
+
+    bit = FORMAT_BITS[fmt]
+    in_deck = and_(DeckCard.deck_id == deck_id, col(DeckCard.board) != "maybe")
+    copies = (
+        select(Card.name, func.sum(DeckCard.quantity).label("copies"))
+        .join(DeckCard, col(DeckCard.card_id) == col(Card.id))
+        .where(in_deck)
+        .group_by(col(Card.name))
+        .subquery()
+    )
+    offenders = await db.execute(
+        select(
+            DeckCard.card_id,
+            DeckCard.board,
+            DeckCard.quantity,
+            Card.name,
+            Card.legal_mask,
+            Card.restricted_mask,
+            Card.banned_mask,
+        )
+        .join(Card, col(Card.id) == col(DeckCard.card_id))
+        .join(copies, copies.c.name == col(Card.name))
+        .where(in_deck)
+        .where(or_(col(Card.legal_mask) != 0, col(Card.banned_mask) != 0))
+        .where(
+            or_(
+                col(Card.legal_mask).op("&")(bit) == 0,
+                and_(
+                    col(Card.restricted_mask).op("&")(bit) != 0,
+                    copies.c.copies > 1,
+                ),
+            )
+        )
+        .order_by(col(Card.name), col(DeckCard.board))
+    )
+    issues = [
+        CardLegalityIssue(
+            card_id=r.card_id,
+            name=r.name,
+            board=r.board,
+            quantity=r.quantity,
+            status=legality_status(fmt, r.legal_mask, r.restricted_mask, r.banned_mask),
+        )
+        for r in offenders.all()
+    ]
+    return DeckLegality(deck_id=deck_id, format=fmt, legal=not issues, issues=issues)
+
+
+@router.post("/{deck_id}/odds", response_model=DrawOddsResponse)
+async def get_deck_draw_odds(
+    deck_id: int,
+    odds_in: DrawOddsRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Exact multivariate hypergeometric odds of meeting several land
+    requirements together by a given turn (e.g. two blue sources AND three
+    lands by turn 3).
     """
     result = await db.execute(
         select(Deck)
@@ -326,5 +561,69 @@ async def get_deck_stats(
     if deck.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
 
-    stats = calculate_stats(deck)
-    return stats
+    try:
+        probability = calculate_land_requirement_odds(
+            deck,
+            odds_in.turn,
+            odds_in.on_the_play,
+            [(r.color, r.at_least) for r in odds_in.requirements],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return DrawOddsResponse(
+        turn=odds_in.turn,
+        on_the_play=odds_in.on_the_play,
+        cards_seen=cards_seen(odds_in.turn, odds_in.on_the_play),
+        probability=round(probability, 4),
+    )
+
+
+@router.get("/{deck_id}/simulate", response_model=DeckSimulationResult)
+async def simulate_deck(
+    deck_id: int,
+    games: int = Query(DEFAULT_GAMES, ge=1, le=MAX_GAMES),
+    turns: int = Query(10, ge=1, le=MAX_TURNS),
+    on_the_play: bool = True,
+    min_lands: int = Query(2, ge=0, le=7),
+    max_lands: int = Query(5, ge=0, le=7),
+    max_mulligans: int = Query(2, ge=0, le=6),
+    seed: Optional[int] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Monte Carlo opening-hand and curve analysis: plays `games` shuffled
+    openings of the deck's mainboard (London mulligan per the given land
+    range) and returns mulligan, opening-land and per-turn mana/land-drop
+    distributions. Pass `seed` for reproducible numbers.
+    """
+    result = await db.execute(
+        select(Deck)
+        .where(Deck.id == deck_id)
+        .options(selectinload(Deck.cards).selectinload(DeckCard.card))  # type: ignore[arg-type]
+    )
+    deck = result.scalar_one_or_none()
+    if not deck:
+        raise HTTPException(status_code=404, detail="Deck not found")
+    if deck.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if min_lands > max_lands:
+        raise HTTPException(
+            status_code=400, detail="min_lands must not exceed max_lands"
+        )
+
+    policy = MulliganPolicy(
+        min_lands=min_lands, max_lands=max_lands, max_mulligans=max_mulligans
+    )
+    # CPU-bound numpy work (a 100k-game run is a few hundred ms) — off the
+    # event loop so other requests keep being served meanwhile.
+    return await run_in_threadpool(
+        simulate_games,
+        deck_arrays(deck),
+        games=games,
+        turns=turns,
+        on_the_play=on_the_play,
+        policy=policy,
+        seed=seed,
+    )
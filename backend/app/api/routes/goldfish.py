@@ -1,12 +1,14 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from app.api.deps import get_current_user
 from app.core.db import get_db
+from app.core.etag import etag_matches, make_etag, not_modified
 from app.models.card import Card
 from app.models.deck import Deck
 from app.models.goldfish import (
     GameState,
     GoldfishNode,
+    GoldfishNodeClone,
     GoldfishNodeCreate,
     GoldfishNodePublic,
     GoldfishSession,
@@ -14,17 +16,39 @@ from app.models.goldfish import (
     GoldfishSessionPublic,
 )
 from app.models.user import User
-from app.schemas.goldfish import GoldfishSessionTree
+from app.schemas.goldfish import (
+    GoldfishNodePage,
+    GoldfishNodeSkeleton,
+    GoldfishSessionSkeleton,
+    GoldfishSessionTree,
+)
 from app.services.goldfish import (
     apply_action,
     build_initial_state,
     draw_card,
     draw_opening_hand,
 )
-from fastapi import APIRouter, Depends, HTTPException
+from app.services.goldfish_storage import (
+    CardCodec,
+    card_dictionary,
+    encode_state,
+    node_state,
+    node_state_cache,
+    session_states,
+    stored_node,
+)
+from app.services.goldfish_tree import (
+    clone_subtree,
+    count_descendants,
+    delete_subtree,
+    descendants,
+    path_to_root,
+)
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
-from sqlmodel import select
+from sqlmodel import col, select
 
 router = APIRouter()
 
@@ -43,6 +67,52 @@ async def _get_owned_session(
     return session
 
 
+async def _get_owned_node(
+    node_id: int, db: AsyncSession, current_user: User
+) -> tuple[GoldfishNode, GoldfishSession]:
+    result = await db.execute(select(GoldfishNode).where(GoldfishNode.id == node_id))
+    node = result.scalar_one_or_none()
+    if not node:
+        raise HTTPException(status_code=404, detail="Node not found")
+    session = await _get_owned_session(node.session_id, db, current_user)
+    return node, session
+
+
+async def _skeleton(db: AsyncSession, session_id: int) -> dict[Optional[int], list]:
+    """
+    The session's nodes without state, trackers or deltas — (id, parent_id,
+    label, turn_number, order_index) rows — grouped by parent_id, each
+    group in sibling order.
+    """
+    result = await db.execute(
+        select(
+            GoldfishNode.id,
+            GoldfishNode.parent_id,
+            GoldfishNode.label,
+            GoldfishNode.turn_number,
+            GoldfishNode.order_index,
+        )
+        .where(GoldfishNode.session_id == session_id)
+        .order_by(col(GoldfishNode.order_index), col(GoldfishNode.id))
+    )
+    children_by_parent: dict[Optional[int], list] = {}
+    for row in result.all():
+        children_by_parent.setdefault(row.parent_id, []).append(row)
+    return children_by_parent
+
+
+def _with_state(
+    node: GoldfishNode, states: str, state: Optional[dict], codec: CardCodec
+) -> GoldfishNodePublic:
+    if states == "full":
+        update = {"state": state, "delta": None}
+    elif states == "compact":
+        update = stored_node(node, codec)
+    else:
+        update = {"state": None, "delta": None}
+    return GoldfishNodePublic.model_validate(node, update=update)
+
+
 @router.post("/sessions", response_model=GoldfishSessionPublic)
 async def create_session(
     session_in: GoldfishSessionCreate,
@@ -86,24 +156,27 @@ async def create_session(
                 detail="Opponent deck must be the same format as the primary deck",
             )
 
+    initial_state = build_initial_state(deck, opponent_deck)
     db_session = GoldfishSession(
         deck_id=session_in.deck_id,
         opponent_deck_id=session_in.opponent_deck_id,
         user_id=current_user.id,
         name=session_in.name or f"{deck.title} practice session",
+        card_ids=card_dictionary(initial_state),
     )
     db.add(db_session)
     await db.commit()
     await db.refresh(db_session)
+    codec = CardCodec(db_session.card_ids)
 
-    initial_state = build_initial_state(deck, opponent_deck)
+    root_state = initial_state.model_dump(mode="json")
     root_node = GoldfishNode(
         session_id=db_session.id,
         parent_id=None,
         label="Game start",
         order_index=0,
         trackers={},
-        state=initial_state.model_dump(),
+        state=codec.pack_state(root_state),
     )
     db.add(root_node)
     await db.commit()
@@ -112,13 +185,18 @@ async def create_session(
     if opening_state.hand or (
         opening_state.opponent_zones and opening_state.opponent_zones.hand
     ):
+        state, delta = encode_state(
+            1, root_state, opening_state.model_dump(mode="json"), codec
+        )
         opening_node = GoldfishNode(
             session_id=db_session.id,
             parent_id=root_node.id,
             label=opening_label,
             order_index=0,
             trackers={},
-            state=opening_state.model_dump(),
+            state=state,
+            delta=delta,
+            depth=1,
         )
         db.add(opening_node)
         await db.commit()
@@ -146,20 +224,154 @@ async def list_sessions(
 @router.get("/sessions/{session_id}", response_model=GoldfishSessionTree)
 async def get_session_tree(
     session_id: int,
+    request: Request,
+    response: Response,
+    states: Literal["full", "compact"] = "full",
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Full tree for a session: the session plus every node, flat — the client
-    reconstructs the tree from each node's parent_id.
+    reconstructs the tree from each node's parent_id. Honors If-None-Match
+    against the session's revision, so an unchanged tree is a 304 without
+    loading any node state.
+
+    `states=full` (the default) gives every node its complete game state,
+    reconstructed from keyframes and deltas server-side. `states=compact`
+    sends nodes as stored — `state` on keyframes only, `delta` on the rest
+    (see app/services/goldfish_storage.py) — for clients that replay deltas
+    themselves; a fraction of the payload on long sessions. Either way card
+    ids are decoded from the session's card dictionary.
     """
     session = await _get_owned_session(session_id, db, current_user)
+    etag = make_etag("session", session.id, session.revision, states)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
 
     result = await db.execute(
         select(GoldfishNode).where(GoldfishNode.session_id == session_id)
     )
     nodes = result.scalars().all()
-    return GoldfishSessionTree(session=session, nodes=nodes)
+    codec = CardCodec(session.card_ids)
+    full = session_states(nodes, codec) if states == "full" else {}
+    return GoldfishSessionTree(
+        session=session,
+        nodes=[_with_state(node, states, full.get(node.id), codec) for node in nodes],
+    )
+
+
+@router.get("/sessions/{session_id}/skeleton", response_model=GoldfishSessionSkeleton)
+async def get_session_skeleton(
+    session_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    The session's tree shape only: every node's id, parent, label, turn,
+    sibling order, depth and child count — no game states — in one narrow
+    query, so even sessions with thousands of branches open at once. Fetch
+    states on demand with GET /nodes/{id} (one node) or
+    GET /nodes/{id}/subtree (a branch, optionally depth-limited). ETag'd on
+    the session revision like the full tree.
+    """
+    session = await _get_owned_session(session_id, db, current_user)
+    etag = make_etag("skeleton", session.id, session.revision)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+
+    children_by_parent = await _skeleton(db, session_id)
+    nodes: list[GoldfishNodeSkeleton] = []
+    # Depth computed from parent links rather than read from the column,
+    # which nodes from before it existed all have as 0.
+    level = [(row, 0) for row in children_by_parent.get(None, [])]
+    while level:
+        next_level = []
+        for row, depth in level:
+            children = children_by_parent.get(row.id, [])
+            nodes.append(
+                GoldfishNodeSkeleton(
+                    id=row.id,
+                    parent_id=row.parent_id,
+                    label=row.label,
+                    turn_number=row.turn_number,
+                    order_index=row.order_index,
+                    depth=depth,
+                    child_count=len(children),
+                )
+            )
+            next_level.extend((child, depth + 1) for child in children)
+        level = next_level
+    return GoldfishSessionSkeleton(session=session, nodes=nodes)
+
+
+@router.get("/nodes/{node_id}", response_model=GoldfishNodePublic)
+async def get_node(
+    node_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """One node with its full game state, reconstructed if it's stored as a
+    delta."""
+    node, session = await _get_owned_node(node_id, db, current_user)
+    codec = CardCodec(session.card_ids)
+    return _with_state(node, "full", await node_state(db, node, codec), codec)
+
+
+@router.get("/nodes/{node_id}/subtree", response_model=GoldfishNodePage)
+async def get_subtree(
+    node_id: int,
+    max_depth: Optional[int] = Query(default=None, ge=0),
+    limit: int = Query(default=200, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    states: Literal["full", "compact", "none"] = "full",
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    A node and its descendants, breadth-first (by depth below the node, then
+    id), at most `max_depth` levels down when given — e.g. `max_depth=2`
+    for the window the client is about to expand into view. Paginated:
+    pass `next_cursor` back as `cursor`. `states` is as for the full tree,
+    plus `none` for nodes without game states. One recursive query over
+    just this branch (app/services/goldfish_tree.py), however large the
+    rest of the session is.
+    """
+    node, session = await _get_owned_node(node_id, db, current_user)
+    after: Optional[tuple[int, int]] = None
+    if cursor:
+        try:
+            depth, last_id = cursor.split(".")
+            after = (int(depth), int(last_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    tree = descendants(node.id, max_depth)
+    query = (
+        select(GoldfishNode, tree.c.level)
+        .join(tree, col(GoldfishNode.id) == tree.c.id)
+        .order_by(tree.c.level, col(GoldfishNode.id))
+        .limit(limit + 1)
+    )
+    if after is not None:
+        query = query.where(tuple_(tree.c.level, col(GoldfishNode.id)) > after)
+    rows = (await db.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1].level}.{rows[-1][0].id}"
+
+    codec = CardCodec(session.card_ids)
+    nodes = []
+    # Parents come before children, so each full state after the first
+    # level is one delta from a state just cached.
+    for row, _level in rows:
+        state = await node_state(db, row, codec) if states == "full" else None
+        nodes.append(_with_state(row, states, state, codec))
+    return GoldfishNodePage(nodes=nodes, next_cursor=next_cursor)
 
 
 @router.post("/sessions/{session_id}/nodes", response_model=GoldfishNodePublic)
@@ -182,7 +394,7 @@ async def add_node(
     unless a `next_turn` action bumps it or the caller explicitly overrides it.
     `next_turn` also auto-draws a card for the turn, same as clicking Draw.
     """
-    await _get_owned_session(session_id, db, current_user)
+    session = await _get_owned_session(session_id, db, current_user)
 
     parent_node = None
     if node_in.parent_id is not None:
@@ -197,22 +409,24 @@ async def add_node(
 
     label = node_in.label
     new_state: Optional[dict] = None
+    codec = CardCodec(session.card_ids)
+    parent_state = await node_state(db, parent_node, codec) if parent_node else None
     turn_number = node_in.turn_number
     if turn_number is None and parent_node is not None:
         turn_number = parent_node.turn_number
 
     if node_in.action is not None:
-        if not parent_node or not parent_node.state:
+        if not parent_state:
             raise HTTPException(
                 status_code=400,
                 detail="Parent node has no game state to apply this action to",
             )
-        parent_state = GameState(**parent_node.state)
+        parent_game = GameState(**parent_state)
 
         if node_in.action.type == "next_turn":
             turn_number = (parent_node.turn_number or 0) + 1
-            drawn_state, drawn_card_id = draw_card(parent_state)
-            new_state = drawn_state.model_dump()
+            drawn_state, drawn_card_id = draw_card(parent_game)
+            new_state = drawn_state.model_dump(mode="json")
             if drawn_card_id:
                 name_result = await db.execute(
                     select(Card.name).where(Card.id == drawn_card_id)
@@ -224,20 +438,20 @@ async def add_node(
             label = node_in.label or default_label
         else:
             all_card_ids = {
-                *parent_state.library,
-                *parent_state.hand,
-                *parent_state.battlefield,
-                *parent_state.graveyard,
-                *parent_state.exile,
+                *parent_game.library,
+                *parent_game.hand,
+                *parent_game.battlefield,
+                *parent_game.graveyard,
+                *parent_game.exile,
                 *(
                     {
-                        *parent_state.opponent_zones.library,
-                        *parent_state.opponent_zones.hand,
-                        *parent_state.opponent_zones.battlefield,
-                        *parent_state.opponent_zones.graveyard,
-                        *parent_state.opponent_zones.exile,
+                        *parent_game.opponent_zones.library,
+                        *parent_game.opponent_zones.hand,
+                        *parent_game.opponent_zones.battlefield,
+                        *parent_game.opponent_zones.graveyard,
+                        *parent_game.opponent_zones.exile,
                     }
-                    if parent_state.opponent_zones
+                    if parent_game.opponent_zones
                     else set()
                 ),
             }
@@ -250,17 +464,17 @@ async def add_node(
 
             try:
                 resulting_state, auto_label = apply_action(
-                    parent_state, node_in.action, card_names
+                    parent_game, node_in.action, card_names
                 )
             except ValueError as e:
                 raise HTTPException(status_code=400, detail=str(e))
 
-            new_state = resulting_state.model_dump()
+            new_state = resulting_state.model_dump(mode="json")
             label = node_in.label or auto_label
-    elif parent_node and parent_node.state:
+    elif parent_state:
         # A freeform note under a 3b node carries the state forward unchanged
         # — nothing happened to the game, so nothing should be lost.
-        new_state = parent_node.state
+        new_state = parent_state
 
     if not label:
         raise HTTPException(
@@ -274,6 +488,8 @@ async def add_node(
     )
     order_index = len(siblings_result.scalars().all())
 
+    depth = parent_node.depth + 1 if parent_node else 0
+    state, delta = encode_state(depth, parent_state, new_state, codec)
     db_node = GoldfishNode(
         session_id=session_id,
         parent_id=node_in.parent_id,
@@ -281,12 +497,19 @@ async def add_node(
         turn_number=turn_number,
         order_index=order_index,
         trackers=node_in.trackers or {},
-        state=new_state,
+        state=state,
+        delta=delta,
+        depth=depth,
     )
     db.add(db_node)
+    session.revision = GoldfishSession.revision + 1
+    db.add(session)
     await db.commit()
     await db.refresh(db_node)
-    return db_node
+    if new_state is not None:
+        # The next action is usually applied to this node; save it the walk.
+        node_state_cache.put(db_node.id, new_state)
+    return _with_state(db_node, "full", new_state, codec)
 
 
 @router.delete("/nodes/{node_id}")
@@ -296,31 +519,83 @@ async def delete_node(
     current_user: User = Depends(get_current_user),
 ):
     """
-    Prune a branch: deletes the node and every descendant.
+    Prune a branch: deletes the node and every descendant in a single
+    recursive DELETE.
     """
-    result = await db.execute(select(GoldfishNode).where(GoldfishNode.id == node_id))
-    node = result.scalar_one_or_none()
-    if not node:
-        raise HTTPException(status_code=404, detail="Node not found")
+    node, session = await _get_owned_node(node_id, db, current_user)
+    deleted = await delete_subtree(db, node.id)
+    node_state_cache.evict(deleted)
+    session.revision = GoldfishSession.revision + 1
+    db.add(session)
+    await db.commit()
+    return {"status": "ok", "deleted": len(deleted)}
 
-    await _get_owned_session(node.session_id, db, current_user)
 
-    all_nodes_result = await db.execute(
-        select(GoldfishNode).where(GoldfishNode.session_id == node.session_id)
+@router.get("/nodes/{node_id}/path", response_model=List[GoldfishNodeSkeleton])
+async def get_node_path(
+    node_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """The node's ancestors from the root down to the node itself, without
+    game states — e.g. for a breadcrumb, or to expand a deep-linked node."""
+    node, _session = await _get_owned_node(node_id, db, current_user)
+    return [
+        GoldfishNodeSkeleton(
+            id=row.id,
+            parent_id=row.parent_id,
+            label=row.label,
+            turn_number=row.turn_number,
+            order_index=row.order_index,
+            depth=depth,
+        )
+        for depth, row in enumerate(await path_to_root(db, node.id))
+    ]
+
+
+@router.get("/nodes/{node_id}/descendants/count")
+async def get_descendant_count(
+    node_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """How many nodes are in the branch below this one."""
+    node, _session = await _get_owned_node(node_id, db, current_user)
+    return {"node_id": node.id, "count": await count_descendants(db, node.id)}
+
+
+@router.post("/nodes/{node_id}/clone", response_model=GoldfishNodePublic)
+async def clone_node(
+    node_id: int,
+    clone_in: GoldfishNodeClone,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Copies the node and its whole branch under `parent_id` — by default
+    beside the original (same parent), as a new branch to explore from
+    there; `parent_id: null` makes it a new top-level node. Returns the
+    copy of `node_id`, with its full state.
+    """
+    node, session = await _get_owned_node(node_id, db, current_user)
+    parent_id = (
+        clone_in.parent_id if "parent_id" in clone_in.model_fields_set else node.parent_id
     )
-    all_nodes = all_nodes_result.scalars().all()
-    children_by_parent: dict[Optional[int], list[GoldfishNode]] = {}
-    for n in all_nodes:
-        children_by_parent.setdefault(n.parent_id, []).append(n)
-
-    to_delete: list[GoldfishNode] = []
-    queue = [node]
-    while queue:
-        current = queue.pop()
-        to_delete.append(current)
-        queue.extend(children_by_parent.get(current.id, []))
-
-    for n in to_delete:
-        await db.delete(n)
+    parent: Optional[GoldfishNode] = None
+    if parent_id is not None:
+        parent = await db.get(GoldfishNode, parent_id)
+        if parent is None or parent.session_id != session.id:
+            raise HTTPException(status_code=404, detail="Parent node not found")
+        path = await path_to_root(db, parent.id)
+        if any(row.id == node.id for row in path):
+            raise HTTPException(
+                status_code=400, detail="Can't clone a branch into itself"
+            )
+
+    codec = CardCodec(session.card_ids)
+    copy = await clone_subtree(db, node, parent, codec)
+    session.revision = GoldfishSession.revision + 1
+    db.add(session)
     await db.commit()
-    return {"status": "ok", "deleted": len(to_delete)}
+    await db.refresh(copy)
+    return _with_state(copy, "full", await node_state(db, copy, codec), codec)
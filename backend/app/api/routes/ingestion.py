@@ -0,0 +1,48 @@
+from typing import Optional
+
+from app.ai.ingestion.worker import job_intervals
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.db import get_db
+from app.models.ingestion import IngestionLock, IngestionRun
+from app.models.user import User
+from app.schemas.ingestion import IngestionJobStatus, IngestionStatus
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+router = APIRouter()
+
+
+async def _latest_run(db: AsyncSession, job: str, status: Optional[str] = None):
+    statement = select(IngestionRun).where(IngestionRun.job == job)
+    if status is not None:
+        statement = statement.where(IngestionRun.status == status)
+    result = await db.execute(statement.order_by(col(IngestionRun.id).desc()).limit(1))
+    return result.scalars().first()
+
+
+@router.get("/status", response_model=IngestionStatus)
+async def get_ingestion_status(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Per-job view of background ingestion (see app/ai/ingestion/worker.py):
+    who holds the lock, the latest run — its checkpoint and report double as
+    live progress while it's still running, including per-stage throughput —
+    and the latest successful run.
+    """
+    jobs = {}
+    for job, interval_hours in job_intervals().items():
+        lock = await db.get(IngestionLock, job)
+        jobs[job] = IngestionJobStatus(
+            interval_hours=interval_hours,
+            lock_owner=lock.owner if lock else None,
+            lock_expires_at=lock.expires_at if lock else None,
+            last_run=await _latest_run(db, job),
+            last_success=await _latest_run(db, job, "succeeded"),
+        )
+    return IngestionStatus(
+        schedule_enabled=settings.INGESTION_SCHEDULE_ENABLED, jobs=jobs
+    )
@@ -19,6 +19,45 @@ class Settings(BaseSettings):
     
     # External APIs
     SCRYFALL_BASE_URL: str = "https://api.scryfall.com"
+    # Scryfall asks for 50-100ms between requests (~10/s); the token bucket
+    # in app/services/scryfall.py allows short bursts on top of that rate.
+    SCRYFALL_REQUESTS_PER_SECOND: float = 10.0
+    SCRYFALL_BURST: int = 10
+    SCRYFALL_MAX_RETRIES: int = 3
+    # Response cache (app/services/cache.py): an in-process LRU, plus an
+    # optional SQLite file shared by every worker and kept across restarts.
+    SCRYFALL_CACHE_MAX_ENTRIES: int = 5000
+    SCRYFALL_CACHE_PATH: Optional[str] = None
+    # Row cap for the SQLite tier (least recently used rows go first) and how
+    # often it sweeps out expired rows nobody has read since.
+    SCRYFALL_DISK_CACHE_MAX_ENTRIES: int = 100_000
+    SCRYFALL_DISK_CACHE_PURGE_INTERVAL_SECONDS: float = 600.0
+    SCRYFALL_SEARCH_CACHE_TTL_SECONDS: float = 3600.0
+    SCRYFALL_RULINGS_CACHE_TTL_SECONDS: float = 86400.0
+    # Local Scryfall-syntax search (app/services/card_query.py): evaluate
+    # filters as numpy masks over the in-process card catalog
+    # (app/services/card_catalog.py) instead of compiling them to SQL.
+    CARD_CATALOG_ENABLED: bool = True
+    # Deck stats draw odds (app/services/probability.py): the last turn in the
+    # land-odds grid and the latest turn a draw-odds request may ask about.
+    STATS_MAX_TURN: int = 15
+    # Goldfish node storage (app/services/goldfish_storage.py): a full state
+    # snapshot every N plies, compact deltas from the parent in between; 1
+    # stores a full snapshot on every node.
+    GOLDFISH_KEYFRAME_INTERVAL: int = 16
+    GOLDFISH_STATE_CACHE_MAX_ENTRIES: int = 2048
+
+    # Background ingestion (app/ai/ingestion/worker.py). Off by default: when
+    # enabled, every API process runs the scheduler loop, and the per-job
+    # lease lock makes sure only one of them ingests at a time.
+    INGESTION_SCHEDULE_ENABLED: bool = False
+    INGESTION_POLL_SECONDS: float = 300.0
+    INGESTION_LOCK_LEASE_SECONDS: float = 600.0
+    INGESTION_RETRY_MINUTES: float = 30.0
+    INGESTION_WORKERS: Optional[int] = None  # transform processes; None = per core
+    SCRYFALL_BULK_TYPE: str = "default_cards"
+    SCRYFALL_INGESTION_INTERVAL_HOURS: float = 24.0  # 0 disables the job
+    RULES_INGESTION_INTERVAL_HOURS: float = 168.0
 
     # AI Configuration
     CHROMA_HOST: str = "localhost"
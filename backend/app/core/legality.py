@@ -0,0 +1,68 @@
+from typing import Dict, Optional, Tuple
+
+# Scryfall's format keys, each owning one bit of the Card legality masks.
+# Append-only: a bit's position is baked into every stored mask, so new
+# formats go at the end and retired ones keep their slot.
+FORMATS: Tuple[str, ...] = (
+    "standard", "future", "historic", "timeless", "gladiator", "pioneer",
+    "explorer", "modern", "legacy", "pauper", "vintage", "penny", "commander",
+    "oathbreaker", "standardbrawl", "brawl", "alchemy", "paupercommander",
+    "duel", "oldschool", "premodern", "predh",
+)
+FORMAT_BITS: Dict[str, int] = {fmt: 1 << i for i, fmt in enumerate(FORMATS)}
+
+# Deck-format names people actually type, for the ones that aren't already
+# a Scryfall key once lowercased and de-spaced.
+_ALIASES = {
+    "edh": "commander",
+    "pdh": "paupercommander",
+    "pauperedh": "paupercommander",
+    "historicbrawl": "brawl",
+    "pennydreadful": "penny",
+    "duelcommander": "duel",
+}
+
+
+def format_key(name: Optional[str]) -> Optional[str]:
+    """Scryfall format key for a deck's format name ("Pauper EDH" ->
+    "paupercommander"), or None if it isn't a format Scryfall tracks."""
+    if not name:
+        return None
+    key = "".join(name.lower().split()).replace("-", "")
+    key = _ALIASES.get(key, key)
+    return key if key in FORMAT_BITS else None
+
+
+def legality_masks(legalities: Optional[Dict[str, str]]) -> Dict[str, int]:
+    """
+    Scryfall's per-format legality dict packed into the three Card mask
+    columns. `legal_mask` has a bit for every format the card may be played
+    in (restricted included); `restricted_mask` and `banned_mask` single out
+    those statuses. A format in none of them is "not_legal".
+    """
+    masks = {"legal_mask": 0, "restricted_mask": 0, "banned_mask": 0}
+    for fmt, status in (legalities or {}).items():
+        bit = FORMAT_BITS.get(fmt)
+        if bit is None:
+            continue
+        if status in ("legal", "restricted"):
+            masks["legal_mask"] |= bit
+        if status == "restricted":
+            masks["restricted_mask"] |= bit
+        elif status == "banned":
+            masks["banned_mask"] |= bit
+    return masks
+
+
+def legality_status(
+    fmt: str, legal_mask: int, restricted_mask: int, banned_mask: int
+) -> str:
+    """A card's Scryfall-style status string in `fmt` (a format key)."""
+    bit = FORMAT_BITS[fmt]
+    if restricted_mask & bit:
+        return "restricted"
+    if legal_mask & bit:
+        return "legal"
+    if banned_mask & bit:
+        return "banned"
+    return "not_legal"
@@ -0,0 +1,94 @@
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+COLORS = ("W", "U", "B", "R", "G")
+
+_SYMBOL_RE = re.compile(r"\{([^}]*)\}")
+
+# Variable costs count as 0 toward mana value everywhere except on the stack.
+_VARIABLE_SYMBOLS = {"X", "Y", "Z"}
+
+
+@dataclass(frozen=True)
+class ManaCost:
+    """
+    A parsed Scryfall mana cost string. `pips` counts plain single-color
+    symbols only ({W}, {C}, ...) — hybrid and Phyrexian symbols are kept
+    separately in `hybrid`/`phyrexian` (as their raw symbol text) since they
+    don't demand one specific color the way a plain pip does. Treat instances
+    as read-only: they're shared by every card with the same cost string.
+    """
+
+    generic: int = 0
+    pips: Dict[str, int] = field(default_factory=dict)
+    hybrid: Tuple[str, ...] = ()
+    phyrexian: Tuple[str, ...] = ()
+    x_count: int = 0
+    mana_value: float = 0.0
+
+    def pips_of(self, color: str) -> int:
+        return self.pips.get(color, 0)
+
+
+def _symbol_value(symbol: str) -> float:
+    if symbol.isdigit():
+        return float(symbol)
+    if symbol in _VARIABLE_SYMBOLS:
+        return 0.0
+    if symbol.startswith("H"):  # half mana, e.g. {HW} (Un-sets)
+        return 0.5
+    if symbol == "½":
+        return 0.5
+    if "/" in symbol:
+        # {2/W} costs 2 toward mana value; every other hybrid/Phyrexian
+        # symbol ({W/U}, {W/P}, {W/U/P}) costs 1.
+        first = symbol.split("/", 1)[0]
+        return float(first) if first.isdigit() else 1.0
+    if symbol == "∞":
+        return 0.0
+    return 1.0
+
+
+@lru_cache(maxsize=8192)
+def parse_mana_cost(mana_cost: Optional[str]) -> ManaCost:
+    """
+    Parses a cost string like "{2}{W/U}{B}" once; repeat calls with the same
+    string are served from the LRU cache. The distinct cost strings across
+    all of Magic number in the low thousands, so in practice every consumer
+    (stats, the simulator, AI context) shares one parse per cost for the
+    life of the process. Split-card costs ("{1}{R} // {3}{U}") are summed,
+    matching Scryfall's combined mana value for those layouts.
+    """
+    if not mana_cost:
+        return ManaCost()
+
+    generic = 0
+    pips: Dict[str, int] = {}
+    hybrid = []
+    phyrexian = []
+    x_count = 0
+    mana_value = 0.0
+
+    for symbol in _SYMBOL_RE.findall(mana_cost.upper()):
+        mana_value += _symbol_value(symbol)
+        if symbol.isdigit():
+            generic += int(symbol)
+        elif symbol in _VARIABLE_SYMBOLS:
+            x_count += 1
+        elif symbol.endswith("/P"):
+            phyrexian.append(symbol)
+        elif "/" in symbol:
+            hybrid.append(symbol)
+        elif symbol in COLORS or symbol == "C":
+            pips[symbol] = pips.get(symbol, 0) + 1
+
+    return ManaCost(
+        generic=generic,
+        pips=pips,
+        hybrid=tuple(hybrid),
+        phyrexian=tuple(phyrexian),
+        x_count=x_count,
+        mana_value=mana_value,
+    )
@@ -1,11 +1,18 @@
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 
 import httpx
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
+from app.ai.ingestion.worker import run_scheduler
 from app.api.api import api_router
 from app.core.config import settings
+from app.core.logging import logger
+from app.services.card_catalog import card_catalog
+from app.services.card_index import card_name_index
+from app.services.goldfish_storage import node_state_cache
 
 
 @asynccontextmanager
@@ -18,7 +25,31 @@ async def lifespan(app: FastAPI):
     app.state.scryfall_client = httpx.AsyncClient(
         base_url=settings.SCRYFALL_BASE_URL, timeout=30.0
     )
+    # Card-name typeahead index and columnar catalog, built up front with
+    # their own sessions; if the DB isn't reachable yet, the first search
+    # that needs one builds it instead.
+    card_name_index.reset()
+    card_catalog.reset()
+    snapshots = [card_name_index] + ([card_catalog] if settings.CARD_CATALOG_ENABLED else [])
+    for snapshot in snapshots:
+        try:
+            await snapshot.refresh()
+        except Exception:
+            logger.exception(f"Building {type(snapshot).__name__} at startup failed")
+    # Reconstructed goldfish node states, filled as nodes are read.
+    node_state_cache.clear()
+    # Scheduled Scryfall/rules ingestion, when enabled; every process may
+    # run this, the per-job lease lock keeps them from ingesting twice.
+    scheduler = (
+        asyncio.create_task(run_scheduler())
+        if settings.INGESTION_SCHEDULE_ENABLED
+        else None
+    )
     yield
+    if scheduler is not None:
+        scheduler.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await scheduler
     await app.state.scryfall_client.aclose()
 
 
@@ -1,7 +1,10 @@
 from app.models.card import Card as Card
 from app.models.deck import Deck as Deck
 from app.models.deck import DeckCard as DeckCard
+from app.models.deck import DeckStats as DeckStats
 from app.models.user import User as User
 from app.models.collection import CollectionCard as CollectionCard
 from app.models.goldfish import GoldfishSession as GoldfishSession
 from app.models.goldfish import GoldfishNode as GoldfishNode
+from app.models.ingestion import IngestionLock as IngestionLock
+from app.models.ingestion import IngestionRun as IngestionRun
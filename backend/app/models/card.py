@@ -1,6 +1,10 @@
 from typing import Any, Dict, List, Optional
+from sqlalchemy import BigInteger, event
 from sqlmodel import Field, SQLModel, Column, JSON
 
+from app.core.legality import legality_masks, legality_status
+from app.core.mana import ManaCost, parse_mana_cost
+
 class CardBase(SQLModel):
     id: str = Field(primary_key=True)
     name: str
@@ -19,4 +23,38 @@ class CardBase(SQLModel):
     card_faces: Optional[List[Dict[str, Any]]] = Field(default=None, sa_column=Column(JSON))
 
 class Card(CardBase, table=True):
-    pass
+    # Hash of the row's Scryfall-derived columns (see card_store.card_row),
+    # so bulk re-ingestion can skip rows whose content hasn't changed.
+    content_hash: Optional[str] = Field(default=None, max_length=40)
+    # Search-only columns backing the local Scryfall-syntax engine
+    # (app/services/card_query.py): `id:` filters and `mv`/`cmc` comparisons.
+    # Scryfall's own `color_identity` and `cmc`, not derived from mana_cost,
+    # since both account for faces and rules text the cost doesn't show.
+    color_identity: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
+    mana_value: Optional[float] = Field(default=None, index=True)
+    # `legalities` packed one bit per format (see app/core/legality.py),
+    # so format checks are integer tests in SQL rather than JSON lookups.
+    # Derived from `legalities` — by card_row for bulk writes, and by the
+    # listener below for ORM inserts/updates.
+    legal_mask: int = Field(default=0, sa_type=BigInteger)
+    restricted_mask: int = Field(default=0, sa_type=BigInteger)
+    banned_mask: int = Field(default=0, sa_type=BigInteger)
+
+    @property
+    def mana(self) -> ManaCost:
+        """Parsed `mana_cost`, shared via parse_mana_cost's LRU cache — read
+        this instead of re-scanning the cost string."""
+        return parse_mana_cost(self.mana_cost)
+
+    def legality(self, fmt: str) -> str:
+        """Status string ("legal", "banned", ...) in a Scryfall format key."""
+        return legality_status(
+            fmt, self.legal_mask or 0, self.restricted_mask or 0, self.banned_mask or 0
+        )
+
+
+@event.listens_for(Card, "before_insert")
+@event.listens_for(Card, "before_update")
+def _sync_legality_masks(mapper, connection, card: Card) -> None:
+    for key, value in legality_masks(card.legalities).items():
+        setattr(card, key, value)
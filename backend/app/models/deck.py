@@ -1,8 +1,17 @@
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
-from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy import Index
+from sqlmodel import JSON, Column, Field, Relationship, SQLModel
 
 from app.models.card import Card
 
+
+def _utcnow_naive() -> datetime:
+    """Naive UTC datetime, matching the migration's TIMESTAMP WITHOUT TIME ZONE
+    column."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class DeckCardBase(SQLModel):
     card_id: str = Field(primary_key=True)  # Scryfall ID
     quantity: int = 1
@@ -33,6 +42,18 @@ class DeckBase(SQLModel):
 
 class Deck(DeckBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    # Bumped by every write route that changes what GET /decks/{id} would
+    # return; the deck's ETag is derived from it (app/core/etag.py).
+    revision: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Bumped (by app/services/card_store.py) whenever one of the deck's
+    # cards changes content — a ban, an errata — which the payload embeds
+    # but `revision` doesn't see; also part of the ETag.
+    cards_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # Set alongside `revision`; orders the paginated deck summary list, whose
+    # keyset cursor is (updated_at, id) — see app/services/deck_summary.py.
+    updated_at: datetime = Field(default_factory=_utcnow_naive)
+
+    __table_args__ = (Index("ix_deck_user_id_updated_at", "user_id", "updated_at", "id"),)
 
     # Relationships
     cards: List[DeckCard] = Relationship(
@@ -40,6 +61,24 @@ class Deck(DeckBase, table=True):
     )
 
 
+class DeckStats(SQLModel, table=True):
+    """
+    Persisted stats snapshot for one deck: the additive counters from
+    app/services/stats.py's empty_totals(), kept current by applying each
+    edit's per-card delta rather than recounting, so reading a deck's stats
+    is a single-row lookup. `version` bumps on every applied change.
+    """
+
+    deck_id: int = Field(foreign_key="deck.id", primary_key=True, ondelete="CASCADE")
+    version: int = 0
+    totals: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    # card_id -> the Card content_hash each mainboard card was counted at
+    # (see card_stamp in app/services/deck_stats.py). A card re-hashed since,
+    # by ingestion or a sync, means its counted contribution is stale and the
+    # snapshot is rebuilt. None for snapshots from before this was tracked.
+    card_hashes: Optional[Dict[str, str]] = Field(default=None, sa_column=Column(JSON))
+
+
 class DeckCreate(DeckBase):
     user_id: Optional[int] = None  # derived server-side from the authenticated user
     cards: Optional[List[DeckCardCreate]] = None
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
-from typing import Dict, List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Tuple, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from sqlmodel import Column, Field, JSON, SQLModel
 
 
@@ -14,34 +14,51 @@ def _utcnow_naive() -> datetime:
 ZONES = ("library", "hand", "battlefield", "graveyard", "exile")
 
 
+ZonesT = TypeVar("ZonesT", bound="Zones")
+
+
 class Zones(BaseModel):
     """
     One player's zones — library/hand/battlefield/graveyard/exile as ordered
-    card_id lists. Split out of `GameState` in Phase 3d so a second player's
+    card_id sequences. Split out of `GameState` in Phase 3d so a second player's
     zones can be nested as `GameState.opponent_zones` without duplicating
     this shape.
+
+    Immutable: zones are tuples and the model is frozen, so a changed
+    snapshot is built with `replace`, which shares every untouched zone
+    (and, on a `GameState`, the other player's zones) with the original
+    instead of deep-copying the whole state per action. Stored JSON still
+    holds plain lists; they parse into tuples.
     """
 
-    library: List[str] = []
-    hand: List[str] = []
-    battlefield: List[str] = []
-    graveyard: List[str] = []
-    exile: List[str] = []
+    model_config = ConfigDict(frozen=True)
+
+    library: Tuple[str, ...] = ()
+    hand: Tuple[str, ...] = ()
+    battlefield: Tuple[str, ...] = ()
+    graveyard: Tuple[str, ...] = ()
+    exile: Tuple[str, ...] = ()
 
-    def zone(self, name: str) -> List[str]:
+    def zone(self, name: str) -> Tuple[str, ...]:
         if name not in ZONES:
             raise ValueError(f"Unknown zone: {name}")
         return getattr(self, name)
 
+    def replace(self: ZonesT, **changes) -> ZonesT:
+        """A copy with `changes` applied; every other field is shared."""
+        return self.model_copy(update=changes)
+
 
 class GameState(Zones):
     """
     A full snapshot of the goldfish game state at one node — the player's own
     zones (inherited flat from `Zones`, so every pre-3d stored state parses
     unchanged), plus life totals for both players and an optional second
-    player's zones. Stored whole on every node (not a diff), same reasoning
-    as `trackers`: reading a node's state should never require replaying
-    history.
+    player's zones. Stored whole on keyframe nodes and as a delta from the
+    parent elsewhere (app/services/goldfish_storage.py), with keyframes close
+    enough that reading any node's state replays only a few deltas, never
+    the whole history. Frozen like `Zones`; store it with
+    `model_dump(mode="json")`.
     """
 
     life_total: int = 20
@@ -72,6 +89,14 @@ class GoldfishSessionBase(SQLModel):
 class GoldfishSession(GoldfishSessionBase, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     created_at: datetime = Field(default_factory=_utcnow_naive)
+    # Bumped whenever the session's node tree changes; the tree endpoint's
+    # ETag is derived from it, same as Deck.revision.
+    revision: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    # The session's card dictionary: every card id its games can contain,
+    # fixed at creation. Node states are stored as indexes into it (see
+    # CardCodec in app/services/goldfish_storage.py); None for sessions from
+    # before dictionaries, whose nodes store card ids.
+    card_ids: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
 
 
 class GoldfishSessionCreate(SQLModel):
@@ -104,8 +129,14 @@ class GoldfishNodeBase(SQLModel):
     # life_total) — None for plain 3a free-text sessions/notes. Stored as a
     # plain dict column (not GameState directly) since SQLModel/SQLAlchemy
     # JSON columns hold JSON-serializable data, not pydantic model instances;
-    # routes parse it into GameState via GameState(**node.state) to work with it.
+    # routes parse it into GameState via GameState(**state) to work with it.
+    # Only keyframes store it: other nodes with a game state store `delta`
+    # (zone splices and life changes from the parent's state) instead, and
+    # app/services/goldfish_storage.py reconstructs their full state.
     state: Optional[Dict] = Field(default=None, sa_column=Column(JSON))
+    delta: Optional[Dict] = Field(default=None, sa_column=Column(JSON))
+    # Plies from the root; every GOLDFISH_KEYFRAME_INTERVAL-th is a keyframe.
+    depth: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
 
 class GoldfishNode(GoldfishNodeBase, table=True):
@@ -121,6 +152,11 @@ class GoldfishNodeCreate(SQLModel):
     action: Optional[GoldfishActionIn] = None
 
 
+class GoldfishNodeClone(SQLModel):
+    # Where the copy goes; omit to put it beside the original.
+    parent_id: Optional[int] = None
+
+
 class GoldfishNodePublic(GoldfishNodeBase):
     id: int
     created_at: datetime
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlmodel import Column, Field, JSON, SQLModel
+
+
+def _utcnow_naive() -> datetime:
+    """Naive UTC datetime, matching the migration's TIMESTAMP WITHOUT TIME ZONE
+    columns — asyncpg rejects a tz-aware value against a naive column."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class IngestionLock(SQLModel, table=True):
+    """
+    One row per ingestion job, held as a lease: a worker owns the job while
+    `expires_at` is in the future and keeps pushing it forward as it
+    checkpoints. A worker that dies simply stops renewing, and the next one
+    takes over once the lease lapses — no unlock step needed for crashes.
+    """
+
+    job: str = Field(primary_key=True)
+    owner: str
+    expires_at: datetime
+
+
+class IngestionRun(SQLModel, table=True):
+    """
+    One attempt at an ingestion job. `checkpoint` counts input lines whose
+    writes are already committed (it's updated in the same transaction as
+    each batch), so a run that dies mid-file can be resumed by a later one
+    against the same `source` without redoing that prefix. `report` holds
+    the run's IngestionReport — counts and per-stage throughput — and is
+    refreshed at every checkpoint, so it doubles as live progress.
+    """
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job: str = Field(index=True)
+    status: str = "running"  # running | succeeded | failed
+    worker_id: str
+    source: Optional[str] = None
+    checkpoint: int = 0
+    resumed_from: int = 0
+    report: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+    started_at: datetime = Field(default_factory=_utcnow_naive)
+    finished_at: Optional[datetime] = None
+
+
+class IngestionRunPublic(SQLModel):
+    id: int
+    job: str
+    status: str
+    worker_id: str
+    source: Optional[str]
+    checkpoint: int
+    resumed_from: int
+    report: Optional[Dict[str, Any]]
+    error: Optional[str]
+    started_at: datetime
+    finished_at: Optional[datetime]
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from app.models.deck import DeckCardPublic
+
+
+class DeckSummary(BaseModel):
+    id: int
+    title: str
+    format: Optional[str] = None
+    card_count: int  # main + commander boards
+    color_identity: List[str]  # WUBRG order
+    cover_image: Optional[str] = None
+    updated_at: datetime
+    # Only with ?include_cards=true.
+    cards: Optional[List[DeckCardPublic]] = None
+
+
+class DeckSummaryPage(BaseModel):
+    data: List[DeckSummary]
+    # Pass back as ?cursor= for the next page; None on the last one.
+    next_cursor: Optional[str] = None
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from app.models.goldfish import GoldfishNodePublic, GoldfishSessionPublic
 from pydantic import BaseModel
@@ -7,3 +7,27 @@ from pydantic import BaseModel
 class GoldfishSessionTree(BaseModel):
     session: GoldfishSessionPublic
     nodes: List[GoldfishNodePublic]
+
+
+class GoldfishNodeSkeleton(BaseModel):
+    """A node without its game state or trackers — enough to lay out and
+    label the tree; fetch a node's state with GET /goldfish/nodes/{id}."""
+
+    id: int
+    parent_id: Optional[int] = None
+    label: str
+    turn_number: Optional[int] = None
+    order_index: int
+    depth: int
+    child_count: Optional[int] = None  # None where not computed (node paths)
+
+
+class GoldfishSessionSkeleton(BaseModel):
+    session: GoldfishSessionPublic
+    nodes: List[GoldfishNodeSkeleton]
+
+
+class GoldfishNodePage(BaseModel):
+    nodes: List[GoldfishNodePublic]
+    # Pass back as ?cursor= for the next page; None on the last one.
+    next_cursor: Optional[str] = None
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+from app.models.ingestion import IngestionRunPublic
+
+
+class IngestionJobStatus(BaseModel):
+    interval_hours: float
+    lock_owner: Optional[str] = None
+    lock_expires_at: Optional[datetime] = None
+    last_run: Optional[IngestionRunPublic] = None
+    last_success: Optional[IngestionRunPublic] = None
+
+
+class IngestionStatus(BaseModel):
+    schedule_enabled: bool
+    jobs: Dict[str, IngestionJobStatus]
@@ -0,0 +1,35 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class CardLegalityIssue(BaseModel):
+    card_id: str
+    name: str
+    board: str
+    quantity: int
+    # "banned", "not_legal", or "restricted" (more than one copy of a
+    # restricted card).
+    status: str
+
+
+class DeckLegality(BaseModel):
+    deck_id: int
+    format: str  # Scryfall format key the deck was checked against
+    legal: bool
+    issues: List[CardLegalityIssue]
+
+
+class DeckViolation(BaseModel):
+    # size, sideboard, copies, legality, commander, color_identity, format
+    code: str
+    message: str
+    card_ids: List[str] = []
+
+
+class DeckValidationResult(BaseModel):
+    deck_id: int
+    title: str
+    format: Optional[str]
+    valid: bool
+    violations: List[DeckViolation]
@@ -0,0 +1,22 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class SimulatedTurn(BaseModel):
+    turn: int
+    land_drop_rate: float
+    mean_mana: float
+    mana_distribution: Dict[int, float]
+    castable_spell_rate: float
+
+
+class DeckSimulationResult(BaseModel):
+    games: int
+    turns: int
+    on_the_play: bool
+    deck_size: int
+    land_count: int
+    mulligans: Dict[int, float]
+    opening_hand_lands: Dict[int, float]
+    per_turn: List[SimulatedTurn]
@@ -0,0 +1,30 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import settings
+
+
+class LandRequirement(BaseModel):
+    # None means any land; a color letter (W/U/B/R/G/C) means lands that can
+    # produce that color, per the card's produced_mana.
+    color: Optional[Literal["W", "U", "B", "R", "G", "C"]] = None
+    at_least: int = Field(ge=0)
+
+    @field_validator("color", mode="before")
+    @classmethod
+    def _upper_color(cls, value):
+        return value.upper() if isinstance(value, str) else value
+
+
+class DrawOddsRequest(BaseModel):
+    turn: int = Field(ge=1, le=settings.STATS_MAX_TURN)
+    on_the_play: bool = True
+    requirements: List[LandRequirement]
+
+
+class DrawOddsResponse(BaseModel):
+    turn: int
+    on_the_play: bool
+    cards_seen: int
+    probability: float
@@ -0,0 +1,305 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# Sentinel TTL for entries that never expire (a Scryfall printing by id).
+NO_EXPIRY: Optional[float] = None
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    disk_evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / total if total else 0.0
+
+
+class MemoryCache:
+    """
+    Size-bounded LRU with per-entry expiry. Process-local: each uvicorn
+    worker has its own, so it's the fast tier in front of SQLiteCache rather
+    than the shared one.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value: Any, expires_at: Optional[float]) -> int:
+        """Stores `value`; returns how many entries were evicted to make room."""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        evicted = 0
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteCache:
+    """
+    On-disk tier shared by every worker process on the host and kept across
+    restarts. Values are stored as JSON (Scryfall responses already are).
+    Blocking sqlite3 calls run in a worker thread via asyncio.to_thread;
+    each call opens its own short-lived connection so no connection is ever
+    shared across threads, and WAL mode lets readers in other processes
+    proceed while one writes.
+
+    Bounded like the memory tier: past `max_entries` rows, a write evicts the
+    least recently read or written ones, and every `purge_interval` seconds
+    a write also sweeps out expired rows (which otherwise only go when their
+    own key is read again). Neither costs a table scan per call: the row
+    count is tracked per process from this process's inserts and deletes
+    and recounted at each purge (catching up with other processes' writes),
+    and read hits record their access time in memory, written back in one
+    batch by the next write or every TOUCH_BATCH hits, so reads don't
+    contend for the database's write lock.
+    """
+
+    TOUCH_BATCH = 256
+
+    def __init__(self, path: str, max_entries: int, purge_interval: float = 600.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.purge_interval = purge_interval
+        self._last_purge = 0.0
+        self._count: Optional[int] = None  # unknown until the first write recounts
+        self._touched: Dict[str, float] = {}
+        self._touch_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, "
+                "accessed_at REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache)")}
+            if "accessed_at" not in columns:
+                # A cache file from before the tier was bounded.
+                conn.execute(
+                    "ALTER TABLE cache ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0"
+                )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_accessed_at ON cache (accessed_at)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_cache_expires_at ON cache (expires_at)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def _flush_touches(self, conn: sqlite3.Connection) -> None:
+        with self._touch_lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            conn.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                [(at, key) for key, at in touched.items()],
+            )
+
+    def _get(self, key: str) -> Tuple[bool, Any, Optional[float]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False, None, None
+            value, expires_at = row
+            now = time.time()
+            if expires_at is not None and expires_at <= now:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                if self._count is not None:
+                    self._count -= 1
+                return False, None, None
+            with self._touch_lock:
+                self._touched[key] = now
+                flush = len(self._touched) >= self.TOUCH_BATCH
+            if flush:
+                self._flush_touches(conn)
+            return True, json.loads(value), expires_at
+
+    def _set(self, key: str, value: Any, expires_at: Optional[float]) -> int:
+        """Stores `value`; returns how many rows were evicted to make room."""
+        now = time.time()
+        with self._connect() as conn:
+            self._flush_touches(conn)
+            existed = conn.execute(
+                "SELECT 1 FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            if self._count is None or now - self._last_purge >= self.purge_interval:
+                self._last_purge = now
+                conn.execute(
+                    "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                    (now,),
+                )
+                (self._count,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            elif existed is None:
+                self._count += 1
+            excess = self._count - self.max_entries
+            if excess <= 0:
+                return 0
+            conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            )
+            self._count -= excess
+            return excess
+
+    def _clear(self) -> None:
+        with self._touch_lock:
+            self._touched = {}
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
+        self._count = 0
+
+    def __len__(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    async def get(self, key: str) -> Tuple[bool, Any, Optional[float]]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any, expires_at: Optional[float]) -> int:
+        return await asyncio.to_thread(self._set, key, value, expires_at)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+
+class ResponseCache:
+    """
+    Two-tier cache for Scryfall responses, keyed by namespace ("card",
+    "search", "rulings") plus the request's own key. Each namespace has its
+    own TTL — card-by-id data is immutable, searches and rulings go stale —
+    and its own hit/miss counters. A disk hit is promoted into the memory
+    tier with its original expiry.
+    """
+
+    def __init__(
+        self,
+        ttls: Dict[str, Optional[float]],
+        max_entries: int,
+        disk: Optional[SQLiteCache] = None,
+    ):
+        self.ttls = ttls
+        self.memory = MemoryCache(max_entries)
+        self.disk = disk
+        self.stats: Dict[str, CacheStats] = {ns: CacheStats() for ns in ttls}
+
+    @staticmethod
+    def _key(namespace: str, key: str) -> str:
+        return f"{namespace}:{key}"
+
+    async def get(self, namespace: str, key: str) -> Tuple[bool, Any]:
+        full_key = self._key(namespace, key)
+        stats = self.stats[namespace]
+        found, value = self.memory.get(full_key)
+        if found:
+            stats.hits += 1
+            return True, value
+        if self.disk is not None:
+            found, value, expires_at = await self.disk.get(full_key)
+            if found:
+                stats.disk_hits += 1
+                stats.evictions += self.memory.set(full_key, value, expires_at)
+                return True, value
+        stats.misses += 1
+        return False, None
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        ttl = self.ttls[namespace]
+        expires_at = None if ttl is NO_EXPIRY else time.time() + ttl
+        full_key = self._key(namespace, key)
+        self.stats[namespace].evictions += self.memory.set(full_key, value, expires_at)
+        if self.disk is not None:
+            self.stats[namespace].disk_evictions += await self.disk.set(
+                full_key, value, expires_at
+            )
+
+    async def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            await self.disk.clear()
+        self.stats = {ns: CacheStats() for ns in self.ttls}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "memory_entries": len(self.memory),
+            "max_entries": self.memory.max_entries,
+            "disk_enabled": self.disk is not None,
+            "namespaces": {
+                ns: {**asdict(s), "hit_rate": round(s.hit_rate, 4), "ttl": self.ttls[ns]}
+                for ns, s in self.stats.items()
+            },
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    The process-wide Scryfall response cache, built from settings on first
+    use (so importing this module never touches the disk).
+    """
+    global _response_cache
+    if _response_cache is None:
+        disk = (
+            SQLiteCache(
+                settings.SCRYFALL_CACHE_PATH,
+                settings.SCRYFALL_DISK_CACHE_MAX_ENTRIES,
+                settings.SCRYFALL_DISK_CACHE_PURGE_INTERVAL_SECONDS,
+            )
+            if settings.SCRYFALL_CACHE_PATH
+            else None
+        )
+        _response_cache = ResponseCache(
+            ttls={
+                "card": NO_EXPIRY,
+                "search": settings.SCRYFALL_SEARCH_CACHE_TTL_SECONDS,
+                "rulings": settings.SCRYFALL_RULINGS_CACHE_TTL_SECONDS,
+            },
+            max_entries=settings.SCRYFALL_CACHE_MAX_ENTRIES,
+            disk=disk,
+        )
+    return _response_cache
@@ -0,0 +1,329 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from app.core.legality import FORMAT_BITS
+from app.models.card import Card
+from app.services.card_index import CardSnapshot
+from app.services.card_query import MULTICOLOR, And, Node, Not, Or, Term
+
+# Bit per mana symbol; colour and identity masks use the first five,
+# produced-mana masks all six.
+SYMBOL_BITS = {"W": 1, "U": 2, "B": 4, "R": 8, "G": 16, "C": 32}
+COLOR_MASK = 0b011111
+PRODUCES_MASK = 0b111111
+
+# Type-line words with their own flag bit, so `t:creature` is a bit test
+# instead of a substring scan. Anything else (subtypes, phrases) still scans.
+TYPE_FLAGS = {
+    word: 1 << i
+    for i, word in enumerate(
+        (
+            "land", "creature", "artifact", "enchantment", "planeswalker",
+            "instant", "sorcery", "battle", "legendary", "basic", "snow",
+            "tribal", "kindred",
+        )
+    )
+}
+
+# Set bits in 0..63, for "two or more colours".
+_POPCOUNT = np.array([bin(i).count("1") for i in range(64)], dtype=np.uint8)
+
+
+def symbol_mask(symbols: Optional[Iterable[str]]) -> int:
+    mask = 0
+    for symbol in symbols or ():
+        mask |= SYMBOL_BITS.get(symbol, 0)
+    return mask
+
+
+def type_flags(type_line: Optional[str]) -> int:
+    flags = 0
+    for word in (type_line or "").lower().replace("—", " ").split():
+        flags |= TYPE_FLAGS.get(word, 0)
+    return flags
+
+
+def _set_mask(mask: np.ndarray, op: str, wanted: int, universe: int) -> np.ndarray:
+    if op == ">=":
+        return (mask & wanted) == wanted
+    outside = universe & ~wanted
+    if op == "<=":
+        return (mask & outside) == 0
+    if op == "=":
+        return mask == wanted
+    if op == "!=":
+        return mask != wanted
+    if op == ">":
+        return ((mask & wanted) == wanted) & (mask != wanted)
+    if op == "<":
+        return ((mask & outside) == 0) & (mask != wanted)
+    raise ValueError(f"Unsupported operator {op}")
+
+
+_NUMERIC_OPS = {
+    "=": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+}
+
+
+class CardCatalog(CardSnapshot):
+    """
+    Process-wide columnar copy of the card table for analytical filters, one
+    row per card name (legality, colours, types and rules text don't vary
+    between printings; the lowest id stands for the name, as in search).
+    Columns are numpy arrays — mana value, colour/identity/produced-mana
+    bitmasks, type flags, and the per-format legality bitmasks (see
+    app/core/legality.py) —
+    so a filter like "commander-legal green creatures with MV <= 2 that make
+    mana" is a handful of vectorized comparisons over every card at once:
+
+        catalog.mask(parse("f:commander c:g t:creature mv<=2")) & (catalog.produces != 0)
+
+    `mask` takes the same AST as card_query's SQL planner (the two are
+    kept semantically identical); text terms (names, oracle text, subtypes)
+    are the only per-row scans.
+    """
+
+    def reset(self) -> None:
+        super().reset()
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self._row_of_name: Dict[str, int] = {}
+        self._row_of_id: Dict[str, int] = {}
+        self._name_ordered = True
+        self._names_lower = np.array([], dtype=object)
+        self._type_lines = np.array([], dtype=object)
+        self._oracle = np.array([], dtype=object)
+        self.mana_value = np.array([], dtype=np.float32)
+        self.colors = np.array([], dtype=np.uint8)
+        self.identity = np.array([], dtype=np.uint8)
+        self.produces = np.array([], dtype=np.uint8)
+        self.types = np.array([], dtype=np.uint16)
+        self.legal = np.array([], dtype=np.int64)
+        self.banned = np.array([], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # -- building -----------------------------------------------------------
+
+    def load(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Builds from `card_row`-shaped mappings. When a name appears more
+        than once the lowest id wins.
+        """
+        self.reset()
+        chosen: Dict[str, Dict[str, Any]] = {}
+        reprints: List[Tuple[str, str]] = []
+        for row in rows:
+            current = chosen.get(row["name"])
+            if current is None or row["id"] < current["id"]:
+                chosen[row["name"]] = row
+            reprints.append((row["id"], row["name"]))
+        self._append(sorted(chosen.values(), key=lambda row: row["name"]))
+        for card_id, name in reprints:
+            self._row_of_id[card_id] = self._row_of_name[name]
+        self.built = True
+
+    def _append(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        for i, row in enumerate(rows, len(self.ids)):
+            self.ids.append(row["id"])
+            self.names.append(row["name"])
+            self._row_of_name[row["name"]] = i
+            self._row_of_id[row["id"]] = i
+
+        def column(values, dtype) -> np.ndarray:
+            return np.fromiter(values, dtype=dtype, count=len(rows))
+
+        def objects(values) -> np.ndarray:
+            array = np.empty(len(rows), dtype=object)
+            array[:] = list(values)
+            return array
+
+        self._names_lower = np.concatenate(
+            [self._names_lower, objects(row["name"].lower() for row in rows)]
+        )
+        self._type_lines = np.concatenate(
+            [self._type_lines, objects((row.get("type_line") or "").lower() for row in rows)]
+        )
+        self._oracle = np.concatenate(
+            [self._oracle, objects((row.get("oracle_text") or "").lower() for row in rows)]
+        )
+        self.mana_value = np.concatenate([
+            self.mana_value,
+            column(
+                (np.nan if row.get("mana_value") is None else row["mana_value"] for row in rows),
+                np.float32,
+            ),
+        ])
+        self.colors = np.concatenate(
+            [self.colors, column((symbol_mask(row.get("colors")) for row in rows), np.uint8)]
+        )
+        self.identity = np.concatenate([
+            self.identity,
+            column((symbol_mask(row.get("color_identity")) for row in rows), np.uint8),
+        ])
+        self.produces = np.concatenate([
+            self.produces,
+            column((symbol_mask(row.get("produced_mana")) for row in rows), np.uint8),
+        ])
+        self.types = np.concatenate(
+            [self.types, column((type_flags(row.get("type_line")) for row in rows), np.uint16)]
+        )
+        self.legal = np.concatenate(
+            [self.legal, column((row.get("legal_mask") or 0 for row in rows), np.int64)]
+        )
+        self.banned = np.concatenate(
+            [self.banned, column((row.get("banned_mask") or 0 for row in rows), np.int64)]
+        )
+
+    async def _load(self, db: AsyncSession) -> None:
+        result = await db.execute(
+            select(
+                Card.id, Card.name, Card.type_line, Card.oracle_text, Card.colors,
+                Card.color_identity, Card.produced_mana, Card.legal_mask,
+                Card.banned_mask, Card.mana_value,
+            ).order_by(col(Card.name), col(Card.id))
+        )
+        self.load(row._mapping for row in result.all())
+
+    def _patch(self, rows: List[Dict]) -> None:
+        new_rows = []
+        for row in rows:
+            old = self._row_of_id.get(row["id"])
+            if old is not None and self.names[old] != row["name"] and self.ids[old] == row["id"]:
+                # The printing standing for a name was renamed; whether the
+                # old name has other printings left isn't known here.
+                self.built = False
+                return
+            i = self._row_of_name.get(row["name"])
+            if i is None:
+                new_rows.append(row)
+            else:
+                # Name-level data, so any printing's write updates the row;
+                # the lowest id still stands for the name.
+                self._overwrite(i, row, representative=row["id"] <= self.ids[i])
+        new_rows = list({row["name"]: row for row in new_rows}.values())
+        if new_rows:
+            # Appended past the name-ordered rows from the last full load.
+            self._name_ordered = False
+            self._append(new_rows)
+
+    def _overwrite(self, i: int, row: Dict[str, Any], representative: bool = True) -> None:
+        if representative:
+            self.ids[i] = row["id"]
+        self._row_of_id[row["id"]] = i
+        self._type_lines[i] = (row.get("type_line") or "").lower()
+        self._oracle[i] = (row.get("oracle_text") or "").lower()
+        mv = row.get("mana_value")
+        self.mana_value[i] = np.nan if mv is None else mv
+        self.colors[i] = symbol_mask(row.get("colors"))
+        self.identity[i] = symbol_mask(row.get("color_identity"))
+        self.produces[i] = symbol_mask(row.get("produced_mana"))
+        self.types[i] = type_flags(row.get("type_line"))
+        self.legal[i] = row.get("legal_mask") or 0
+        self.banned[i] = row.get("banned_mask") or 0
+
+    # -- querying -----------------------------------------------------------
+
+    def _contains(self, column: np.ndarray, text: str) -> np.ndarray:
+        needle = text.lower()
+        return np.fromiter((needle in value for value in column), dtype=bool, count=len(column))
+
+    def _has_format(self, masks: np.ndarray, fmt: str) -> np.ndarray:
+        bit = FORMAT_BITS.get(fmt)
+        if bit is None:
+            return np.zeros(len(self), dtype=bool)
+        return (masks & bit) != 0
+
+    def _term(self, term: Term) -> np.ndarray:
+        field, value = term.field, term.value
+        if field == "name":
+            return self._contains(self._names_lower, value)
+        if field == "exact":
+            return self._names_lower == value.lower()
+        if field == "type":
+            flag = TYPE_FLAGS.get(value.lower())
+            if flag is not None:
+                return (self.types & flag) != 0
+            return self._contains(self._type_lines, value)
+        if field == "oracle":
+            if "~" not in value:
+                return self._contains(self._oracle, value)
+            pattern = value.lower()
+            return np.fromiter(
+                (
+                    pattern.replace("~", name) in oracle
+                    for name, oracle in zip(self._names_lower, self._oracle)
+                ),
+                dtype=bool,
+                count=len(self),
+            )
+        if field == "format":
+            return self._has_format(self.legal, value)
+        if field == "banned":
+            return self._has_format(self.banned, value)
+        if field == "mv":
+            return _NUMERIC_OPS[term.op](self.mana_value, value)
+        column, universe = {
+            "color": (self.colors, COLOR_MASK),
+            "identity": (self.identity, COLOR_MASK),
+            "produces": (self.produces, PRODUCES_MASK),
+        }[field]
+        if value is MULTICOLOR:
+            return _POPCOUNT[column & COLOR_MASK] >= 2
+        return _set_mask(column, term.op, symbol_mask(value), universe)
+
+    def _truth(self, node: Node) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (true, false) masks for `node` under SQL's three-valued logic, where
+        a row in neither is NULL: a comparison on a NULL mana value (NaN
+        here) is unknown, stays unknown under NOT, and only matches when an
+        OR finds another true branch — as the compiled WHERE clause would.
+        """
+        if isinstance(node, Term):
+            true = self._term(node)
+            if node.field == "mv":
+                known = ~np.isnan(self.mana_value)
+                return true & known, ~true & known
+            return true, ~true
+        if isinstance(node, Not):
+            true, false = self._truth(node.child)
+            return false, true
+        truths = [self._truth(child) for child in node.children]
+        trues = [true for true, _ in truths]
+        falses = [false for _, false in truths]
+        if isinstance(node, And):
+            return np.logical_and.reduce(trues), np.logical_or.reduce(falses)
+        assert isinstance(node, Or)
+        return np.logical_or.reduce(trues), np.logical_and.reduce(falses)
+
+    def mask(self, node: Node) -> np.ndarray:
+        """Boolean array over catalog rows: which card names `node` matches."""
+        return self._truth(node)[0]
+
+    def search(self, node: Node, limit: int = 175, offset: int = 0) -> Tuple[List[str], int]:
+        """Representative card ids matching `node`, by name, `limit` of them
+        from `offset` on, and how many names match in all."""
+        rows = np.flatnonzero(self.mask(node))
+        if not self._name_ordered:
+            rows = sorted(rows, key=self.names.__getitem__)
+        return [self.ids[i] for i in rows[offset : offset + limit]], len(rows)
+
+    def row_of(self, card_id: str) -> Optional[int]:
+        """Catalog row for a card id, reprints included once loaded."""
+        return self._row_of_id.get(card_id)
+
+
+# Process-wide catalog; reset and built in app/main.py's lifespan when
+# CARD_CATALOG_ENABLED.
+card_catalog = CardCatalog()
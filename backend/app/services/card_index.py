@@ -0,0 +1,317 @@
+import asyncio
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from app.core.db import SessionLocal
+from app.models.card import Card
+from app.models.deck import DeckCard
+from app.models.ingestion import IngestionRun
+
+# Ranking tiers, best first.
+EXACT, PREFIX, SUBSTRING, FUZZY = range(4)
+
+# Below this trigram similarity a fuzzy candidate isn't worth showing.
+FUZZY_THRESHOLD = 0.3
+# Upserts larger than this (bulk ingestion) drop the index for a rebuild
+# rather than patching it name by name.
+INCREMENTAL_LIMIT = 200
+# How often (at most) a query checks whether another process finished an
+# ingestion run since the index was built.
+FRESHNESS_CHECK_SECONDS = 60.0
+
+
+def normalize(name: str) -> str:
+    """Case-, accent- and whitespace-insensitive form: "Lim-Dûl" -> "lim-dul"."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+async def latest_ingestion_run_id(db: AsyncSession) -> int:
+    result = await db.execute(
+        select(func.max(IngestionRun.id))
+        .where(IngestionRun.job == "scryfall")
+        .where(IngestionRun.status == "succeeded")
+    )
+    return result.scalar() or 0
+
+
+class CardSnapshot:
+    """
+    Base for in-process structures derived from the whole Card table (the
+    name index here, the columnar catalog in card_catalog.py). Subclasses
+    implement `_load` (a full build from the DB) and `_patch` (apply a few
+    upserted `card_row` dicts). Builds use a session of their own from
+    `session_factory`, never a request's, and run at startup (app/main.py's
+    lifespan), after scryfall ingestion runs, and on first use if neither
+    has; a build in flight is shared by concurrent callers, and upserts
+    committed while it runs are replayed onto its result.
+    """
+
+    session_factory: Callable[[], Any] = SessionLocal
+
+    def __init__(self) -> None:
+        self._queued: Optional[List[Dict]] = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.built = False
+        self.in_use = False
+        self._ingestion_run_id = 0
+        self._checked_at = 0.0
+        self._building: Optional[asyncio.Task] = None
+
+    async def _load(self, db: AsyncSession) -> None:
+        raise NotImplementedError
+
+    def _patch(self, rows: List[Dict]) -> None:
+        raise NotImplementedError
+
+    async def build(self, db: AsyncSession) -> None:
+        run_id = await latest_ingestion_run_id(db)
+        await self._load(db)
+        self._ingestion_run_id = run_id
+        self._checked_at = time.monotonic()
+
+    async def _rebuild(self) -> None:
+        self._queued = []
+        try:
+            async with self.session_factory() as db:
+                await self.build(db)
+            queued = self._queued
+        finally:
+            self._queued = None
+        if queued:
+            self.note_upserted(queued)
+        self.in_use = True
+
+    async def refresh(self):
+        """
+        Rebuilds from the DB (or joins the rebuild already in flight). The
+        build is shielded, so a cancelled caller doesn't abandon it.
+        """
+        if self._building is None or self._building.done():
+            self._building = asyncio.ensure_future(self._rebuild())
+        await asyncio.shield(self._building)
+        return self
+
+    async def ensure_fresh(self, db: AsyncSession):
+        """
+        Builds if no build has happened yet, and rebuilds when an ingestion
+        run finished since the last build — checked (with the caller's
+        session) at most every FRESHNESS_CHECK_SECONDS, since a standalone
+        ingestion worker can't invalidate this process's copy directly.
+        """
+        if self.built and time.monotonic() - self._checked_at > FRESHNESS_CHECK_SECONDS:
+            self._checked_at = time.monotonic()
+            if await latest_ingestion_run_id(db) != self._ingestion_run_id:
+                self.built = False
+        if not self.built:
+            await self.refresh()
+        return self
+
+    def note_upserted(self, rows: List[Dict]) -> None:
+        """
+        Keeps a built snapshot current with card_store writes: small batches
+        (deck syncs, collection adds) are patched in; anything bigger is a
+        bulk load, so the snapshot is dropped and rebuilt on next use. While
+        a build runs, rows are queued for it instead (only up to the patch
+        limit; past it, the build's result is dropped the same way).
+        """
+        if self._queued is not None:
+            if len(self._queued) <= INCREMENTAL_LIMIT:
+                self._queued.extend(rows)
+            return
+        if not self.built:
+            return
+        if len(rows) > INCREMENTAL_LIMIT:
+            self.built = False
+            return
+        self._patch(rows)
+
+
+class CardNameIndex(CardSnapshot):
+    """
+    In-process index over distinct card names for typeahead. Reprints are
+    collapsed to one entry per name, represented by the lowest card id
+    (same choice local-search always made). Lookups never touch the DB:
+
+    - exact and prefix matches by bisecting a sorted list of normalized names;
+    - word-prefix matches ("bolt" -> "Lightning Bolt") the same way over a
+      sorted list of (word, name) pairs;
+    - substring matches by intersecting trigram posting sets, then checking;
+    - typo-tolerant matches by trigram similarity over the postings' union.
+
+    Results rank exact, then prefix, then substring, then fuzzy; within a
+    tier by popularity (how many decks play the name), then shorter names.
+    """
+
+    def reset(self) -> None:
+        super().reset()
+        self._names: List[str] = []  # normalized, by name index
+        self._ids: List[str] = []  # representative card id, by name index
+        self._popularity: List[int] = []
+        self._printings: List[int] = []  # how many card ids share the name
+        self._name_of: Dict[str, int] = {}  # card id -> name index
+        self._by_name: Dict[str, int] = {}
+        self._sorted: List[Tuple[str, int]] = []
+        self._words: List[Tuple[str, int]] = []
+        self._postings: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    # -- building -----------------------------------------------------------
+
+    def _add(
+        self, name: str, card_id: str, popularity: int = 0, keep_sorted: bool = True
+    ) -> None:
+        norm = normalize(name)
+        existing = self._by_name.get(norm)
+        if existing is not None:
+            if card_id not in self._name_of:
+                self._printings[existing] += 1
+            self._name_of[card_id] = existing
+            if card_id < self._ids[existing]:
+                self._ids[existing] = card_id
+            return
+        idx = len(self._names)
+        self._names.append(norm)
+        self._ids.append(card_id)
+        self._popularity.append(popularity)
+        self._printings.append(1)
+        self._name_of[card_id] = idx
+        self._by_name[norm] = idx
+        add = insort if keep_sorted else list.append
+        add(self._sorted, (norm, idx))
+        for word in set(norm.split()[1:]):
+            add(self._words, (word, idx))
+        for gram in trigrams(f" {norm} "):
+            self._postings.setdefault(gram, set()).add(idx)
+
+    def load(
+        self, cards: Iterable[Tuple[str, str]], popularity: Dict[str, int]
+    ) -> None:
+        """Builds from (id, name) pairs; `popularity` is keyed by card name."""
+        self.reset()
+        for card_id, name in cards:
+            self._add(name, card_id, popularity.get(name, 0), keep_sorted=False)
+        self._sorted.sort()
+        self._words.sort()
+        self.built = True
+
+    async def _load(self, db: AsyncSession) -> None:
+        result = await db.execute(select(Card.id, Card.name))
+        cards = result.all()
+        played = await db.execute(
+            select(Card.name, func.count(func.distinct(DeckCard.deck_id)))
+            .join(DeckCard, col(DeckCard.card_id) == col(Card.id))
+            .group_by(col(Card.name))
+        )
+        self.load(cards, dict(played.all()))
+
+    def _remove(self, idx: int) -> None:
+        """Makes a name unreachable; its slot stays, so other indexes hold."""
+        norm = self._names[idx]
+        del self._by_name[norm]
+        self._sorted.pop(bisect_left(self._sorted, (norm, idx)))
+        for word in set(norm.split()[1:]):
+            self._words.pop(bisect_left(self._words, (word, idx)))
+        for gram in trigrams(f" {norm} "):
+            self._postings[gram].discard(idx)
+
+    def _patch(self, rows: List[Dict]) -> None:
+        for row in rows:
+            card_id = row["id"]
+            old = self._name_of.get(card_id)
+            if old is not None and self._names[old] != normalize(row["name"]):
+                # Renamed: the card leaves its old name's entry.
+                self._printings[old] -= 1
+                del self._name_of[card_id]
+                if not self._printings[old]:
+                    self._remove(old)
+                elif self._ids[old] == card_id:
+                    # Which printing now represents the old name isn't
+                    # known here; rebuild rather than guess.
+                    self.built = False
+                    return
+            self._add(row["name"], card_id)
+
+    # -- querying -----------------------------------------------------------
+
+    def _prefix_range(self, entries: List[Tuple[str, int]], prefix: str) -> Iterable[int]:
+        for i in range(bisect_left(entries, (prefix, -1)), len(entries)):
+            key, idx = entries[i]
+            if not key.startswith(prefix):
+                break
+            yield idx
+
+    def search(self, query: str, limit: int = 20) -> List[str]:
+        """Card ids (one per name) best-first for a typeahead query."""
+        q = normalize(query)
+        if not q or not self._names:
+            return []
+
+        tier: Dict[int, int] = {}
+        similarity: Dict[int, float] = {}
+
+        def offer(idx: int, rank: int) -> None:
+            if rank < tier.get(idx, FUZZY + 1):
+                tier[idx] = rank
+
+        for idx in self._prefix_range(self._sorted, q):
+            offer(idx, EXACT if self._names[idx] == q else PREFIX)
+        for idx in self._prefix_range(self._words, q):
+            offer(idx, SUBSTRING)
+
+        query_grams = trigrams(q)
+        if query_grams:
+            postings = sorted(
+                (self._postings.get(g, set()) for g in query_grams), key=len
+            )
+            if postings[0]:
+                for idx in set.intersection(*postings):
+                    if q in self._names[idx]:
+                        offer(idx, SUBSTRING)
+
+        if len(tier) < limit:
+            padded = trigrams(f" {q} ")
+            shared: Counter = Counter()
+            for gram in padded:
+                shared.update(self._postings.get(gram, ()))
+            for idx, count in shared.items():
+                if idx in tier:
+                    continue
+                # " name " has len(name) trigrams (fewer if some repeat,
+                # which only makes this Jaccard estimate conservative).
+                score = count / (len(padded) + len(self._names[idx]) - count)
+                if score >= FUZZY_THRESHOLD:
+                    similarity[idx] = score
+                    offer(idx, FUZZY)
+
+        ranked = sorted(
+            tier,
+            key=lambda idx: (
+                tier[idx],
+                -similarity.get(idx, 1.0),
+                -self._popularity[idx],
+                len(self._names[idx]),
+                self._names[idx],
+            ),
+        )
+        return [self._ids[idx] for idx in ranked[:limit]]
+
+
+# Process-wide index; reset and built in app/main.py's lifespan.
+card_name_index = CardNameIndex()
@@ -0,0 +1,387 @@
+import re
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import String, and_, case, cast, false, func, literal, not_, or_, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+from sqlmodel import col, select
+
+from app.core.config import settings
+from app.core.legality import FORMAT_BITS
+from app.models.card import Card
+
+COLORS = "WUBRG"
+
+_COLOR_WORDS = {
+    "white": "W", "blue": "U", "black": "B", "red": "R", "green": "G",
+    "azorius": "WU", "dimir": "UB", "rakdos": "BR", "gruul": "RG",
+    "selesnya": "GW", "orzhov": "WB", "izzet": "UR", "golgari": "BG",
+    "boros": "RW", "simic": "GU",
+    "bant": "GWU", "esper": "WUB", "grixis": "UBR", "jund": "BRG",
+    "naya": "RGW", "abzan": "WBG", "jeskai": "URW", "sultai": "BGU",
+    "mardu": "RWB", "temur": "GUR",
+}
+
+_FIELDS = {
+    "name": "name", "n": "name",
+    "t": "type", "type": "type",
+    "o": "oracle", "oracle": "oracle",
+    "c": "color", "color": "color", "colour": "color",
+    "id": "identity", "identity": "identity", "ci": "identity",
+    "mv": "mv", "cmc": "mv", "manavalue": "mv",
+    "f": "format", "format": "format", "legal": "format",
+    "banned": "banned",
+    "produces": "produces",
+}
+
+# Fields that only accept ':' / '='.
+_TEXT_FIELDS = {"name", "type", "oracle", "format", "banned"}
+
+_TOKEN_RE = re.compile(
+    r"""
+    \s*(?:
+        (?P<paren>[()])
+      | (?P<key>[a-zA-Z]+)(?P<op>>=|<=|!=|[:=<>])(?P<value>"[^"]*"|[^\s()"]+)
+      | (?P<bang>!)?(?P<word>"[^"]*"|[^\s()"]+)
+    )
+    """,
+    re.VERBOSE,
+)
+
+
+class QuerySyntaxError(ValueError):
+    """The query isn't well-formed (unbalanced parentheses, dangling `or`...)."""
+
+
+class UnsupportedQuery(QuerySyntaxError):
+    """Valid Scryfall syntax outside the subset this engine understands."""
+
+
+@dataclass(frozen=True)
+class Term:
+    field: str  # one of _FIELDS' values, or "exact" for !"Name"
+    op: str  # ':', '=', '!=', '<', '<=', '>', '>='
+    value: Union[str, float, FrozenSet[str]]
+
+
+@dataclass(frozen=True)
+class And:
+    children: Tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    children: Tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class Not:
+    child: "Node"
+
+
+Node = Union[Term, And, Or, Not]
+
+# Marks `c:m` / `id:multicolor` — "two or more colours" isn't a set.
+MULTICOLOR: FrozenSet[str] = frozenset({"multicolor"})
+
+
+def _unquote(text: str) -> str:
+    return text[1:-1] if len(text) >= 2 and text[0] == text[-1] == '"' else text
+
+
+def _color_set(value: str, symbols: str) -> FrozenSet[str]:
+    lowered = value.lower()
+    if lowered in _COLOR_WORDS:
+        return frozenset(_COLOR_WORDS[lowered])
+    if lowered in ("c", "colorless"):
+        return frozenset("C") if "C" in symbols else frozenset()
+    if lowered in ("m", "multicolor"):
+        return MULTICOLOR
+    letters = frozenset(lowered.upper())
+    if not letters or not letters <= frozenset(symbols):
+        raise UnsupportedQuery(f"Unknown colour value: {value!r}")
+    return letters
+
+
+def _term(key: str, op: str, raw: str) -> Term:
+    field = _FIELDS.get(key.lower())
+    if field is None:
+        raise UnsupportedQuery(f"Unsupported keyword: {key}:")
+    value = _unquote(raw)
+    if field in _TEXT_FIELDS:
+        if op not in (":", "="):
+            raise UnsupportedQuery(f"{key} doesn't support {op}")
+        return Term(field, ":", value.lower() if field in ("format", "banned") else value)
+    if field == "mv":
+        try:
+            return Term(field, "=" if op == ":" else op, float(value))
+        except ValueError:
+            raise UnsupportedQuery(f"Unsupported mana value: {value!r}")
+    symbols = COLORS + "C" if field == "produces" else COLORS
+    colors = _color_set(value, symbols)
+    if colors is MULTICOLOR and op not in (":", "=", ">="):
+        raise UnsupportedQuery(f"{key}{op}multicolor isn't supported")
+    if op == ":":
+        # Scryfall's defaults: colour and produces mean "at least these",
+        # identity means "fits inside this identity" (commander deckbuilding).
+        # `c:c` is "colourless", i.e. exactly no colours.
+        if field == "identity":
+            op = "<="
+        elif field == "color" and not colors:
+            op = "="
+        else:
+            op = ">="
+    return Term(field, op, colors)
+
+
+def _tokenize(query: str) -> List[Tuple[str, object]]:
+    tokens: List[Tuple[str, object]] = []
+    pos = 0
+    query = query.strip()
+    while pos < len(query):
+        negate = False
+        while query[pos] == "-" and pos + 1 < len(query) and not query[pos + 1].isspace():
+            negate = not negate
+            pos += 1
+        match = _TOKEN_RE.match(query, pos)
+        if match is None or match.end() == pos:
+            raise QuerySyntaxError(f"Can't parse query at: {query[pos:]!r}")
+        pos = match.end()
+        while pos < len(query) and query[pos].isspace():
+            pos += 1
+        if negate:
+            tokens.append(("not", None))
+        if match.group("paren"):
+            tokens.append((match.group("paren"), None))
+        elif match.group("key"):
+            tokens.append(
+                ("term", _term(match.group("key"), match.group("op"), match.group("value")))
+            )
+        else:
+            word = match.group("word")
+            if match.group("bang"):
+                tokens.append(("term", Term("exact", ":", _unquote(word))))
+            elif word.lower() in ("or", "and") and not word.startswith('"'):
+                if negate:
+                    raise QuerySyntaxError(f"Can't negate {word!r}")
+                tokens.append((word.lower(), None))
+            else:
+                tokens.append(("term", Term("name", ":", _unquote(word))))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, tokens: Sequence[Tuple[str, object]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def parse(self) -> Node:
+        node = self._or()
+        if self._peek() is not None:
+            raise QuerySyntaxError("Unbalanced ')'")
+        return node
+
+    def _or(self) -> Node:
+        children = [self._and()]
+        while self._peek() == "or":
+            self.pos += 1
+            children.append(self._and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def _and(self) -> Node:
+        children = []
+        while self._peek() not in (None, "or", ")"):
+            if self._peek() == "and":
+                self.pos += 1
+                continue
+            children.append(self._unary())
+        if not children:
+            raise QuerySyntaxError("Expected a search term")
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def _unary(self) -> Node:
+        if self._peek() is None:
+            raise QuerySyntaxError("Expected a search term")
+        kind, value = self.tokens[self.pos]
+        self.pos += 1
+        if kind == "not":
+            return Not(self._unary())
+        if kind == "(":
+            node = self._or()
+            if self._peek() != ")":
+                raise QuerySyntaxError("Missing ')'")
+            self.pos += 1
+            return node
+        if kind == "term":
+            return value  # type: ignore[return-value]
+        raise QuerySyntaxError(f"Unexpected {kind!r}")
+
+
+def parse(query: str) -> Node:
+    """
+    Parses the common subset of Scryfall's search syntax
+    (https://scryfall.com/docs/syntax) into a small AST:
+
+        name words / "phrases"   !"Exact Name"     name:bolt
+        t: type:                 o: oracle:        (~ stands for the card's name)
+        c: color:                id: identity:     produces:
+        mv cmc manavalue         f: format: legal: banned:
+        implicit AND, `and`, `or`, `-` negation, ( parentheses ), "quoted values"
+
+    Raises QuerySyntaxError for malformed queries and UnsupportedQuery for
+    valid Scryfall syntax outside that subset.
+    """
+    tokens = _tokenize(query)
+    if not tokens:
+        raise QuerySyntaxError("Empty query")
+    return _Parser(tokens).parse()
+
+
+# -- planning ---------------------------------------------------------------
+
+
+def _contains(column, text: str) -> ColumnElement:
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return func.coalesce(column, "").ilike(f"%{escaped}%", escape="\\")
+
+
+def _has(column, symbol: str) -> ColumnElement:
+    # JSON arrays are stored as text like ["R", "G"] on both engines; NULL
+    # (never-set) reads as the empty array.
+    return func.coalesce(cast(column, String), "").like(f'%"{symbol}"%')
+
+
+def _color_clause(column, op: str, wanted: FrozenSet[str], universe: str) -> ColumnElement:
+    if wanted is MULTICOLOR:
+        count = sum(case((_has(column, c), 1), else_=0) for c in COLORS)
+        return count >= 2
+    has = {c: _has(column, c) for c in universe}
+    superset = and_(true(), *(has[c] for c in wanted))
+    subset = and_(true(), *(not_(has[c]) for c in universe if c not in wanted))
+    if op == ">=":
+        return superset
+    if op == "<=":
+        return subset
+    if op == "=":
+        return and_(superset, subset)
+    if op == "!=":
+        return not_(and_(superset, subset))
+    if op == ">":
+        extra = [has[c] for c in universe if c not in wanted]
+        return and_(superset, or_(*extra)) if extra else false()
+    if op == "<":
+        missing = [not_(has[c]) for c in wanted]
+        return and_(subset, or_(*missing)) if missing else false()
+    raise UnsupportedQuery(f"Unsupported operator {op}")
+
+
+_NUMERIC_OPS = {
+    "=": lambda c, v: c == v,
+    "!=": lambda c, v: c != v,
+    "<": lambda c, v: c < v,
+    "<=": lambda c, v: c <= v,
+    ">": lambda c, v: c > v,
+    ">=": lambda c, v: c >= v,
+}
+
+
+def _term_clause(term: Term) -> ColumnElement:
+    field, value = term.field, term.value
+    if field == "name":
+        return _contains(col(Card.name), value)
+    if field == "exact":
+        return func.lower(col(Card.name)) == value.lower()
+    if field == "type":
+        return _contains(col(Card.type_line), value)
+    if field == "oracle":
+        if "~" not in value:
+            return _contains(col(Card.oracle_text), value)
+        escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = func.replace(literal(f"%{escaped}%"), "~", col(Card.name))
+        return func.coalesce(col(Card.oracle_text), "").ilike(pattern, escape="\\")
+    if field in ("format", "banned"):
+        bit = FORMAT_BITS.get(value)
+        if bit is None:
+            return false()
+        mask = Card.legal_mask if field == "format" else Card.banned_mask
+        return col(mask).op("&")(bit) != 0
+    if field == "mv":
+        return _NUMERIC_OPS[term.op](col(Card.mana_value), value)
+    if field == "color":
+        return _color_clause(Card.colors, term.op, value, COLORS)
+    if field == "identity":
+        return _color_clause(Card.color_identity, term.op, value, COLORS)
+    if field == "produces":
+        return _color_clause(Card.produced_mana, term.op, value, COLORS + "C")
+    raise UnsupportedQuery(f"Unsupported field {field}")
+
+
+def compile_query(node: Node) -> ColumnElement:
+    """
+    The WHERE clause selecting exactly the cards `node` matches. Every term
+    compiles to plain, portable SQL — text terms to ILIKE (trigram-indexed
+    on Postgres), mana value to a comparison on its indexed column, formats
+    to bit tests on the legality masks, and the colour-set operators to
+    membership tests against the JSON arrays' text — so Postgres and the SQLite test engine run the same statement.
+    """
+    if isinstance(node, Term):
+        return _term_clause(node)
+    if isinstance(node, And):
+        return and_(*(compile_query(child) for child in node.children))
+    if isinstance(node, Or):
+        return or_(*(compile_query(child) for child in node.children))
+    return not_(compile_query(node.child))
+
+
+async def search_local_page(
+    session: AsyncSession, query: str, limit: int = 175, offset: int = 0
+) -> Tuple[List[Card], int]:
+    """
+    Runs a Scryfall-syntax query against the local Card table: one card per
+    name (Scryfall's default `unique=cards`), ordered by name, `limit` of
+    them from `offset` on (175 is Scryfall's page size), plus how many names
+    match in all. Filters run as vectorized masks over the in-process card
+    catalog when CARD_CATALOG_ENABLED, leaving one primary-key fetch for the
+    page; otherwise as the compiled SQL, with a count alongside. Raises
+    QuerySyntaxError (or its subclass UnsupportedQuery) for queries the
+    caller should send to Scryfall instead.
+    """
+    node = parse(query)
+    if settings.CARD_CATALOG_ENABLED:
+        # Imported here: the catalog evaluates this module's AST.
+        from app.services.card_catalog import card_catalog
+
+        catalog = await card_catalog.ensure_fresh(session)
+        ids, total = catalog.search(node, limit=limit, offset=offset)
+        if not ids:
+            return [], total
+        result = await session.execute(select(Card).where(col(Card.id).in_(ids)))
+        by_id = {card.id: card for card in result.scalars().all()}
+        return [by_id[card_id] for card_id in ids if card_id in by_id], total
+
+    where = compile_query(node)
+    total = await session.execute(select(func.count(func.distinct(Card.name))).where(where))
+    matching_ids = (
+        select(func.min(Card.id))
+        .where(where)
+        .group_by(col(Card.name))
+        .order_by(col(Card.name))
+        .offset(offset)
+        .limit(limit)
+    )
+    result = await session.execute(
+        select(Card).where(col(Card.id).in_(matching_ids)).order_by(col(Card.name))
+    )
+    return list(result.scalars().all()), total.scalar_one()
+
+
+async def search_local(
+    session: AsyncSession, query: str, limit: int = 175
+) -> List[Card]:
+    """The first `limit` matches of search_local_page, without the count."""
+    cards, _total = await search_local_page(session, query, limit)
+    return cards
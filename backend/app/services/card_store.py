@@ -0,0 +1,331 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import JSON, event, insert, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import col
+
+from app.core.legality import legality_masks
+from app.models.card import Card
+from app.models.deck import Deck, DeckCard
+from app.services.card_catalog import card_catalog
+from app.services.card_index import card_name_index
+from app.services.scryfall import resolve_card_fields
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Session.info key for rows upsert_card_rows wrote in a transaction that
+# hasn't committed yet; the in-process name index and catalog only see
+# them once it does.
+_PENDING_ROWS = "card_store_pending_rows"
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_rows(session: Session) -> None:
+    rows = session.info.pop(_PENDING_ROWS, None)
+    if rows:
+        card_name_index.note_upserted(rows)
+        card_catalog.note_upserted(rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_rows(session: Session) -> None:
+    session.info.pop(_PENDING_ROWS, None)
+
+
+def _bump_cards_version(card_ids: Sequence[str]):
+    """Bumps Deck.cards_version (part of the deck ETags) for every deck
+    holding one of `card_ids`, whose content just changed."""
+    return (
+        update(Deck)
+        .where(
+            col(Deck.id).in_(
+                select(DeckCard.deck_id).where(col(DeckCard.card_id).in_(card_ids))
+            )
+        )
+        .values(cards_version=Deck.cards_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_decks_of_edited_cards(session: Session, flush_context) -> None:
+    # upsert_card_rows' bulk statements bypass the flush and bump decks
+    # themselves; this covers Card instances edited through the ORM.
+    edited = [
+        obj.id
+        for obj in session.dirty
+        if isinstance(obj, Card) and inspect(obj).attrs.content_hash.history.has_changes()
+    ]
+    if edited:
+        session.execute(_bump_cards_version(edited))
+
+
+async def refresh_card_snapshots() -> None:
+    """
+    Rebuilds the name index and catalog this process serves (each with its
+    own session), e.g. after a scryfall ingestion run, so searches don't
+    wait for the freshness check or pay for the build themselves. A process
+    that never built them — a standalone ingestion worker — skips this.
+    """
+    for snapshot in (card_name_index, card_catalog):
+        if snapshot.in_use:
+            await snapshot.refresh()
+
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """Stable hash of a card row's content (key order and the hash itself excluded)."""
+    content = {k: v for k, v in row.items() if k != "content_hash"}
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+def card_row(card_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The `Card` column values for one Scryfall card object — the single place
+    Scryfall JSON is mapped onto our table, shared by bulk ingestion and the
+    live-fetch paths (deck sync, collection adds). Includes `content_hash`.
+    """
+    # Multi-faced cards (transform/modal-DFC/reversible/art-series) don't
+    # always carry top-level name/type_line/image_uris — see
+    # `resolve_card_fields`'s docstring for the live-API-confirmed cases.
+    fields = resolve_card_fields(card_data)
+    row = {
+        "id": card_data["id"],
+        "name": fields["name"],
+        "mana_cost": card_data.get("mana_cost"),
+        "type_line": fields["type_line"],
+        "oracle_text": card_data.get("oracle_text"),
+        "colors": card_data.get("colors"),
+        "produced_mana": card_data.get("produced_mana"),
+        "image_uris": fields["image_uris"],
+        "legalities": card_data.get("legalities"),
+        "card_faces": fields["card_faces"],
+        "color_identity": card_data.get("color_identity"),
+        "mana_value": card_data.get("cmc"),
+        **legality_masks(card_data.get("legalities")),
+    }
+    row["content_hash"] = content_hash(row)
+    return row
+
+
+def fetched_card_rows(cards: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Rows for cards fetched live from Scryfall. Scryfall omits
+    `produced_mana` for cards that make no mana; store [] for those, since
+    NULL is what sync_cards treats as "never synced, fetch again".
+    """
+    rows = []
+    for card_data in cards:
+        row = card_row(card_data)
+        if row["produced_mana"] is None:
+            row["produced_mana"] = []
+            row["content_hash"] = content_hash(row)
+        rows.append(row)
+    return rows
+
+
+def _refresh_identity_map(
+    session: AsyncSession, rows: List[Dict[str, Any]]
+) -> None:
+    """
+    Bulk statements bypass the ORM unit of work, so any `Card` already loaded
+    in this session would keep its old values. Copy the new values onto
+    those instances as committed state (no lazy load, nothing marked dirty).
+    """
+    for row in rows:
+        instance = session.sync_session.identity_map.get(
+            session.sync_session.identity_key(Card, row["id"])
+        )
+        if instance is None:
+            continue
+        for key, value in row.items():
+            set_committed_value(instance, key, value)
+
+
+async def _upsert_batch_portable(
+    session: AsyncSession, batch: List[Dict[str, Any]]
+) -> List[str]:
+    result = await session.execute(
+        select(Card.id, Card.content_hash).where(col(Card.id).in_([row["id"] for row in batch]))
+    )
+    existing = dict(result.all())
+
+    to_update = [row for row in batch if row["id"] in existing]
+    to_insert = [row for row in batch if row["id"] not in existing]
+    if to_update:
+        await session.execute(update(Card), to_update)
+    if to_insert:
+        await session.execute(insert(Card), to_insert)
+    return [
+        row["id"] for row in batch if existing.get(row["id"], "") != row.get("content_hash")
+    ]
+
+
+async def _upsert_batch_postgres(
+    session: AsyncSession, batch: List[Dict[str, Any]]
+) -> List[str]:
+    stmt = pg_insert(Card).values(batch)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Card.id],
+        set_={key: stmt.excluded[key] for key in batch[0] if key != "id"},
+        where=col(Card.content_hash).is_distinct_from(stmt.excluded.content_hash),
+    ).returning(Card.id)
+    result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+# Below this many rows the COPY path's staging round trips cost more than
+# they save; plain ON CONFLICT handles deck-sized batches.
+COPY_THRESHOLD = 200
+
+# Session-private staging table for the COPY path. Temporary tables are never
+# WAL-logged (the same property an UNLOGGED table buys) and, unlike a shared
+# unlogged table, concurrent loaders can't see each other's rows.
+_STAGING_TABLE = "card_staging"
+
+_JSON_COLUMNS = frozenset(
+    c.name for c in Card.__table__.columns if isinstance(c.type, JSON)
+)
+
+
+def copy_records(
+    rows: List[Dict[str, Any]], columns: List[str]
+) -> List[Tuple[Any, ...]]:
+    """
+    Row dicts as COPY records in `columns` order. asyncpg's binary COPY takes
+    json columns as text, so those values are serialized here.
+    """
+    return [
+        tuple(
+            json.dumps(row[c]) if c in _JSON_COLUMNS and row[c] is not None else row[c]
+            for c in columns
+        )
+        for row in rows
+    ]
+
+
+async def _upsert_batch_copy(
+    session: AsyncSession, batch: List[Dict[str, Any]]
+) -> List[str]:
+    """
+    asyncpg fast path: COPY the batch into a temp staging table, then merge
+    it with one INSERT ... SELECT ... ON CONFLICT DO UPDATE. Rows whose
+    content hash already matches are left untouched by the merge.
+    """
+    columns = list(batch[0])
+    conn = await session.connection()
+    raw = (await conn.get_raw_connection()).driver_connection
+    await raw.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {_STAGING_TABLE} "
+        f"(LIKE {Card.__tablename__} INCLUDING DEFAULTS)"
+    )
+    await raw.copy_records_to_table(
+        _STAGING_TABLE, records=copy_records(batch, columns), columns=columns
+    )
+    quoted = ", ".join(f'"{c}"' for c in columns)
+    updates = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in columns if c != "id")
+    written = await raw.fetch(
+        f"INSERT INTO {Card.__tablename__} ({quoted}) "
+        f"SELECT {quoted} FROM {_STAGING_TABLE} "
+        f"ON CONFLICT (id) DO UPDATE SET {updates} "
+        f"WHERE {Card.__tablename__}.content_hash IS DISTINCT FROM EXCLUDED.content_hash "
+        f"RETURNING id"
+    )
+    await raw.execute(f"TRUNCATE {_STAGING_TABLE}")
+    return [record["id"] for record in written]
+
+
+async def upsert_card_rows(
+    session: AsyncSession,
+    rows: List[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    commit: bool = False,
+) -> int:
+    """
+    Writes `card_row`-shaped dicts in batches, a few round trips per batch
+    regardless of size. On Postgres via asyncpg, large batches are COPYed
+    into a staging table and merged in one statement; smaller ones (or other
+    Postgres drivers) are a single INSERT ... ON CONFLICT DO UPDATE;
+    elsewhere (the SQLite test engine) one existence query, one executemany
+    UPDATE for rows that exist and one bulk INSERT for the rest.
+    Duplicate ids keep the last occurrence. Commits after every batch when
+    `commit` is set (bulk ingestion), otherwise leaves the transaction to
+    the caller. Decks holding a card whose content changed get their
+    `cards_version` bumped in the same transaction. The in-process name
+    index and catalog pick the rows up when the transaction commits
+    (nothing, if it rolls back). Returns the number of distinct rows written.
+    """
+    deduped = list({row["id"]: row for row in rows}.values())
+    dialect = session.get_bind().dialect
+    postgres = dialect.name == "postgresql"
+    copy = postgres and dialect.driver == "asyncpg"
+
+    for i in range(0, len(deduped), batch_size):
+        batch = deduped[i : i + batch_size]
+        if copy and len(batch) >= COPY_THRESHOLD:
+            written = await _upsert_batch_copy(session, batch)
+        elif postgres:
+            written = await _upsert_batch_postgres(session, batch)
+        else:
+            written = await _upsert_batch_portable(session, batch)
+        if written:
+            await session.execute(_bump_cards_version(written))
+        _refresh_identity_map(session, batch)
+        session.sync_session.info.setdefault(_PENDING_ROWS, []).extend(batch)
+        if commit:
+            await session.commit()
+
+    return len(deduped)
+
+
+@dataclass
+class CardDiff:
+    """
+    How a batch of incoming rows compares to what's stored: brand-new ids,
+    and rows whose content hash differs, each paired with the stored
+    (oracle_text, legalities) so callers can say *what* changed. Rows
+    matching their stored hash are only counted.
+    """
+
+    new: List[Dict[str, Any]] = field(default_factory=list)
+    changed: List[Tuple[Dict[str, Any], Tuple[Any, Any]]] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def rows_to_write(self) -> List[Dict[str, Any]]:
+        return self.new + [row for row, _ in self.changed]
+
+
+async def diff_card_rows(
+    session: AsyncSession, rows: List[Dict[str, Any]]
+) -> CardDiff:
+    """
+    One query per call: fetches the stored hash (plus oracle text and
+    legalities, for reporting) of every id in `rows` and classifies each
+    row. Rows stored before content hashes existed (NULL hash) count as
+    changed, so the first run after the migration backfills them.
+    """
+    diff = CardDiff()
+    if not rows:
+        return diff
+    result = await session.execute(
+        select(Card.id, Card.content_hash, Card.oracle_text, Card.legalities).where(
+            col(Card.id).in_([row["id"] for row in rows])
+        )
+    )
+    stored = {r.id: r for r in result.all()}
+    for row in rows:
+        existing = stored.get(row["id"])
+        if existing is None:
+            diff.new.append(row)
+        elif existing.content_hash != row["content_hash"]:
+            diff.changed.append((row, (existing.oracle_text, existing.legalities)))
+        else:
+            diff.unchanged += 1
+    return diff
@@ -85,17 +85,14 @@ class ResolvedEntry:
     board: str
 
 
-_COLLECTION_CHUNK_SIZE = 75  # Scryfall's /cards/collection limit per request
-
-
 async def resolve_entries(
     entries: List[ParsedEntry], scryfall: ScryfallService
 ) -> Tuple[List[ResolvedEntry], List[str]]:
     """
     Resolve parsed entries to Scryfall card IDs via the batch /cards/collection
-    endpoint (up to 75 identifiers per request), not one search per entry - a
-    60-card decklist used to mean 60+ sequential Scryfall requests, easily
-    enough to trip their rate limit and 500 the whole import.
+    endpoint (chunked and fetched concurrently by ScryfallService), not one
+    search per entry - a 60-card decklist used to mean 60+ sequential Scryfall
+    requests, easily enough to trip their rate limit and 500 the whole import.
 
     Best-effort: entries that can't be resolved (not found, no match) are
     reported separately rather than failing the whole import.
@@ -122,26 +119,27 @@ async def resolve_entries(
     resolved: List[ResolvedEntry] = []
     resolved_entry_ids: set = set()
 
-    for start in range(0, len(identifiers), _COLLECTION_CHUNK_SIZE):
-        chunk = identifiers[start : start + _COLLECTION_CHUNK_SIZE]
-        try:
-            result = await scryfall.get_collection(chunk)
-        except httpx.HTTPStatusError:
-            continue  # everything in this chunk falls through to `missing` below
-
-        for card in result.get("data", []):
-            matches = by_printing.get(
-                (card.get("set", "").lower(), card.get("collector_number", "")), []
-            ) + by_name.get(card.get("name", "").lower(), [])
-            for entry in matches:
-                if id(entry) in resolved_entry_ids:
-                    continue
-                resolved_entry_ids.add(id(entry))
-                resolved.append(
-                    ResolvedEntry(
-                        card_id=card["id"], quantity=entry.quantity, board=entry.board
-                    )
+    try:
+        # One call: ScryfallService chunks to 75 identifiers and fetches the
+        # chunks concurrently, folding any chunk that still fails into
+        # `not_found`.
+        result = await scryfall.get_collection(identifiers)
+    except httpx.HTTPStatusError:
+        result = {}  # everything falls through to `missing` below
+
+    for card in result.get("data", []):
+        matches = by_printing.get(
+            (card.get("set", "").lower(), card.get("collector_number", "")), []
+        ) + by_name.get(card.get("name", "").lower(), [])
+        for entry in matches:
+            if id(entry) in resolved_entry_ids:
+                continue
+            resolved_entry_ids.add(id(entry))
+            resolved.append(
+                ResolvedEntry(
+                    card_id=card["id"], quantity=entry.quantity, board=entry.board
                 )
+            )
 
     missing = [e.raw_line for e in entries if id(e) not in resolved_entry_ids]
     return resolved, missing
@@ -0,0 +1,171 @@
+import copy
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlmodel import col, select
+
+from app.models.card import Card
+from app.models.deck import DeckCard, DeckCardBase, DeckStats
+from app.services.stats import add_card_to_totals, empty_totals
+
+CardQuantities = Dict[Tuple[str, str], int]
+
+
+def card_quantities(cards: Iterable[DeckCardBase]) -> CardQuantities:
+    """(card_id, board) -> quantity for a deck's card list, duplicates summed."""
+    quantities: CardQuantities = {}
+    for dc in cards:
+        key = (dc.card_id, dc.board)
+        quantities[key] = quantities.get(key, 0) + dc.quantity
+    return quantities
+
+
+def _main_deltas(before: CardQuantities, after: CardQuantities) -> Dict[str, int]:
+    """Net mainboard quantity change per card_id — other boards don't feed stats."""
+    deltas: Dict[str, int] = {}
+    for sign, quantities in ((-1, before), (1, after)):
+        for (card_id, board), quantity in quantities.items():
+            if board == "main":
+                deltas[card_id] = deltas.get(card_id, 0) + sign * quantity
+    return {card_id: delta for card_id, delta in deltas.items() if delta}
+
+
+def card_stamp(card: Optional[Card]) -> str:
+    """What a snapshot records a card as counted at: its content_hash, "" for
+    a row without one, "-" for a card with no row yet."""
+    if card is None:
+        return "-"
+    return card.content_hash or ""
+
+
+def _has_negative(value: Any) -> bool:
+    """Any counter below zero — a snapshot that drifted from its cards."""
+    if isinstance(value, dict):
+        return any(_has_negative(v) for v in value.values())
+    # total_cmc is a float sum; allow for rounding on the way back to 0.
+    return isinstance(value, (int, float)) and value < -1e-6
+
+
+async def _locked_snapshot(db: AsyncSession, deck_id: int) -> Optional[DeckStats]:
+    """The deck's snapshot row, locked until the caller commits (FOR UPDATE;
+    a no-op on SQLite, which serializes writers anyway) so concurrent edits
+    apply their deltas one after another instead of losing one."""
+    result = await db.execute(
+        select(DeckStats)
+        .where(DeckStats.deck_id == deck_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def rebuild_deck_stats(db: AsyncSession, deck_id: int) -> DeckStats:
+    """
+    Recounts a deck's snapshot from its current DeckCard rows — the fallback
+    for decks that predate DeckStats, and for snapshots found stale or
+    drifted. Flushes first so pending edits in this session are what gets
+    counted.
+    """
+    await db.flush()
+    result = await db.execute(
+        select(DeckCard)
+        .where(DeckCard.deck_id == deck_id)
+        .where(DeckCard.board == "main")
+        .options(selectinload(DeckCard.card))  # type: ignore[arg-type]
+    )
+    totals = empty_totals()
+    card_hashes: Dict[str, str] = {}
+    for dc in result.scalars().all():
+        add_card_to_totals(totals, dc.card, dc.quantity)
+        card_hashes[dc.card_id] = card_stamp(dc.card)
+
+    snapshot = await _locked_snapshot(db, deck_id)
+    if snapshot is None:
+        snapshot = DeckStats(deck_id=deck_id, version=0, totals=totals)
+    else:
+        snapshot.totals = totals
+        snapshot.version += 1
+    snapshot.card_hashes = card_hashes
+    db.add(snapshot)
+    return snapshot
+
+
+async def stale_card_ids(db: AsyncSession, snapshot: DeckStats) -> Optional[set]:
+    """
+    Cards whose row changed since the snapshot counted them (re-hashed by
+    ingestion or a sync, or synced after being counted as missing), from
+    one id/hash query. None when the snapshot doesn't track hashes at all.
+    """
+    if snapshot.card_hashes is None:
+        return None
+    if not snapshot.card_hashes:
+        return set()
+    result = await db.execute(
+        select(Card.id, Card.content_hash).where(col(Card.id).in_(snapshot.card_hashes))
+    )
+    current = {card_id: content_hash or "" for card_id, content_hash in result.all()}
+    return {
+        card_id
+        for card_id, stamp in snapshot.card_hashes.items()
+        if current.get(card_id, "-") != stamp
+    }
+
+
+async def apply_deck_stats_delta(
+    db: AsyncSession,
+    deck_id: int,
+    before: CardQuantities,
+    after: CardQuantities,
+) -> DeckStats:
+    """
+    Brings a deck's stats snapshot from `before` to `after` by adding/removing
+    only the changed cards' contributions — one Card lookup for just those
+    ids, not a reload of the whole deck. Falls back to a rebuild when a
+    changed card's row isn't the one the snapshot counted (removing it would
+    subtract the wrong amounts) or when the result would go negative.
+    Doesn't commit; callers commit it together with the deck edit itself.
+    """
+    snapshot = await _locked_snapshot(db, deck_id)
+    if (snapshot is None and before) or (snapshot is not None and snapshot.card_hashes is None):
+        return await rebuild_deck_stats(db, deck_id)
+
+    deltas = _main_deltas(before, after)
+    cards: Dict[str, Card] = {}
+    if deltas:
+        result = await db.execute(select(Card).where(col(Card.id).in_(deltas)))
+        cards = {card.id: card for card in result.scalars().all()}
+
+    card_hashes = dict(snapshot.card_hashes) if snapshot is not None else {}
+    for card_id in deltas:
+        counted = card_hashes.get(card_id)
+        if counted is not None and counted != card_stamp(cards.get(card_id)):
+            return await rebuild_deck_stats(db, deck_id)
+
+    totals = copy.deepcopy(snapshot.totals) if snapshot is not None else empty_totals()
+    for card_id, delta in deltas.items():
+        add_card_to_totals(totals, cards.get(card_id), delta)
+    if _has_negative(totals):
+        return await rebuild_deck_stats(db, deck_id)
+
+    in_main = {
+        card_id
+        for (card_id, board), quantity in after.items()
+        if board == "main" and quantity
+    }
+    for card_id in deltas:
+        if card_id in in_main:
+            card_hashes[card_id] = card_stamp(cards.get(card_id))
+        else:
+            card_hashes.pop(card_id, None)
+
+    if snapshot is None:
+        snapshot = DeckStats(deck_id=deck_id, version=0)
+    else:
+        snapshot.version += 1
+
+    # Reassigned (not mutated in place) so SQLAlchemy sees the JSON change.
+    snapshot.totals = totals
+    snapshot.card_hashes = card_hashes
+    db.add(snapshot)
+    return snapshot
@@ -0,0 +1,172 @@
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, and_, case, cast, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlmodel import col, select
+
+from app.models.card import Card
+from app.models.deck import Deck, DeckCard
+
+# WUBRG order, as colour identities are conventionally written.
+IDENTITY_ORDER = "WUBRG"
+# Preferred image_uris keys for a deck's cover, best first.
+COVER_IMAGE_KEYS = ("art_crop", "normal", "large", "small")
+
+Cursor = Tuple[datetime, int]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(updated_at: datetime, deck_id: int) -> str:
+    """Opaque keyset cursor for the deck after which the next page starts."""
+    raw = f"{updated_at.isoformat()}|{deck_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        updated_at, deck_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(updated_at), int(deck_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}") from exc
+
+
+def cover_image(
+    image_uris: Optional[Dict[str, str]], card_faces: Optional[List[Dict[str, Any]]]
+) -> Optional[str]:
+    """Cover art URL from a card's images (the front face's, for cards
+    whose images live on their faces)."""
+    if not image_uris and card_faces:
+        image_uris = card_faces[0].get("image_uris")
+    for key in COVER_IMAGE_KEYS:
+        if image_uris and image_uris.get(key):
+            return image_uris[key]
+    return None
+
+
+@dataclass
+class DeckSummaryRow:
+    id: int
+    title: str
+    format: Optional[str]
+    updated_at: datetime
+    card_count: int = 0
+    color_identity: List[str] = field(default_factory=list)
+    cover_image: Optional[str] = None
+    cards: Optional[List[DeckCard]] = None
+
+
+async def list_deck_summaries(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    cursor: Optional[Cursor] = None,
+    include_cards: bool = False,
+) -> Tuple[List[DeckSummaryRow], Optional[str]]:
+    """
+    One page of the user's decks, most recently updated first, as summaries
+    computed in SQL: card count (main + commander), colour identity (union
+    over those cards) and a cover image (the commander, else the main card
+    with most copies). Three queries per page however large the library —
+    the page of decks by keyset on (updated_at, id), one aggregate over just
+    those decks' cards, one cover lookup — plus one for the cards themselves
+    when `include_cards`. Returns the rows and the next page's cursor.
+    """
+    query = (
+        select(Deck.id, Deck.title, Deck.format, Deck.updated_at)
+        .where(Deck.user_id == user_id)
+        .order_by(col(Deck.updated_at).desc(), col(Deck.id).desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        updated_at, deck_id = cursor
+        query = query.where(
+            or_(
+                col(Deck.updated_at) < updated_at,
+                and_(col(Deck.updated_at) == updated_at, col(Deck.id) < deck_id),
+            )
+        )
+    page = (await db.execute(query)).all()
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = encode_cursor(page[-1].updated_at, page[-1].id)
+    rows = {
+        deck.id: DeckSummaryRow(
+            id=deck.id, title=deck.title, format=deck.format, updated_at=deck.updated_at
+        )
+        for deck in page
+    }
+    if not rows:
+        return [], None
+
+    # Identity colours as JSON-array substring tests, the same portable
+    # approach card_query uses for `id:`.
+    identity_text = cast(Card.color_identity, String)
+    counted = col(DeckCard.board).in_(("main", "commander"))
+    aggregates = await db.execute(
+        select(
+            DeckCard.deck_id,
+            func.sum(DeckCard.quantity),
+            *(
+                func.max(case((identity_text.like(f'%"{color}"%'), 1), else_=0))
+                for color in IDENTITY_ORDER
+            ),
+        )
+        .join(Card, col(Card.id) == col(DeckCard.card_id))
+        .where(col(DeckCard.deck_id).in_(rows))
+        .where(counted)
+        .group_by(col(DeckCard.deck_id))
+    )
+    for deck_id, count, *has_color in aggregates.all():
+        row = rows[deck_id]
+        row.card_count = int(count or 0)
+        row.color_identity = [c for c, has in zip(IDENTITY_ORDER, has_color) if has]
+
+    ranked = (
+        select(
+            DeckCard.deck_id,
+            DeckCard.card_id,
+            func.row_number()
+            .over(
+                partition_by=col(DeckCard.deck_id),
+                order_by=(
+                    case((col(DeckCard.board) == "commander", 0), else_=1),
+                    col(DeckCard.quantity).desc(),
+                    col(DeckCard.card_id),
+                ),
+            )
+            .label("rank"),
+        )
+        .where(col(DeckCard.deck_id).in_(rows))
+        .where(counted)
+        .subquery()
+    )
+    covers = await db.execute(
+        select(ranked.c.deck_id, Card.image_uris, Card.card_faces)
+        .join(Card, col(Card.id) == ranked.c.card_id)
+        .where(ranked.c.rank == 1)
+    )
+    for deck_id, image_uris, card_faces in covers.all():
+        rows[deck_id].cover_image = cover_image(image_uris, card_faces)
+
+    if include_cards:
+        cards = await db.execute(
+            select(DeckCard)
+            .where(col(DeckCard.deck_id).in_(rows))
+            .options(selectinload(DeckCard.card))  # type: ignore[arg-type]
+        )
+        for row in rows.values():
+            row.cards = []
+        for dc in cards.scalars().all():
+            rows[dc.deck_id].cards.append(dc)
+
+    return list(rows.values()), next_cursor
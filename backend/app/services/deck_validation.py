@@ -0,0 +1,264 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from app.core.legality import format_key, legality_status
+from app.models.card import Card
+from app.models.deck import Deck, DeckCard
+
+
+@dataclass(frozen=True)
+class DeckRules:
+    size: int
+    exact_size: bool = False  # exactly `size` cards, rather than at least
+    max_copies: Optional[int] = 4  # None: no limit (limited)
+    sideboard: Optional[int] = 15  # max sideboard size; None: no limit
+    commander: bool = False  # needs a commander; colour identity applies
+    check_legality: bool = True
+
+
+_CONSTRUCTED = DeckRules(size=60)
+_LIMITED = DeckRules(size=40, max_copies=None, sideboard=None, check_legality=False)
+_HUNDRED_CARD_COMMANDER = DeckRules(
+    size=100, exact_size=True, max_copies=1, sideboard=None, commander=True
+)
+_SIXTY_CARD_COMMANDER = DeckRules(
+    size=60, exact_size=True, max_copies=1, sideboard=None, commander=True
+)
+
+# Keyed by Scryfall format key (see app/core/legality.py); any other
+# known format is 60-card constructed.
+FORMAT_RULES: Dict[str, DeckRules] = {
+    "commander": _HUNDRED_CARD_COMMANDER,
+    "paupercommander": _HUNDRED_CARD_COMMANDER,
+    "duel": _HUNDRED_CARD_COMMANDER,
+    "predh": _HUNDRED_CARD_COMMANDER,
+    # Scryfall's "brawl" is (Historic) Brawl, 100 cards; only Standard Brawl
+    # is 60.
+    "brawl": _HUNDRED_CARD_COMMANDER,
+    "standardbrawl": _SIXTY_CARD_COMMANDER,
+    "oathbreaker": _SIXTY_CARD_COMMANDER,
+}
+
+_LIMITED_NAMES = {"limited", "draft", "sealed"}
+
+# A deck's commander zone holds at most a commander pair (partners,
+# backgrounds) or an oathbreaker and its signature spell.
+MAX_COMMANDERS = 2
+
+
+def rules_for(deck_format: Optional[str]) -> Optional[DeckRules]:
+    """Construction rules for a deck's format name, or None if unknown."""
+    if deck_format and deck_format.strip().lower() in _LIMITED_NAMES:
+        return _LIMITED
+    key = format_key(deck_format)
+    if key is None:
+        return None
+    return FORMAT_RULES.get(key, _CONSTRUCTED)
+
+
+@dataclass
+class DeckCardRow:
+    """One DeckCard joined to the card columns validation needs."""
+
+    card_id: str
+    board: str
+    quantity: int
+    name: str
+    type_line: Optional[str] = None
+    oracle_text: Optional[str] = None
+    color_identity: Optional[List[str]] = None
+    legal_mask: int = 0
+    restricted_mask: int = 0
+    banned_mask: int = 0
+
+
+@dataclass
+class Violation:
+    code: str  # size, sideboard, copies, legality, commander, color_identity, format
+    message: str
+    card_ids: List[str] = field(default_factory=list)
+
+
+def copy_limit(row: DeckCardRow, rules: DeckRules) -> Optional[int]:
+    """Copies of this card the format allows; None for no limit."""
+    type_line = row.type_line or ""
+    oracle_text = row.oracle_text or ""
+    if "Basic" in type_line and "Land" in type_line:
+        return None
+    if "A deck can have any number of cards named" in oracle_text:
+        return None
+    if "A deck can have up to seven cards named" in oracle_text:
+        return 7
+    return rules.max_copies
+
+
+def validate_deck(
+    deck_format: Optional[str], rows: Sequence[DeckCardRow]
+) -> List[Violation]:
+    """
+    Every rule the deck breaks in its format: size, sideboard size, copy
+    limits (by card name, across main/side/commander), legality (from the
+    cards' legality bitmasks; restricted means one copy), and for commander
+    formats the commander count and colour identity. Maybeboard cards are
+    expected to be filtered out already.
+    """
+    rules = rules_for(deck_format)
+    if rules is None:
+        return [Violation("format", f"Unknown format: {deck_format or '(none)'}")]
+    fmt = format_key(deck_format)
+    violations: List[Violation] = []
+
+    deck_size = sum(r.quantity for r in rows if r.board in ("main", "commander"))
+    if rules.exact_size and deck_size != rules.size:
+        violations.append(
+            Violation("size", f"Deck has {deck_size} cards; {deck_format} needs exactly {rules.size}.")
+        )
+    elif deck_size < rules.size:
+        violations.append(
+            Violation("size", f"Deck has {deck_size} cards; {deck_format} needs at least {rules.size}.")
+        )
+
+    side_size = sum(r.quantity for r in rows if r.board == "side")
+    if rules.sideboard is not None and side_size > rules.sideboard:
+        violations.append(
+            Violation("sideboard", f"Sideboard has {side_size} cards; the limit is {rules.sideboard}.")
+        )
+
+    by_name: Dict[str, List[DeckCardRow]] = defaultdict(list)
+    for row in rows:
+        by_name[row.name].append(row)
+    for name, printings in by_name.items():
+        copies = sum(r.quantity for r in printings)
+        limit = copy_limit(printings[0], rules)
+        card_ids = sorted({r.card_id for r in printings})
+        if limit is not None and copies > limit:
+            violations.append(
+                Violation("copies", f"{copies} copies of {name}; the limit is {limit}.", card_ids)
+            )
+        if not (rules.check_legality and fmt):
+            continue
+        card = printings[0]
+        if not (card.legal_mask or card.banned_mask):
+            # No legality data synced for this card yet; don't guess.
+            continue
+        status = legality_status(fmt, card.legal_mask, card.restricted_mask, card.banned_mask)
+        if status in ("banned", "not_legal"):
+            label = "banned" if status == "banned" else "not legal"
+            violations.append(
+                Violation("legality", f"{name} is {label} in {deck_format}.", card_ids)
+            )
+        elif status == "restricted" and copies > 1:
+            violations.append(
+                Violation("legality", f"{name} is restricted in {deck_format} (max 1 copy).", card_ids)
+            )
+
+    if rules.commander:
+        commanders = [r for r in rows if r.board == "commander"]
+        count = sum(r.quantity for r in commanders)
+        if count == 0:
+            violations.append(Violation("commander", "Deck has no commander."))
+        elif count > MAX_COMMANDERS:
+            violations.append(
+                Violation("commander", f"Deck has {count} commanders; at most {MAX_COMMANDERS}.")
+            )
+        identities = [r.color_identity for r in commanders]
+        if commanders and all(identity is not None for identity in identities):
+            allowed = set().union(*identities)
+            outside = sorted(
+                {
+                    r.card_id
+                    for r in rows
+                    if r.board in ("main", "side")
+                    and r.color_identity is not None
+                    and not set(r.color_identity) <= allowed
+                }
+            )
+            if outside:
+                violations.append(
+                    Violation(
+                        "color_identity",
+                        f"{len(outside)} card(s) outside the commander's colour identity.",
+                        outside,
+                    )
+                )
+
+    return violations
+
+
+@dataclass
+class DeckValidation:
+    deck_id: int
+    title: str
+    format: Optional[str]
+    violations: List[Violation]
+
+    @property
+    def valid(self) -> bool:
+        return not self.violations
+
+
+async def validate_user_decks(db: AsyncSession, user_id: int) -> List[DeckValidation]:
+    """
+    Validates every deck `user_id` owns in two queries, however many decks
+    there are: one for the decks, one for all their (non-maybeboard) cards
+    joined to the card columns validation reads. No JSON legality dicts are
+    loaded — legality comes from the bitmask columns.
+    """
+    decks = await db.execute(
+        select(Deck.id, Deck.title, Deck.format)
+        .where(Deck.user_id == user_id)
+        .order_by(col(Deck.id))
+    )
+    decks = decks.all()
+    if not decks:
+        return []
+
+    result = await db.execute(
+        select(
+            DeckCard.deck_id,
+            DeckCard.card_id,
+            DeckCard.board,
+            DeckCard.quantity,
+            Card.name,
+            Card.type_line,
+            Card.oracle_text,
+            Card.color_identity,
+            Card.legal_mask,
+            Card.restricted_mask,
+            Card.banned_mask,
+        )
+        .join(Deck, col(Deck.id) == col(DeckCard.deck_id))
+        .join(Card, col(Card.id) == col(DeckCard.card_id))
+        .where(Deck.user_id == user_id)
+        .where(col(DeckCard.board) != "maybe")
+    )
+    rows_by_deck: Dict[int, List[DeckCardRow]] = defaultdict(list)
+    for r in result.all():
+        rows_by_deck[r.deck_id].append(
+            DeckCardRow(
+                card_id=r.card_id,
+                board=r.board,
+                quantity=r.quantity,
+                name=r.name,
+                type_line=r.type_line,
+                oracle_text=r.oracle_text,
+                color_identity=r.color_identity,
+                legal_mask=r.legal_mask or 0,
+                restricted_mask=r.restricted_mask or 0,
+                banned_mask=r.banned_mask or 0,
+            )
+        )
+
+    return [
+        DeckValidation(
+            deck_id=deck.id,
+            title=deck.title,
+            format=deck.format,
+            violations=validate_deck(deck.format, rows_by_deck.get(deck.id, [])),
+        )
+        for deck in decks
+    ]
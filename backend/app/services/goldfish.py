@@ -2,7 +2,7 @@ import random
 from typing import Dict, Optional, Tuple
 
 from app.models.deck import Deck
-from app.models.goldfish import GameState, GoldfishActionIn, Zones
+from app.models.goldfish import GameState, GoldfishActionIn, Zones, ZonesT
 
 COMMANDER_LIKE_FORMATS = {"Commander", "Brawl", "Oathbreaker"}
 
@@ -15,13 +15,32 @@ COMMANDER_LIKE_FORMATS = {"Commander", "Brawl", "Oathbreaker"}
 ZONE_MUTATING_ACTIONS = {"draw", "play_land", "cast", "move_zone", "shuffle"}
 
 
-def _shuffled_library(deck: Deck) -> list[str]:
+def _shuffled(cards: Tuple[str, ...]) -> Tuple[str, ...]:
+    shuffled = list(cards)
+    random.shuffle(shuffled)
+    return tuple(shuffled)
+
+
+def _shuffled_library(deck: Deck) -> Tuple[str, ...]:
     library: list[str] = []
     for dc in deck.cards:
         if dc.board == "main":
             library.extend([dc.card_id] * dc.quantity)
-    random.shuffle(library)
-    return library
+    return _shuffled(tuple(library))
+
+
+def _without(cards: Tuple[str, ...], card_id: str) -> Tuple[str, ...]:
+    """`cards` minus the first copy of `card_id` (which must be there)."""
+    i = cards.index(card_id)
+    return cards[:i] + cards[i + 1 :]
+
+
+def _move(zones: ZonesT, card_id: str, from_zone: str, to_zone: str) -> ZonesT:
+    """Moves one copy of `card_id` to the end of `to_zone`; only the two
+    zones involved are rebuilt."""
+    changes = {from_zone: _without(zones.zone(from_zone), card_id)}
+    changes[to_zone] = changes.get(to_zone, zones.zone(to_zone)) + (card_id,)
+    return zones.replace(**changes)
 
 
 def build_initial_state(deck: Deck, opponent_deck: Optional[Deck] = None) -> GameState:
@@ -48,22 +67,31 @@ def build_initial_state(deck: Deck, opponent_deck: Optional[Deck] = None) -> Gam
     )
 
 
-def draw_card(zones: Zones) -> Tuple[Zones, Optional[str]]:
+def draw_cards(zones: ZonesT, count: int) -> Tuple[ZonesT, Tuple[str, ...]]:
+    """
+    Draws up to `count` cards from the top of the library into hand in one
+    step — library and hand are each rebuilt once, whatever `count` is.
+    Returns the new zones and the drawn card ids (fewer than `count`, or
+    none, if the library runs out).
+    """
+    drawn = zones.library[:count]
+    if not drawn:
+        return zones, ()
+    return zones.replace(library=zones.library[count:], hand=zones.hand + drawn), drawn
+
+
+def draw_card(zones: ZonesT) -> Tuple[ZonesT, Optional[str]]:
     """
     Draws one card from the top of the library into hand. Returns the new
     zones and the drawn card's id (None if the library was empty). Shared by
-    the `draw` action, the opening-hand deal, and `next_turn`'s auto-draw —
-    "draw a card" is the same operation everywhere it happens. Takes a bare
-    `Zones` (not a full `GameState`) so it works identically for a player's
-    own zones or an opponent's `opponent_zones` — a `GameState` is-a `Zones`,
-    so passing one through here is still valid.
+    the `draw` action and `next_turn`'s auto-draw — "draw a card" is the
+    same operation everywhere it happens. Takes a bare `Zones` (not a full
+    `GameState`) so it works identically for a player's own zones or an
+    opponent's `opponent_zones` — a `GameState` is-a `Zones`, so passing one
+    through here is still valid, and returns a `GameState`.
     """
-    next_zones = zones.model_copy(deep=True)
-    if not next_zones.library:
-        return next_zones, None
-    card_id = next_zones.library.pop(0)
-    next_zones.hand.append(card_id)
-    return next_zones, card_id
+    next_zones, drawn = draw_cards(zones, 1)
+    return next_zones, drawn[0] if drawn else None
 
 
 def _plural(n: int) -> str:
@@ -78,28 +106,19 @@ def draw_opening_hand(state: GameState, count: int = 7) -> Tuple[GameState, str]
     turn exchange). Draws fewer (or none) on either side if that library
     doesn't have enough cards; never raises. Reads/writes `state.opponent_zones`
     directly rather than taking a second `Zones` argument, since by the time
-    this runs `build_initial_state` has already populated it.
+    this runs `build_initial_state` has already populated it. Each side's
+    hand is dealt with a single `draw_cards`, not `count` separate draws.
     """
-    next_state = state
-    drawn = 0
-    for _ in range(count):
-        next_state, card_id = draw_card(next_state)
-        if card_id is None:
-            break
-        drawn += 1
+    next_state, drawn_ids = draw_cards(state, count)
+    drawn = len(drawn_ids)
 
     if next_state.opponent_zones is None:
         plural = _plural(drawn)
         return next_state, f"Drew opening hand ({drawn} card{plural})"
 
-    opponent_zones = next_state.opponent_zones
-    opponent_drawn = 0
-    for _ in range(count):
-        opponent_zones, card_id = draw_card(opponent_zones)
-        if card_id is None:
-            break
-        opponent_drawn += 1
-    next_state.opponent_zones = opponent_zones
+    opponent_zones, opponent_ids = draw_cards(next_state.opponent_zones, count)
+    opponent_drawn = len(opponent_ids)
+    next_state = next_state.replace(opponent_zones=opponent_zones)
 
     if drawn == count and opponent_drawn == count:
         label = f"Drew opening hands ({count} cards each)"
@@ -121,27 +140,33 @@ def apply_action(
     life. Raises ValueError on data-integrity problems (e.g. moving a card
     that isn't actually in the zone it's claimed to be in, or targeting the
     opponent in a session with no opponent deck); the route turns that into a
-    400.
+    400. `state` is never modified: the result shares every zone the action
+    didn't touch with it, so an action costs O(cards in the touched zones),
+    not a copy of the whole game.
     """
-    next_state = state.model_copy(deep=True)
 
     def name_of(card_id: str) -> str:
         return card_names.get(card_id, card_id)
 
-    target_zones: Optional[Zones] = None
+    target_zones: Zones = state
     prefix = ""
     if action.type in ZONE_MUTATING_ACTIONS:
-        target_zones = next_state if action.target == "self" else next_state.opponent_zones
-        if target_zones is None:
-            raise ValueError("This session has no opponent deck")
+        if action.target == "opponent":
+            if state.opponent_zones is None:
+                raise ValueError("This session has no opponent deck")
+            target_zones = state.opponent_zones
         prefix = "" if action.target == "self" else "Opponent: "
 
+    def with_target(zones: Zones) -> GameState:
+        # For "self" the zones were rebuilt from `state` itself, so they
+        # already are the next GameState.
+        if action.target == "self":
+            return zones  # type: ignore[return-value]
+        return state.replace(opponent_zones=zones)
+
     if action.type == "draw":
         drawn_zones, card_id = draw_card(target_zones)
-        if action.target == "self":
-            next_state = drawn_zones
-        else:
-            next_state.opponent_zones = drawn_zones
+        next_state = with_target(drawn_zones)
         if card_id is None:
             return next_state, f"{prefix}Tried to draw with an empty library"
         return next_state, f"{prefix}Drew {name_of(card_id)}"
@@ -151,23 +176,18 @@ def apply_action(
             raise ValueError("card_id is required for this action")
         if action.card_id not in target_zones.hand:
             raise ValueError("Card is not in hand")
-        target_zones.hand.remove(action.card_id)
-        target_zones.battlefield.append(action.card_id)
-        if action.target == "opponent":
-            next_state.opponent_zones = target_zones
+        next_state = with_target(_move(target_zones, action.card_id, "hand", "battlefield"))
         verb = "Played" if action.type == "play_land" else "Cast"
         return next_state, f"{prefix}{verb} {name_of(action.card_id)}"
 
     if action.type == "move_zone":
         if not action.card_id or not action.from_zone or not action.to_zone:
             raise ValueError("card_id, from_zone, and to_zone are required")
-        source = target_zones.zone(action.from_zone)
-        if action.card_id not in source:
+        if action.card_id not in target_zones.zone(action.from_zone):
             raise ValueError(f"Card is not in {action.from_zone}")
-        source.remove(action.card_id)
-        target_zones.zone(action.to_zone).append(action.card_id)
-        if action.target == "opponent":
-            next_state.opponent_zones = target_zones
+        next_state = with_target(
+            _move(target_zones, action.card_id, action.from_zone, action.to_zone)
+        )
         return (
             next_state,
             f"{prefix}Moved {name_of(action.card_id)} from {action.from_zone} to {action.to_zone}",
@@ -177,17 +197,15 @@ def apply_action(
         if action.life_total is None:
             raise ValueError("life_total is required for this action")
         if action.target == "opponent":
-            old_life = next_state.opponent_life_total
-            next_state.opponent_life_total = action.life_total
+            old_life = state.opponent_life_total
+            next_state = state.replace(opponent_life_total=action.life_total)
             return next_state, f"Opponent life: {old_life} → {action.life_total}"
-        old_life = next_state.life_total
-        next_state.life_total = action.life_total
+        old_life = state.life_total
+        next_state = state.replace(life_total=action.life_total)
         return next_state, f"Life: {old_life} → {action.life_total}"
 
     if action.type == "shuffle":
-        random.shuffle(target_zones.library)
-        if action.target == "opponent":
-            next_state.opponent_zones = target_zones
+        next_state = with_target(target_zones.replace(library=_shuffled(target_zones.library)))
         return next_state, f"{prefix}Shuffled library"
 
     # "next_turn" is handled by the route directly, not here — advancing the
@@ -0,0 +1,325 @@
+import base64
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.goldfish import ZONES, GameState, GoldfishNode
+from app.services.cache import MemoryCache
+
+# A node's stored form: (state, delta) — a keyframe has the full state and
+# no delta, any other node with a game state has only the delta from its
+# parent's state; (None, None) for plain notes without one.
+StoredState = Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+_SIDES = (("self", None), ("opponent", "opponent_zones"))
+_SCALARS = ("life_total", "opponent_life_total")
+
+
+def _zone_edit(old: Sequence[str], new: Sequence[str]) -> Optional[List[Any]]:
+    """
+    `new` as an edit of `old`: [kept prefix length, kept suffix length,
+    *cards in between]. Every zone change an action makes (draws off the
+    top, a card added to the end or taken out of the middle) is one such
+    splice, so this is a few ints plus the cards that actually moved. None
+    if the zone is unchanged.
+    """
+    if list(old) == list(new):
+        return None
+    prefix = 0
+    limit = min(len(old), len(new))
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while (
+        suffix < limit - prefix
+        and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]
+    ):
+        suffix += 1
+    return [prefix, suffix, *new[prefix : len(new) - suffix]]
+
+
+def _apply_zone_edit(old: Sequence[str], edit: List[Any]) -> List[str]:
+    prefix, suffix, *middle = edit
+    return [*old[:prefix], *middle, *old[len(old) - suffix :]]
+
+
+def diff_states(parent: Dict[str, Any], child: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Compact delta taking `parent` to `child` (both `model_dump(mode="json")`
+    GameStates): changed zones as splices per side, changed life totals as
+    values. None when one side has opponent zones and the other doesn't,
+    which a delta doesn't express — store a keyframe instead.
+    """
+    if (parent.get("opponent_zones") is None) != (child.get("opponent_zones") is None):
+        return None
+    delta: Dict[str, Any] = {}
+    for side, key in _SIDES:
+        old = parent if key is None else parent.get(key)
+        new = child if key is None else child.get(key)
+        if new is None:
+            continue
+        edits = {}
+        for zone in ZONES:
+            edit = _zone_edit(old.get(zone, []), new.get(zone, []))
+            if edit is not None:
+                edits[zone] = edit
+        if edits:
+            delta[side] = edits
+    for scalar in _SCALARS:
+        if child.get(scalar) != parent.get(scalar):
+            delta[scalar] = child.get(scalar)
+    return delta
+
+
+def apply_delta(parent: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """The state `delta` leads to from `parent`; `parent` isn't modified."""
+    state = dict(parent)
+    for side, key in _SIDES:
+        edits = delta.get(side)
+        if not edits:
+            continue
+        zones = state if key is None else dict(state[key])
+        for zone, edit in edits.items():
+            zones[zone] = _apply_zone_edit(zones.get(zone, []), edit)
+        if key is not None:
+            state[key] = zones
+    for scalar in _SCALARS:
+        if scalar in delta:
+            state[scalar] = delta[scalar]
+    return state
+
+
+def card_dictionary(state: GameState) -> List[str]:
+    """
+    Every distinct card id in a session's starting state, sorted: the
+    session's card dictionary. Actions only move cards between zones, so no
+    later state has a card that isn't in it.
+    """
+    cards = set()
+    for zones in (state, state.opponent_zones):
+        if zones is not None:
+            for zone in ZONES:
+                cards.update(zones.zone(zone))
+    return sorted(cards)
+
+
+class CardCodec:
+    """
+    Stored-form encoding of a session's node states against its card
+    dictionary (GoldfishSession.card_ids): each zone becomes the base64 of
+    its cards' dictionary indexes as little-endian uint16s (~3 characters a
+    card instead of a quoted 36-character UUID), and delta splices carry
+    indexes instead of ids. Decoding is per value — a zone that's still a
+    list, or a splice card that's still a string, passes through — so
+    sessions from before dictionaries, and any card a dictionary lacks,
+    read back the same. Only the stored form changes; callers always see
+    plain card id lists.
+    """
+
+    def __init__(self, card_ids: Optional[List[str]] = None):
+        self.card_ids = card_ids or []
+        self._index = {card_id: i for i, card_id in enumerate(self.card_ids)}
+        self.enabled = 0 < len(self.card_ids) <= 0xFFFF
+
+    def _pack_zone(self, cards: List[str]) -> Any:
+        try:
+            packed = array("H", (self._index[card_id] for card_id in cards))
+        except KeyError:
+            return cards
+        if sys.byteorder == "big":
+            packed.byteswap()
+        return base64.b64encode(packed.tobytes()).decode("ascii")
+
+    def _unpack_zone(self, value: Any) -> List[str]:
+        if not isinstance(value, str):
+            return value
+        packed = array("H")
+        packed.frombytes(base64.b64decode(value))
+        if sys.byteorder == "big":
+            packed.byteswap()
+        return [self.card_ids[i] for i in packed]
+
+    def _map_zones(self, state: Dict[str, Any], fn) -> Dict[str, Any]:
+        mapped = dict(state)
+        for zone in ZONES:
+            if zone in mapped:
+                mapped[zone] = fn(mapped[zone])
+        if mapped.get("opponent_zones") is not None:
+            opponent = dict(mapped["opponent_zones"])
+            for zone in ZONES:
+                if zone in opponent:
+                    opponent[zone] = fn(opponent[zone])
+            mapped["opponent_zones"] = opponent
+        return mapped
+
+    def _map_splices(self, delta: Dict[str, Any], fn) -> Dict[str, Any]:
+        mapped = dict(delta)
+        for side, _key in _SIDES:
+            if side in mapped:
+                mapped[side] = {
+                    zone: [edit[0], edit[1], *(fn(card) for card in edit[2:])]
+                    for zone, edit in mapped[side].items()
+                }
+        return mapped
+
+    def pack_state(self, state: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if state is None or not self.enabled:
+            return state
+        return self._map_zones(state, self._pack_zone)
+
+    def unpack_state(self, state: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if state is None:
+            return None
+        return self._map_zones(state, self._unpack_zone)
+
+    def pack_delta(self, delta: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if delta is None or not self.enabled:
+            return delta
+        return self._map_splices(delta, lambda card: self._index.get(card, card))
+
+    def unpack_delta(self, delta: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if delta is None:
+            return None
+        return self._map_splices(
+            delta, lambda card: self.card_ids[card] if isinstance(card, int) else card
+        )
+
+
+def encode_state(
+    depth: int,
+    parent_state: Optional[Dict[str, Any]],
+    state: Optional[Dict[str, Any]],
+    codec: CardCodec,
+) -> StoredState:
+    """
+    How a new node at `depth` stores `state`: as a keyframe on every
+    GOLDFISH_KEYFRAME_INTERVAL-th ply (and whenever there's no parent state
+    to diff against), else as a delta from `parent_state`. Keyframing by
+    depth bounds any node's reconstruction to fewer than the interval's
+    worth of deltas, whichever branch it's on. Either is packed with the
+    session's `codec`.
+    """
+    if state is None:
+        return None, None
+    interval = max(1, settings.GOLDFISH_KEYFRAME_INTERVAL)
+    if parent_state is None or depth % interval == 0:
+        return codec.pack_state(state), None
+    delta = diff_states(parent_state, state)
+    if delta is None:
+        return codec.pack_state(state), None
+    return None, codec.pack_delta(delta)
+
+
+def stored_node(node: GoldfishNode, codec: CardCodec) -> Dict[str, Any]:
+    """A node's fields as stored (keyframe state or delta), unpacked."""
+    return {
+        "state": codec.unpack_state(node.state),
+        "delta": codec.unpack_delta(node.delta),
+    }
+
+
+class NodeStateCache:
+    """
+    Reconstructed node states by node id, LRU-bounded. A node's state never
+    changes once written, so entries only go stale when a node is deleted
+    (and its id reused, as SQLite can): the delete route evicts them.
+    Cached dicts are shared — callers must not modify them.
+    """
+
+    def __init__(self, max_entries: int):
+        self._entries = MemoryCache(max_entries)
+
+    def get(self, node_id: int) -> Optional[Dict[str, Any]]:
+        return self._entries.get(str(node_id))[1]
+
+    def put(self, node_id: int, state: Dict[str, Any]) -> None:
+        self._entries.set(str(node_id), state, None)
+
+    def evict(self, node_ids) -> None:
+        for node_id in node_ids:
+            self._entries.delete(str(node_id))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Process-wide; cleared in app/main.py's lifespan.
+node_state_cache = NodeStateCache(settings.GOLDFISH_STATE_CACHE_MAX_ENTRIES)
+
+
+def _resolve(
+    node: GoldfishNode, by_id: Dict[int, GoldfishNode], codec: CardCodec
+) -> Optional[Dict[str, Any]]:
+    """`node`'s full state from nodes already in memory; walks up to the
+    nearest keyframe (or cached ancestor), then replays deltas down."""
+    if node.state is not None:
+        return _keyframe(node, codec)
+    if node.delta is None:
+        return None
+    chain: List[GoldfishNode] = []
+    current: Optional[GoldfishNode] = node
+    state = None
+    while current is not None and current.state is None:
+        state = node_state_cache.get(current.id)
+        if state is not None:
+            break
+        chain.append(current)
+        current = by_id.get(current.parent_id)
+    if state is None:
+        if current is None:
+            raise ValueError(f"Goldfish node {node.id} has no keyframe ancestor")
+        state = _keyframe(current, codec)
+    for link in reversed(chain):
+        state = apply_delta(state, codec.unpack_delta(link.delta))
+        node_state_cache.put(link.id, state)
+    return state
+
+
+def _keyframe(node: GoldfishNode, codec: CardCodec) -> Dict[str, Any]:
+    state = node_state_cache.get(node.id)
+    if state is None:
+        state = codec.unpack_state(node.state)
+        node_state_cache.put(node.id, state)
+    return state
+
+
+def session_states(
+    nodes: Sequence[GoldfishNode], codec: CardCodec
+) -> Dict[int, Optional[Dict[str, Any]]]:
+    """Full states for every node of a session tree, by node id."""
+    by_id = {node.id: node for node in nodes}
+    return {node.id: _resolve(node, by_id, codec) for node in nodes}
+
+
+async def node_state(
+    db: AsyncSession, node: GoldfishNode, codec: CardCodec
+) -> Optional[Dict[str, Any]]:
+    """
+    One node's full state, loading only its ancestors back to the nearest
+    keyframe (at most GOLDFISH_KEYFRAME_INTERVAL - 1 of them) — fewer when
+    a cached ancestor state is found first, which for a node that was just
+    added (the usual parent of the next action) is itself.
+    """
+    if node.state is not None:
+        return _keyframe(node, codec)
+    if node.delta is None:
+        return None
+    cached = node_state_cache.get(node.id)
+    if cached is not None:
+        return cached
+    by_id = {node.id: node}
+    current = node
+    while (
+        current.state is None
+        and current.parent_id is not None
+        and node_state_cache.get(current.id) is None
+    ):
+        parent = await db.get(GoldfishNode, current.parent_id)
+        if parent is None:
+            break
+        by_id[parent.id] = parent
+        current = parent
+    return _resolve(node, by_id, codec)
@@ -0,0 +1,161 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, delete, func, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select
+
+from app.models.goldfish import GoldfishNode
+from app.services.goldfish_storage import CardCodec, apply_delta, encode_state, node_state
+
+# Subtree and ancestor queries as recursive CTEs, so an operation on a
+# branch costs one statement over that branch rather than loading the
+# whole session's nodes into Python. Both SQLite and Postgres run them.
+
+
+def descendants(node_id: int, max_depth: Optional[int] = None):
+    """
+    CTE of `node_id` and its descendants as (id, level) rows, level being
+    the distance below `node_id` (0 for itself); at most `max_depth` levels
+    down when given.
+    """
+    tree = (
+        select(GoldfishNode.id, literal(0, Integer).label("level"))
+        .where(GoldfishNode.id == node_id)
+        .cte("subtree", recursive=True)
+    )
+    children = select(GoldfishNode.id, (tree.c.level + 1).label("level")).join(
+        tree, col(GoldfishNode.parent_id) == tree.c.id
+    )
+    if max_depth is not None:
+        children = children.where(tree.c.level < max_depth)
+    return tree.union_all(children)
+
+
+def ancestors(node_id: int):
+    """CTE of `node_id` and every ancestor up to the root as (id, hops) rows,
+    hops being the distance above `node_id`."""
+    path = (
+        select(GoldfishNode.id, GoldfishNode.parent_id, literal(0, Integer).label("hops"))
+        .where(GoldfishNode.id == node_id)
+        .cte("path", recursive=True)
+    )
+    return path.union_all(
+        select(GoldfishNode.id, GoldfishNode.parent_id, (path.c.hops + 1).label("hops")).join(
+            path, col(GoldfishNode.id) == path.c.parent_id
+        )
+    )
+
+
+async def delete_subtree(db: AsyncSession, node_id: int) -> List[int]:
+    """Deletes a node and all its descendants in one statement; returns the
+    deleted ids. Doesn't commit."""
+    tree = descendants(node_id)
+    result = await db.execute(
+        delete(GoldfishNode)
+        .where(col(GoldfishNode.id).in_(select(tree.c.id)))
+        .returning(GoldfishNode.id)
+        .execution_options(synchronize_session="fetch")
+    )
+    return list(result.scalars().all())
+
+
+async def count_descendants(db: AsyncSession, node_id: int) -> int:
+    """How many nodes are below `node_id` (not counting itself)."""
+    tree = descendants(node_id)
+    result = await db.execute(select(func.count()).where(tree.c.level > 0))
+    return result.scalar_one()
+
+
+async def path_to_root(db: AsyncSession, node_id: int) -> List[Tuple]:
+    """(id, parent_id, label, turn_number, order_index) rows from the root
+    down to `node_id`, without game states."""
+    path = ancestors(node_id)
+    result = await db.execute(
+        select(
+            GoldfishNode.id,
+            GoldfishNode.parent_id,
+            GoldfishNode.label,
+            GoldfishNode.turn_number,
+            GoldfishNode.order_index,
+        )
+        .join(path, col(GoldfishNode.id) == path.c.id)
+        .order_by(path.c.hops.desc())
+    )
+    return list(result.all())
+
+
+async def clone_subtree(
+    db: AsyncSession,
+    node: GoldfishNode,
+    parent: Optional[GoldfishNode],
+    codec: CardCodec,
+) -> GoldfishNode:
+    """
+    Copies `node`'s branch under `parent` (None: as a new top-level node),
+    after its existing children. The branch is read with one CTE query and
+    inserted a level at a time, parents first, so each level's copies know
+    their new parent ids. The copy's root stores its full state as a
+    keyframe (its delta, if any, was against the original parent); the rest
+    are re-encoded for their new depths with encode_state, from states
+    resolved while walking the levels, so keyframes land on the interval's
+    multiples as they would for nodes added there. Doesn't commit.
+    """
+    tree = descendants(node.id)
+    result = await db.execute(
+        select(GoldfishNode, tree.c.level)
+        .join(tree, col(GoldfishNode.id) == tree.c.id)
+        .order_by(tree.c.level, col(GoldfishNode.order_index), col(GoldfishNode.id))
+    )
+    rows = result.all()
+
+    parent_id = parent.id if parent else None
+    siblings = await db.execute(
+        select(func.count())
+        .select_from(GoldfishNode)
+        .where(GoldfishNode.session_id == node.session_id)
+        .where(GoldfishNode.parent_id == parent_id)
+    )
+    order_index = siblings.scalar_one()
+    new_depth = parent.depth + 1 if parent else 0
+    root_state = await node_state(db, node, codec)
+
+    new_ids: Dict[int, int] = {}
+    states: Dict[int, Optional[Dict[str, Any]]] = {}
+    copies: Dict[int, GoldfishNode] = {}
+    level_copies: List[Tuple[int, GoldfishNode]] = []
+    current_level = 0
+    for original, level in rows:
+        if level != current_level:
+            await db.flush()
+            new_ids.update((old_id, copy.id) for old_id, copy in level_copies)
+            level_copies, current_level = [], level
+        is_root = level == 0
+        if is_root:
+            state = root_state
+            stored = (codec.pack_state(root_state), None)
+        else:
+            parent_state = states.get(original.parent_id)
+            if original.state is not None:
+                state = codec.unpack_state(original.state)
+            elif original.delta is not None and parent_state is not None:
+                state = apply_delta(parent_state, codec.unpack_delta(original.delta))
+            else:
+                state = None
+            stored = encode_state(new_depth + level, parent_state, state, codec)
+        states[original.id] = state
+        copy = GoldfishNode(
+            session_id=original.session_id,
+            parent_id=parent_id if is_root else new_ids[original.parent_id],
+            label=original.label,
+            turn_number=original.turn_number,
+            order_index=order_index if is_root else original.order_index,
+            trackers=original.trackers,
+            state=stored[0],
+            delta=stored[1],
+            depth=new_depth + level,
+        )
+        db.add(copy)
+        copies[original.id] = copy
+        level_copies.append((original.id, copy))
+    await db.flush()
+    return copies[node.id]
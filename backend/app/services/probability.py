@@ -0,0 +1,135 @@
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+OPENING_HAND_SIZE = 7
+
+# Joint outcomes enumerated by multivariate_at_least grow as the product of
+# each category's range — cap it so one request can't allocate gigabytes.
+_MAX_JOINT_OUTCOMES = 2_000_000
+
+
+def _log_factorials(n: int) -> np.ndarray:
+    """log(k!) for k in 0..n, as one cumulative sum instead of per-call math.comb."""
+    return np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, n + 1)))))
+
+
+def _log_comb(log_fact: np.ndarray, n, k) -> np.ndarray:
+    """
+    Elementwise log C(n, k) over broadcast arrays; -inf wherever the
+    combination is impossible (k < 0 or k > n), so exp() gives exactly 0.
+    """
+    n = np.asarray(n)
+    k = np.asarray(k)
+    valid = (k >= 0) & (k <= n)
+    n_safe = np.where(valid, n, 0)
+    k_safe = np.where(valid, k, 0)
+    out = log_fact[n_safe] - log_fact[k_safe] - log_fact[n_safe - k_safe]
+    return np.where(valid, out, -np.inf)
+
+
+def hypergeometric_pmf(
+    population: int, successes: int, draws: Sequence[int], max_k: int
+) -> np.ndarray:
+    """
+    P(X = k) for every sample size in `draws` (rows) and every k in
+    0..max_k (columns), in one broadcast pass.
+    P(X=k) = C(K, k) * C(N-K, n-k) / C(N, n)
+    """
+    log_fact = _log_factorials(population)
+    n = np.minimum(np.asarray(draws)[:, None], population)
+    k = np.arange(max_k + 1)[None, :]
+    log_p = (
+        _log_comb(log_fact, successes, k)
+        + _log_comb(log_fact, population - successes, n - k)
+        - _log_comb(log_fact, population, n)
+    )
+    return np.exp(log_p)
+
+
+def hypergeometric_at_least(
+    population: int, successes: int, draws: Sequence[int], max_k: int
+) -> np.ndarray:
+    """
+    P(X >= k) matrix matching hypergeometric_pmf's shape: a reverse cumulative
+    sum over k, with the tail beyond max_k folded back in so column k is the
+    true upper tail rather than a truncated one.
+    """
+    upper = max(max_k, min(population, max(draws, default=0)))
+    pmf = hypergeometric_pmf(population, successes, draws, upper)
+    tail = np.cumsum(pmf[:, ::-1], axis=1)[:, ::-1]
+    return np.clip(tail[:, : max_k + 1], 0.0, 1.0)
+
+
+def cards_seen(turn: int, on_the_play: bool, hand_size: int = OPENING_HAND_SIZE) -> int:
+    """Cards seen by `turn`: the opening hand plus one draw per turn, minus
+    the skipped turn-1 draw on the play."""
+    return hand_size + turn - (1 if on_the_play else 0)
+
+
+def land_odds_grid(
+    deck_size: int, land_count: int, max_turn: Optional[int] = None
+) -> Dict[str, List[List[float]]]:
+    """
+    Full "at least k lands by turn t" grid for turns 1..max_turn (default
+    settings.STATS_MAX_TURN) and k in 0..max_turn, on the play and on the
+    draw — rows are turns, columns are k. Both sides come out of a single
+    hypergeometric_at_least call.
+    """
+    if max_turn is None:
+        max_turn = settings.STATS_MAX_TURN
+    if deck_size <= 0:
+        return {"on_the_play": [], "on_the_draw": []}
+    turns = range(1, max_turn + 1)
+    draws = [cards_seen(t, True) for t in turns] + [cards_seen(t, False) for t in turns]
+    grid = np.round(hypergeometric_at_least(deck_size, land_count, draws, max_turn), 4)
+    return {
+        "on_the_play": grid[:max_turn].tolist(),
+        "on_the_draw": grid[max_turn:].tolist(),
+    }
+
+
+def multivariate_at_least(
+    population: int,
+    category_counts: Sequence[int],
+    draws: int,
+    requirements: Sequence[Tuple[Sequence[int], int]],
+) -> float:
+    """
+    Multivariate hypergeometric: the chance that `draws` cards from a
+    `population` split into disjoint categories (`category_counts`, with
+    everything else an implicit "other" category) satisfy every requirement
+    at once. Each requirement is (category indices, at least) — e.g. "2 blue
+    sources AND 3 lands" is [([blue_lands], 2), ([blue_lands, other_lands], 3)].
+    Enumerates every joint outcome as one broadcast grid rather than nested
+    loops.
+    """
+    draws = min(draws, population)
+    counts = [int(c) for c in category_counts]
+    rest = population - sum(counts)
+    if rest < 0:
+        raise ValueError("Category counts exceed the population")
+
+    ranges = [np.arange(min(c, draws) + 1) for c in counts]
+    # Python ints: a fixed-width product could wrap negative and slip past the cap.
+    outcomes = math.prod(r.size for r in ranges)
+    if outcomes > _MAX_JOINT_OUTCOMES:
+        raise ValueError("Too many categories for an exact multivariate query")
+
+    grids = np.meshgrid(*ranges, indexing="ij") if ranges else []
+    log_fact = _log_factorials(population)
+    drawn = sum(grids) if grids else np.zeros(())
+    log_p = _log_comb(log_fact, rest, draws - drawn) - _log_comb(
+        log_fact, population, draws
+    )
+    for count, grid in zip(counts, grids):
+        log_p = log_p + _log_comb(log_fact, count, grid)
+
+    satisfied = np.ones(np.shape(log_p), dtype=bool)
+    for indices, at_least in requirements:
+        total = sum((grids[i] for i in indices), np.zeros(np.shape(log_p), dtype=int))
+        satisfied &= total >= at_least
+    return float(np.clip(np.exp(log_p)[satisfied].sum(), 0.0, 1.0))
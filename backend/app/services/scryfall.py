@@ -1,67 +1,208 @@
 from app.core.logging import setup_logging
-from typing import Any, Dict, List
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
 
 import httpx
 from fastapi import Request
 
 from app.core.config import settings
+from app.services.cache import get_response_cache
 
 logger = setup_logging()
 
-# Card data by ID is immutable (a given Scryfall printing never changes), so
-# it's safe to cache for the life of the process. Unbounded is fine here:
-# the working set is whatever small number of specific cards the app looks
-# up by ID (e.g. the landing page's hero card, hit on every visit) rather
-# than the full ~90k-card catalog.
-_card_by_id_cache: Dict[str, Dict[str, Any]] = {}
+# Scryfall's /cards/collection limit per request.
+COLLECTION_CHUNK_SIZE = 75
+
+class TokenBucket:
+    """
+    Process-wide request pacing: `rate` tokens per second, up to `burst`
+    banked. Each caller reserves a token up front — letting the balance go
+    negative — and sleeps off its own share of the debt, so concurrent
+    callers queue in arrival order without a lock (no await happens between
+    reading and updating the balance).
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.burst), self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+# Shared by every ScryfallService instance (one is built per request), so
+# concurrent requests and chunk fan-out all draw from the same budget.
+_rate_limiter = TokenBucket(
+    settings.SCRYFALL_REQUESTS_PER_SECOND, settings.SCRYFALL_BURST
+)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key onto one in-flight task:
+    the first caller starts it, everyone arriving before it finishes awaits
+    the same result (or exception). The key is forgotten as soon as the task
+    completes, so this only dedupes overlapping calls — caching is
+    ResponseCache's job. Each waiter awaits through asyncio.shield, so one
+    client disconnecting doesn't cancel the fetch for the rest.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+
+_single_flight = SingleFlight()
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """Retry-After (seconds) when Scryfall sends one, else exponential backoff."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return 0.5 * (2**attempt)
+
+
+def _chunks(items: Sequence[Any], size: int = COLLECTION_CHUNK_SIZE) -> List[List[Any]]:
+    return [list(items[i : i + size]) for i in range(0, len(items), size)]
 
 
 class ScryfallService:
     def __init__(self, client: httpx.AsyncClient):
         self.client = client
 
-    async def search_cards(self, query: str) -> Dict[str, Any]:
-        params = {"q": query}
-        response = await self.client.get("/cards/search", params=params)
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Every Scryfall call goes through here: paced by the shared token
+        bucket, and retried on 429 (honoring Retry-After) up to
+        SCRYFALL_MAX_RETRIES times before the error is raised to the caller.
+        """
+        for attempt in range(settings.SCRYFALL_MAX_RETRIES + 1):
+            await _rate_limiter.acquire()
+            response = await self.client.request(method, url, **kwargs)
+            if response.status_code != 429 or attempt == settings.SCRYFALL_MAX_RETRIES:
+                break
+            delay = _retry_delay(response, attempt)
+            logger.warning(f"Scryfall rate limited {url}; retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
         response.raise_for_status()
-        return response.json()
+        return response
+
+    async def _collection_chunks(
+        self, identifiers: List[Dict[str, str]]
+    ) -> List[Any]:
+        """
+        Splits `identifiers` into 75-identifier /cards/collection requests and
+        runs them concurrently (the token bucket still paces them). Returns
+        one entry per chunk, in order: the decoded response, or the exception
+        that chunk raised — callers decide whether a failed chunk is fatal.
+        """
+        chunks = _chunks(identifiers)
+        return await asyncio.gather(
+            *(
+                self._request("POST", "/cards/collection", json={"identifiers": chunk})
+                for chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+
+    async def _cached_get(self, namespace: str, url: str, **kwargs) -> Any:
+        """
+        GET through the shared response cache (see app/services/cache.py for
+        per-namespace TTLs). Only successful responses are cached — errors,
+        including Scryfall's 404 for an empty search, always go back out.
+        Concurrent misses for the same key share one request via
+        SingleFlight, so a cold cache after a deploy or flush costs one
+        Scryfall call per key rather than one per waiting client.
+        """
+        cache = get_response_cache()
+        key = str(httpx.URL(url, params=kwargs.get("params")))
+        found, data = await cache.get(namespace, key)
+        if found:
+            return data
+
+        async def fetch() -> Any:
+            response = await self._request("GET", url, **kwargs)
+            data = response.json()
+            await cache.set(namespace, key, data)
+            return data
+
+        return await _single_flight.do(f"{namespace}:{key}", fetch)
+
+    async def search_cards(self, query: str, page: int = 1) -> Dict[str, Any]:
+        params: Dict[str, Any] = {"q": query}
+        if page > 1:
+            params["page"] = page
+        return await self._cached_get("search", "/cards/search", params=params)
 
     async def get_card_by_id(self, card_id: str) -> Dict[str, Any]:
-        if card_id in _card_by_id_cache:
-            return _card_by_id_cache[card_id]
-        response = await self.client.get(f"/cards/{card_id}")
-        response.raise_for_status()
-        data = response.json()
-        _card_by_id_cache[card_id] = data
-        return data
+        # A given Scryfall printing never changes, so the "card" namespace
+        # never expires — only LRU eviction drops these.
+        return await self._cached_get("card", f"/cards/{card_id}")
 
     async def get_cards_by_ids(self, card_ids: List[str]) -> List[Dict[str, Any]]:
-        # Scryfall collection API takes up to 75 IDs
-        # For now we'll assume the deck isn't massive or we'd need to chunk
-        identifiers = [{"id": cid} for cid in card_ids]
-        response = await self.client.post(
-            "/cards/collection", json={"identifiers": identifiers}
-        )
-        response.raise_for_status()
-        data = response.json()
-        return data.get("data", [])
+        """
+        All-or-nothing: any chunk that still fails after retries raises, since
+        callers sync exactly these cards and a partial result would be silently
+        incomplete.
+        """
+        identifiers = [{"id": cid} for cid in dict.fromkeys(card_ids)]
+        cards: List[Dict[str, Any]] = []
+        for result in await self._collection_chunks(identifiers):
+            if isinstance(result, BaseException):
+                raise result
+            cards.extend(result.json().get("data", []))
+        return cards
 
     async def get_collection(self, identifiers: List[Dict[str, str]]) -> Dict[str, Any]:
         """
-        Batch lookup by arbitrary identifiers (name, or set+collector_number).
-        Scryfall accepts up to 75 identifiers per request and returns
-        {"data": [...found cards...], "not_found": [...unmatched identifiers...]}.
+        Batch lookup by arbitrary identifiers (name, or set+collector_number),
+        any number of them — chunked to Scryfall's 75-per-request limit and
+        fetched concurrently. Returns Scryfall's own shape merged across
+        chunks: {"data": [...found cards...], "not_found": [...unmatched
+        identifiers...]}. Best-effort: a chunk that fails after retries lands
+        in `not_found` rather than failing the rest.
         """
-        response = await self.client.post(
-            "/cards/collection", json={"identifiers": identifiers}
-        )
-        response.raise_for_status()
-        return response.json()
+        merged: Dict[str, Any] = {"data": [], "not_found": []}
+        chunks = _chunks(identifiers)
+        results = await self._collection_chunks(identifiers)
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, httpx.HTTPError):
+                logger.error(f"Scryfall collection chunk failed: {result}")
+                merged["not_found"].extend(chunk)
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            data = result.json()
+            merged["data"].extend(data.get("data", []))
+            merged["not_found"].extend(data.get("not_found", []))
+        return merged
 
     async def get_card_rulings(self, card_id: str) -> List[Dict[str, Any]]:
-        response = await self.client.get(f"/cards/{card_id}/rulings")
-        response.raise_for_status()
-        data = response.json()
+        data = await self._cached_get("rulings", f"/cards/{card_id}/rulings")
         return data.get("data", [])
 
 
@@ -0,0 +1,206 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.models.deck import Deck
+
+OPENING_HAND_SIZE = 7
+DEFAULT_GAMES = 100_000
+MAX_GAMES = 500_000
+MAX_TURNS = 20
+# Games shuffled per batch: bounds the full-library scratch array at
+# SHUFFLE_CHUNK x deck_size int16s (10 MB for a 100-card deck).
+SHUFFLE_CHUNK = 50_000
+
+# Stand-in MV for "no castable spell seen yet" — larger than any real mana
+# value, so a plain `<=` comparison against mana available is always False.
+_NO_SPELL_MV = np.float32(1e6)
+
+
+@dataclass(frozen=True)
+class MulliganPolicy:
+    """
+    When to keep an opening seven under the London mulligan: keep any hand
+    whose land count is within [min_lands, max_lands], otherwise shuffle and
+    draw a fresh seven, up to `max_mulligans` times (the last hand is always
+    kept). Cards put on the bottom after a mulligan are chosen to pull the
+    kept hand's land count toward the deck's own land ratio.
+    """
+
+    min_lands: int = 2
+    max_lands: int = 5
+    max_mulligans: int = 2
+
+
+@dataclass
+class DeckArrays:
+    """
+    Per-copy card attributes for a deck's mainboard, one entry per physical
+    card (quantities already expanded). Indexed by the same small integers the
+    simulator shuffles, so a library is just an int16 permutation rather than
+    a list of Scryfall id strings.
+    """
+
+    is_land: np.ndarray
+    mana_value: np.ndarray
+
+    @property
+    def size(self) -> int:
+        return int(self.is_land.shape[0])
+
+
+def deck_arrays(deck: Deck) -> DeckArrays:
+    """
+    Expands `deck`'s mainboard into DeckArrays. Cards whose `Card` row hasn't
+    been loaded/synced count as nonland spells with mana value 0 — same
+    "unknown card is just a card" stance as the virtual goldfish library.
+    """
+    is_land: List[bool] = []
+    mana_value: List[float] = []
+    for dc in deck.cards:
+        if dc.board != "main":
+            continue
+        card = dc.card
+        land = card is not None and "Land" in (card.type_line or "")
+        mv = 0.0 if land or card is None else card.mana.mana_value
+        is_land.extend([land] * dc.quantity)
+        mana_value.extend([mv] * dc.quantity)
+    return DeckArrays(
+        is_land=np.array(is_land, dtype=bool),
+        mana_value=np.array(mana_value, dtype=np.float32),
+    )
+
+
+def _shuffled_prefixes(
+    rng: np.random.Generator, games: int, deck_size: int, depth: int
+) -> np.ndarray:
+    """
+    `games` independent shuffles of a `deck_size`-card library, truncated to
+    the top `depth` cards — the only part of the library a game of this
+    length can ever see. Shuffled SHUFFLE_CHUNK games at a time, so the full
+    (games x deck_size) libraries never exist at once; only the prefixes do.
+    """
+    prefixes = np.empty((games, depth), dtype=np.int16)
+    library = np.arange(deck_size, dtype=np.int16)
+    for start in range(0, games, SHUFFLE_CHUNK):
+        stop = min(start + SHUFFLE_CHUNK, games)
+        libraries = np.tile(library, (stop - start, 1))
+        rng.permuted(libraries, axis=1, out=libraries)
+        prefixes[start:stop] = libraries[:, :depth]
+    return prefixes
+
+
+def simulate_games(
+    arrays: DeckArrays,
+    games: int = DEFAULT_GAMES,
+    turns: int = 10,
+    on_the_play: bool = True,
+    policy: MulliganPolicy = MulliganPolicy(),
+    seed: Optional[int] = None,
+) -> Dict:
+    """
+    Plays `games` shuffled openings of the deck out to `turns` turns, all at
+    once as (games x cards) integer arrays rather than one GameState per game,
+    and returns aggregate distributions: mulligans taken, lands in the kept
+    hand, and per turn the land-drop rate, mana available (lands played, one
+    per turn when one is in hand) and the chance of holding a spell castable
+    with that mana. Same headless idea as goldfishing, but no per-card ids —
+    only land/mana-value attributes matter for these numbers.
+    """
+    deck_size = arrays.size
+    hand_size = min(OPENING_HAND_SIZE, deck_size)
+    draws_needed = turns if not on_the_play else turns - 1
+    depth = min(deck_size, hand_size + draws_needed)
+    rng = np.random.default_rng(seed)
+
+    result: Dict = {
+        "games": games,
+        "turns": turns,
+        "on_the_play": on_the_play,
+        "deck_size": deck_size,
+        "land_count": int(arrays.is_land.sum()),
+    }
+    if deck_size == 0:
+        result.update(mulligans={}, opening_hand_lands={}, per_turn=[])
+        return result
+
+    land_ratio = float(arrays.is_land.mean())
+    spell_mv = np.where(arrays.is_land, _NO_SPELL_MV, arrays.mana_value)
+
+    # London mulligan: every attempt is a fresh shuffle of the full library;
+    # games that keep drop out, the rest go again.
+    kept = np.empty((games, depth), dtype=np.int16)
+    mulligans = np.zeros(games, dtype=np.int8)
+    pending = np.arange(games)
+    for attempt in range(policy.max_mulligans + 1):
+        libraries = _shuffled_prefixes(rng, pending.size, deck_size, depth)
+        hand_lands = arrays.is_land[libraries[:, :hand_size]].sum(axis=1)
+        if attempt == policy.max_mulligans:
+            keep = np.ones(pending.size, dtype=bool)
+        else:
+            keep = (hand_lands >= policy.min_lands) & (hand_lands <= policy.max_lands)
+        kept[pending[keep]] = libraries[keep]
+        mulligans[pending[keep]] = attempt
+        pending = pending[~keep]
+        if pending.size == 0:
+            break
+
+    hand = kept[:, :hand_size]
+    hand_is_land = arrays.is_land[hand]
+    hand_lands = hand_is_land.sum(axis=1)
+    hand_spells = hand_size - hand_lands
+
+    # Bottom `mulligans` cards, lands first while the hand is land-heavier
+    # than the deck's own ratio, spells otherwise — but never more spells than
+    # the hand actually holds.
+    bottom = np.minimum(mulligans, hand_size).astype(np.int64)
+    target_lands = np.rint((hand_size - bottom) * land_ratio).astype(np.int64)
+    bottom_lands = np.clip(hand_lands - target_lands, 0, bottom)
+    bottom_lands = np.maximum(bottom_lands, bottom - hand_spells)
+    bottom_spells = bottom - bottom_lands
+    kept_lands = hand_lands - bottom_lands
+
+    # Cheapest spell left in hand: spells are bottomed most-expensive first,
+    # so the minimum only disappears once every spell has been bottomed.
+    hand_min_mv = spell_mv[hand].min(axis=1)
+    hand_min_mv = np.where(bottom_spells >= hand_spells, _NO_SPELL_MV, hand_min_mv)
+
+    draws = kept[:, hand_size:]
+    lands_drawn = np.cumsum(arrays.is_land[draws], axis=1)
+    min_mv_drawn = (
+        np.minimum.accumulate(spell_mv[draws], axis=1)
+        if draws.shape[1]
+        else np.empty((games, 0), dtype=np.float32)
+    )
+
+    per_turn = []
+    lands_played = np.zeros(games, dtype=np.int64)
+    for turn in range(1, turns + 1):
+        drawn = min(turn - 1 if on_the_play else turn, draws.shape[1])
+        lands_seen = kept_lands + (lands_drawn[:, drawn - 1] if drawn else 0)
+        cheapest = (
+            np.minimum(hand_min_mv, min_mv_drawn[:, drawn - 1]) if drawn else hand_min_mv
+        )
+        lands_played = np.minimum(lands_played + 1, lands_seen)
+        counts = np.bincount(lands_played, minlength=turn + 1)
+        per_turn.append(
+            {
+                "turn": turn,
+                "land_drop_rate": float((lands_played >= turn).mean()),
+                "mean_mana": float(lands_played.mean()),
+                "mana_distribution": {
+                    k: float(c) / games for k, c in enumerate(counts) if c
+                },
+                "castable_spell_rate": float((cheapest <= lands_played).mean()),
+            }
+        )
+
+    mulligan_counts = np.bincount(mulligans, minlength=policy.max_mulligans + 1)
+    land_counts = np.bincount(kept_lands, minlength=hand_size + 1)
+    result.update(
+        mulligans={k: float(c) / games for k, c in enumerate(mulligan_counts)},
+        opening_hand_lands={k: float(c) / games for k, c in enumerate(land_counts)},
+        per_turn=per_turn,
+    )
+    return result
@@ -1,65 +1,141 @@
-import math
-import re
-from typing import Dict, List, Any
+from typing import Dict, Any, Optional, Sequence, Tuple
+from app.core.mana import COLORS
+from app.models.card import Card
 from app.models.deck import Deck
+from app.services.probability import cards_seen, land_odds_grid, multivariate_at_least
 
+STAT_COLORS = (*COLORS, "C")
 
-def calculate_stats(deck: Deck) -> Dict[str, Any]:
-    """
-    Calculate comprehensive stats for a deck including mana curve,
-    color distribution, and land recommendations.
-    """
-    cards = deck.cards
-
-    # 1. Prepare Data
-    main_cards = [dc for dc in cards if dc.board == "main"]
-    total_cards = sum(dc.quantity for dc in main_cards)
-    non_lands = []
-    lands = []
-    ramp_count = 0
-    cantrip_count = 0
+CURVE_KEYS = (*(str(i) for i in range(7)), "7+")
 
-    mana_curve = {str(i): 0 for i in range(7)}
-    mana_curve["7+"] = 0
+# Karsten Tables (Simplified)
+# Format: (CMC/Turn, Pips) -> Required Sources
+# Values for 60-card / Commander
+KARSTEN_TABLE = {
+    (1, 1): (14, 23), # {C} Turn 1
+    (2, 1): (13, 20), # {1}{C} Turn 2
+    (2, 2): (20, 33), # {C}{C} Turn 2
+    (3, 1): (12, 19), # {2}{C} Turn 3
+    (3, 2): (18, 29), # {1}{C}{C} Turn 3
+    (3, 3): (23, 38), # {C}{C}{C} Turn 3
+    (4, 1): (11, 18), # {3}{C} Turn 4
+    (4, 2): (16, 26), # {2}{C}{C} Turn 4
+    (4, 3): (20, 32), # {1}{C}{C}{C} Turn 4 (Extrapolated)
+}
 
-    total_cmc = 0.0
 
-    for dc in cards:
-        if not dc.card or dc.board != "main":
-            continue
-
-        qty = dc.quantity
-        card = dc.card
+def empty_totals() -> Dict[str, Any]:
+    """
+    The additive counters every stat is derived from (see render_stats).
+    Everything in here is a plain sum over mainboard cards, so a deck edit
+    can be applied as a +/- delta per changed card instead of recounting the
+    whole deck — that's what the persisted DeckStats snapshot stores.
+    Karsten source requirements are kept as per-(color, turn, pips) copy
+    counts rather than a running max, since a max can't be un-applied when
+    the card that set it is removed.
+    """
+    return {
+        "total_cards": 0,
+        "land_count": 0,
+        "nonland_count": 0,
+        "total_cmc": 0.0,
+        "ramp_count": 0,
+        "cantrip_count": 0,
+        "mana_curve": {key: 0 for key in CURVE_KEYS},
+        "pips": {c: 0 for c in STAT_COLORS},
+        "sources": {c: 0 for c in STAT_COLORS},
+        "requirements": {},
+    }
 
-        is_land = "Land" in (card.type_line or "")
 
-        if is_land:
-            lands.append(dc)
+def add_card_to_totals(
+    totals: Dict[str, Any], card: Optional[Card], quantity: int
+) -> Dict[str, Any]:
+    """
+    Adds `quantity` mainboard copies of `card` to `totals` in place (negative
+    to remove them) and returns it. `card` may be None for a deck card whose
+    Card row was never synced — it still counts toward the deck size, same as
+    the full recount always did.
+    """
+    totals["total_cards"] += quantity
+    if card is None:
+        return totals
+
+    type_line = card.type_line or ""
+    if "Land" in type_line:
+        totals["land_count"] += quantity
+        for p in card.produced_mana or []:
+            if p in totals["sources"]:
+                totals["sources"][p] += quantity
+        return totals
+
+    totals["nonland_count"] += quantity
+    cost = card.mana
+    cmc = cost.mana_value
+
+    # Mana Curve
+    bucket = min(int(cmc), 7)
+    key = "7+" if bucket >= 7 else str(bucket)
+    totals["mana_curve"][key] += quantity
+
+    # Avg CMC stats
+    totals["total_cmc"] += cmc * quantity
+
+    # Heuristics for Ramp/Cantrip
+    # Ramp: Artifact/Creature, CMC <= 2, produces mana (oracle text 'add {')
+    oracle_text = (card.oracle_text or "").lower()
+    if cmc <= 2 and ("Creature" in type_line or "Artifact" in type_line):
+        if "add {" in oracle_text:
+            totals["ramp_count"] += quantity
+
+    # Cantrip: CMC <= 2, draws card
+    if cmc <= 2 and "draw a card" in oracle_text:
+        totals["cantrip_count"] += quantity
+
+    if not card.mana_cost:
+        return totals
+
+    for color in STAT_COLORS:
+        pips = cost.pips_of(color)
+        if pips <= 0:
+            continue
+        totals["pips"][color] += pips * quantity
+        if color == "C":
+            continue
+        # Turn is roughly CMC (clamped to sensible range for table 1-4);
+        # pips restricted to max 3 for table lookup.
+        turn = max(1, min(4, int(cmc)))
+        requirement = f"{color}:{turn}:{min(3, pips)}"
+        count = totals["requirements"].get(requirement, 0) + quantity
+        if count:
+            totals["requirements"][requirement] = count
         else:
-            non_lands.append(dc)
-            cmc = _calculate_cmc(card.mana_cost or "")
+            del totals["requirements"][requirement]
 
-            # Mana Curve
-            bucket = min(int(cmc), 7)
-            key = "7+" if bucket >= 7 else str(bucket)
-            mana_curve[key] += qty
+    return totals
 
-            # Avg CMC stats
-            total_cmc += (cmc * qty)
 
-            # Heuristics for Ramp/Cantrip
-            # Ramp: Artifact/Creature, CMC <= 2, produces mana (oracle text 'add {')
-            if cmc <= 2 and ("Creature" in (card.type_line or "") or "Artifact" in (card.type_line or "")):
-                if "add {" in (card.oracle_text or "").lower():
-                    ramp_count += qty
+def deck_totals(deck: Deck) -> Dict[str, Any]:
+    totals = empty_totals()
+    for dc in deck.cards:
+        if dc.board == "main":
+            add_card_to_totals(totals, dc.card, dc.quantity)
+    return totals
 
-            # Cantrip: CMC <= 2, draws card
-            if cmc <= 2 and "draw a card" in (card.oracle_text or "").lower():
-                cantrip_count += qty
 
-    avg_cmc = total_cmc / sum(dc.quantity for dc in non_lands) if non_lands else 0
+def render_stats(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turns accumulated totals into the stats payload: mana curve, color
+    distribution, land recommendations and draw odds.
+    """
+    total_cards = totals["total_cards"]
+    nonland_count = totals["nonland_count"]
+    ramp_count = totals["ramp_count"]
+    cantrip_count = totals["cantrip_count"]
+
+    avg_cmc = totals["total_cmc"] / nonland_count if nonland_count else 0
 
-    # 2. Recommendations
+    # Recommendations
     is_commander = total_cards > 80 # Simple heuristic
 
     if is_commander:
@@ -72,16 +148,9 @@ def calculate_stats(deck: Deck) -> Dict[str, Any]:
     recommended = base_lands - (0.5 * ramp_count) - (0.25 * cantrip_count)
     recommended = max(limit_min, min(limit_max, round(recommended)))
 
-    # 3. Color Stats
-    color_stats = _calculate_color_needs(non_lands, lands, is_commander)
-
-    # 4. Draw Odds
-    total_lands = sum(dc.quantity for dc in lands)
-    draw_odds = _calculate_draw_odds(total_cards, total_lands)
-
     return {
         "total_cards": total_cards,
-        "mana_curve": mana_curve,
+        "mana_curve": dict(totals["mana_curve"]),
         "average_cmc": round(avg_cmc, 2),
         "recommendations": {
             "land_count": recommended,
@@ -89,154 +158,118 @@ def calculate_stats(deck: Deck) -> Dict[str, Any]:
             "cantrip_count": cantrip_count,
             "reasoning": f"Based on avg CMC {round(avg_cmc, 2)} and {ramp_count} ramp sources."
         },
-        "color_stats": color_stats,
-        "draw_odds": draw_odds
+        "color_stats": _calculate_color_needs(totals, is_commander),
+        "draw_odds": _calculate_draw_odds(total_cards, totals["land_count"]),
     }
 
 
-def _calculate_cmc(mana_cost: str) -> float:
-    if not mana_cost:
-        return 0
-
-    cmc = 0
-    # Count generic numbers e.g. {2}
-    numbers = re.findall(r'\{(\d+)\}', mana_cost)
-    for num in numbers:
-        cmc += int(num)
-
-    # Count pips e.g. {W}, {U/B} counts as 1 usually for CMC
-    # Simple count of {...} minus the generic numbers
-    # Actually easier: Remove regex matches for {\d+} then count remaining {}
-
-    remaining = re.sub(r'\{(\d+)\}', '', mana_cost)
-    pips = len(re.findall(r'\{.*?\}', remaining))
-    cmc += pips
-
-    return float(cmc)
+def calculate_stats(deck: Deck) -> Dict[str, Any]:
+    """
+    Calculate comprehensive stats for a deck including mana curve,
+    color distribution, and land recommendations.
+    """
+    return render_stats(deck_totals(deck))
 
 
-def _calculate_color_needs(non_lands: List[Any], lands: List[Any], is_commander: bool) -> Dict[str, Any]:
+def _calculate_color_needs(totals: Dict[str, Any], is_commander: bool) -> Dict[str, Any]:
     """
-    Calculate pip counts, source counts, and recommended sources based on Karsten's heuristics.
+    Pip counts, source counts, and recommended sources based on Karsten's
+    heuristics — the recommendation is the max requirement over every
+    (turn, pips) combination some card in the deck still demands.
     """
-    colors = ["W", "U", "B", "R", "G", "C"]
-    stats = {c: {"pips": 0, "sources": 0, "recommended_sources": 0} for c in colors}
-
-    # Karsten Tables (Simplified)
-    # Format: (CMC/Turn, Pips) -> Required Sources
-    # Values for 60-card / Commander
-    karsten_table = {
-        (1, 1): (14, 23), # {C} Turn 1
-        (2, 1): (13, 20), # {1}{C} Turn 2
-        (2, 2): (20, 33), # {C}{C} Turn 2
-        (3, 1): (12, 19), # {2}{C} Turn 3
-        (3, 2): (18, 29), # {1}{C}{C} Turn 3
-        (3, 3): (23, 38), # {C}{C}{C} Turn 3
-        (4, 1): (11, 18), # {3}{C} Turn 4
-        (4, 2): (16, 26), # {2}{C}{C} Turn 4
-        (4, 3): (20, 32), # {1}{C}{C}{C} Turn 4 (Extrapolated)
+    stats = {
+        c: {
+            "pips": totals["pips"][c],
+            "sources": totals["sources"][c],
+            "recommended_sources": 0,
+        }
+        for c in STAT_COLORS
     }
 
-    # 1. Count Pips & Requirements
-    for dc in non_lands:
-        if not dc.card or not dc.card.mana_cost:
+    for requirement, count in totals["requirements"].items():
+        if count <= 0:
             continue
-
-        qty = dc.quantity
-        cost = dc.card.mana_cost
-
-        # Simple CMC for turn estimation
-        cmc = int(_calculate_cmc(cost))
-
-        for color in ["W", "U", "B", "R", "G"]:
-            # Count pips
-            pips = len(re.findall(f"{{{color}}}", cost))
-            if pips > 0:
-                stats[color]["pips"] += (pips * qty)
-
-                # Determine recommendation (Max of any card)
-                # Turn is roughly CMC (clamped to sensible range for table 1-4)
-                turn = max(1, min(4, cmc))
-                # Pips restricted to max 3 for table lookup
-                lookup_pips = min(3, pips)
-
-                if (turn, lookup_pips) in karsten_table:
-                    req_60, req_cmd = karsten_table[(turn, lookup_pips)]
-                    req = req_cmd if is_commander else req_60
-                    stats[color]["recommended_sources"] = max(stats[color]["recommended_sources"], req)
-
-        # Colorless pips (C)
-        c_pips = len(re.findall(r"\{C\}", cost))
-        if c_pips > 0:
-            stats["C"]["pips"] += (c_pips * qty)
-
-    # 2. Count Sources
-    for dc in lands:
-        if not dc.card:
-            continue
-
-        qty = dc.quantity
-        produced = dc.card.produced_mana or []
-
-        for p in produced:
-            if p in stats:
-                stats[p]["sources"] += qty
-
-        # Basic land / Colorless heuristic
-        if not produced and "Land" in (dc.card.type_line or ""):
-            # Assume produces colorless if logic fails, or generic utility land
-            # But safer to rely on produced_mana being correct now
-            pass
+        color, turn, pips = requirement.split(":")
+        if (int(turn), int(pips)) in KARSTEN_TABLE:
+            req_60, req_cmd = KARSTEN_TABLE[(int(turn), int(pips))]
+            req = req_cmd if is_commander else req_60
+            stats[color]["recommended_sources"] = max(stats[color]["recommended_sources"], req)
 
     return stats
 
 
 def _calculate_draw_odds(total_cards: int, total_lands: int) -> Dict[str, Any]:
     """
-    Calculate hypergeometric probabilities for drawing lands.
-    P(X=k) = C(K, k) * C(N-K, n-k) / C(N, n)
+    Hypergeometric land odds. The headline numbers below are read straight off
+    the full turn-by-land-count grid (see app/services/probability.py), which
+    is computed in one vectorized pass and returned alongside them so the
+    stats page can render every turn on the play and on the draw.
     """
+    grid = land_odds_grid(total_cards, total_lands)
+    on_the_play = grid["on_the_play"]
 
-    def hypergeom(N, K, n, k):
-        """
-        N: Population size (Deck size)
-        K: Successes in population (Total lands)
-        n: Sample size (Cards drawn)
-        k: Successes in sample (Lands desired)
-        """
-        if k > n or k > K or n - k > N - K:
+    def at_least(turn: int, lands: int) -> float:
+        if not on_the_play:
             return 0.0
-        combin = math.comb
-        return (combin(K, k) * combin(N - K, n - k)) / combin(N, n)
-
-    def prob_at_least(N, K, n, k):
-        """Sum of probabilities for X >= k"""
-        total_prob = 0.0
-        # iterate from k up to min(n, K)
-        for i in range(k, min(n, K) + 1):
-            total_prob += hypergeom(N, K, n, i)
-        return round(total_prob, 2)
-
-    # Opening Hand (7 cards)
-    # Prob of at least 2, 3, 4 lands
+        return round(on_the_play[turn - 1][lands], 2)
+
+    # Opening Hand (7 cards) — the turn-1 row on the play, before any draw.
     opening_hand = {
-        "lands_at_least_2": prob_at_least(total_cards, total_lands, 7, 2),
-        "lands_at_least_3": prob_at_least(total_cards, total_lands, 7, 3),
-        "lands_at_least_4": prob_at_least(total_cards, total_lands, 7, 4),
+        "lands_at_least_2": at_least(1, 2),
+        "lands_at_least_3": at_least(1, 3),
+        "lands_at_least_4": at_least(1, 4),
     }
 
-    # On Curve (drawing naturally)
-    # Turn 3: 7 + 2 draws = 9 cards seen (Play/Draw varies, assume Play for simple heuristic or avg)
-    # Actually simplified: On the Play, T3 you have seen 7+2=9 cards (Draw step T2, T3).
-    # We want >= 3 lands by Turn 3.
-    # Turn 4: 7 + 3 draws = 10 cards. want >= 4 lands.
-
+    # On Curve (drawing naturally, on the play): turn 3 has seen 7+2=9 cards,
+    # turn 4 has seen 7+3=10.
     on_curve = {
-        "turn_3_land_drop": prob_at_least(total_cards, total_lands, 9, 3),
-        "turn_4_land_drop": prob_at_least(total_cards, total_lands, 10, 4),
+        "turn_3_land_drop": at_least(3, 3),
+        "turn_4_land_drop": at_least(4, 4),
     }
 
     return {
         "opening_hand": opening_hand,
-        "on_curve": on_curve
+        "on_curve": on_curve,
+        "grid": grid,
     }
+
+
+def calculate_land_requirement_odds(
+    deck: Deck,
+    turn: int,
+    on_the_play: bool,
+    requirements: Sequence[Tuple[Optional[str], int]],
+) -> float:
+    """
+    Probability of meeting every (color, at_least) land requirement at once
+    by `turn` — e.g. [("U", 2), (None, 3)] is "two blue sources AND three
+    lands". Mainboard lands are bucketed by which of the requested colors
+    they produce, so a dual land counts toward both of its colors without
+    being double-counted as a land.
+    """
+    colors = sorted({color for color, _ in requirements if color})
+    buckets: Dict[frozenset, int] = {}
+    total_cards = 0
+    for dc in deck.cards:
+        if dc.board != "main":
+            continue
+        total_cards += dc.quantity
+        if not dc.card or "Land" not in (dc.card.type_line or ""):
+            continue
+        produced = frozenset(dc.card.produced_mana or []) & set(colors)
+        buckets[produced] = buckets.get(produced, 0) + dc.quantity
+
+    keys = list(buckets)
+    resolved = [
+        (
+            [i for i, key in enumerate(keys) if color is None or color in key],
+            at_least,
+        )
+        for color, at_least in requirements
+    ]
+    return multivariate_at_least(
+        total_cards,
+        [buckets[key] for key in keys],
+        cards_seen(turn, on_the_play),
+        resolved,
+    )
@@ -0,0 +1,135 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from app.ai.ingestion import worker
+from app.ai.ingestion.scryfall_ingestion import ingest_bulk_stream
+from app.models.card import Card
+from app.models.ingestion import IngestionRun
+from sqlmodel import select
+
+
+def _session_factory(db_session):
+    @asynccontextmanager
+    async def factory():
+        yield db_session
+
+    return factory
+
+
+async def _lines(rows):
+    for row in rows:
+        yield row
+
+
+@pytest.mark.asyncio
+async def test_lock_is_exclusive_until_released(db_session) -> None:
+    assert await worker.acquire_lock(db_session, "scryfall", "worker-a")
+    assert not await worker.acquire_lock(db_session, "scryfall", "worker-b")
+    # Re-acquiring our own lease just renews it.
+    assert await worker.acquire_lock(db_session, "scryfall", "worker-a")
+
+    await worker.release_lock(db_session, "scryfall", "worker-a")
+    assert await worker.acquire_lock(db_session, "scryfall", "worker-b")
+
+
+@pytest.mark.asyncio
+async def test_run_job_records_success_and_failure(db_session, monkeypatch) -> None:
+    async def ok(session, run):
+        return {"seen": 3}
+
+    async def boom(session, run):
+        raise RuntimeError("bulk file vanished")
+
+    monkeypatch.setitem(worker.JOBS, "ok", ok)
+    monkeypatch.setitem(worker.JOBS, "boom", boom)
+    factory = _session_factory(db_session)
+
+    ok_id = await worker.run_job("ok", factory, owner="w1")
+    boom_id = await worker.run_job("boom", factory, owner="w1")
+
+    runs = {
+        r.id: r
+        for r in (await db_session.execute(select(IngestionRun))).scalars().all()
+    }
+    await db_session.refresh(runs[ok_id])
+    await db_session.refresh(runs[boom_id])
+    assert runs[ok_id].status == "succeeded"
+    assert runs[ok_id].report == {"seen": 3}
+    assert runs[boom_id].status == "failed"
+    assert runs[boom_id].error == "bulk file vanished"
+    # Both released their lock.
+    assert await worker.acquire_lock(db_session, "ok", "someone-else")
+
+
+@pytest.mark.asyncio
+async def test_scryfall_run_rebuilds_the_card_snapshots_in_use(db_session, monkeypatch) -> None:
+    from app.services.card_catalog import card_catalog
+    from app.services.card_index import card_name_index
+
+    async def ingest(session, run):
+        session.add(Card(id="sr-1", name="Sol Ring", type_line="Artifact"))
+        await session.commit()
+        return {}
+
+    monkeypatch.setitem(worker.JOBS, "scryfall", ingest)
+    await card_name_index.refresh()  # serving, but built before the run
+    run_id = await worker.run_job("scryfall", _session_factory(db_session), owner="w1")
+
+    assert card_name_index.search("sol") == ["sr-1"]
+    assert card_name_index._ingestion_run_id == run_id
+    # Never used in this process (like a standalone worker's): not built.
+    assert not card_catalog.built
+
+
+@pytest.mark.asyncio
+async def test_run_job_skips_when_locked_elsewhere(db_session, monkeypatch) -> None:
+    async def ok(session, run):
+        return {}
+
+    monkeypatch.setitem(worker.JOBS, "ok", ok)
+    await worker.acquire_lock(db_session, "ok", "other-worker")
+
+    assert await worker.run_job("ok", _session_factory(db_session), owner="w1") is None
+
+
+@pytest.mark.asyncio
+async def test_ingest_bulk_stream_checkpoints_and_resumes(db_session) -> None:
+    lines = [f'{{"id": "c{i}", "name": "Card {i}"}}'.encode() for i in range(10)]
+    checkpoints = []
+
+    async def checkpoint(lines_done):
+        checkpoints.append(lines_done)
+
+    await ingest_bulk_stream(
+        db_session, _lines(lines[:6]), batch_size=4, on_checkpoint=checkpoint
+    )
+    assert checkpoints == [4, 6]
+
+    # A resumed run re-reads the stream but skips the committed prefix.
+    report = await ingest_bulk_stream(
+        db_session, _lines(lines), batch_size=4, skip_lines=6, on_checkpoint=checkpoint
+    )
+    assert report.seen == 4
+    assert checkpoints[-1] == 10
+    ids = (await db_session.execute(select(Card.id))).scalars().all()
+    assert len(ids) == 10
+
+
+@pytest.mark.asyncio
+async def test_due_jobs_respects_intervals_and_retry_backoff(
+    db_session, monkeypatch
+) -> None:
+    monkeypatch.setattr(worker.settings, "RULES_INGESTION_INTERVAL_HOURS", 0)
+    assert await worker.due_jobs(db_session) == ["scryfall"]
+
+    db_session.add(
+        IngestionRun(
+            job="scryfall",
+            status="failed",
+            worker_id="w",
+            finished_at=worker._utcnow_naive(),
+        )
+    )
+    await db_session.commit()
+    # Failed moments ago: wait for the retry window.
+    assert await worker.due_jobs(db_session) == []
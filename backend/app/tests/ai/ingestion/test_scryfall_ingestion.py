@@ -2,11 +2,14 @@ import gzip
 import json
 from unittest.mock import AsyncMock, MagicMock
 
+import httpx
 import pytest
 from app.ai.ingestion.scryfall_ingestion import (
     _card_row,
     download_bulk_cards,
     fetch_bulk_data_uri,
+    ingest_bulk_stream,
+    iter_bulk_lines,
     upsert_cards,
 )
 from app.models.card import Card
@@ -20,12 +23,22 @@ def _mock_response(json_data):
     return response
 
 
-def _mock_gzip_jsonl_response(rows):
-    body = b"\n".join(json.dumps(row).encode() for row in rows)
-    response = MagicMock()
-    response.content = gzip.compress(body)
-    response.raise_for_status = MagicMock()
-    return response
+def _streaming_gzip_jsonl_client(rows, chunk_size=7):
+    """
+    A real httpx client whose transport serves `rows` as gzipped JSONL in
+    tiny chunks, so lines and the gzip stream both straddle chunk
+    boundaries the way a real multi-MB download does.
+    """
+    body = gzip.compress(b"\n".join(json.dumps(row).encode() for row in rows))
+
+    async def chunks():
+        for i in range(0, len(body), chunk_size):
+            yield body[i : i + chunk_size]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=chunks())
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
 
 
 @pytest.mark.asyncio
@@ -62,8 +75,7 @@ async def test_fetch_bulk_data_uri_raises_when_missing() -> None:
 
 @pytest.mark.asyncio
 async def test_download_bulk_cards_returns_parsed_jsonl() -> None:
-    client = AsyncMock()
-    client.get.return_value = _mock_gzip_jsonl_response(
+    client = _streaming_gzip_jsonl_client(
         [{"id": "abc", "name": "Test Card"}, {"id": "def", "name": "Other Card"}]
     )
 
@@ -75,6 +87,47 @@ async def test_download_bulk_cards_returns_parsed_jsonl() -> None:
     ]
 
 
+@pytest.mark.asyncio
+async def test_ingest_bulk_stream_upserts_in_batches(db_session) -> None:
+    rows = [{"id": f"card-{i}", "name": f"Card {i}"} for i in range(25)]
+    rows.append({"name": "No ID Card"})
+    client = _streaming_gzip_jsonl_client(rows)
+
+    report = await ingest_bulk_stream(
+        db_session, iter_bulk_lines(client, "https://example.com/x.jsonl.gz"), batch_size=10
+    )
+
+    assert report.new == report.written == 25
+    result = await db_session.execute(select(Card.id))
+    assert len(result.scalars().all()) == 25
+
+
+@pytest.mark.asyncio
+async def test_ingest_bulk_stream_only_writes_changed_rows(db_session) -> None:
+    rows = [
+        {"id": "bolt", "name": "Lightning Bolt", "oracle_text": "Deal 3.", "legalities": {"modern": "legal"}},
+        {"id": "opt", "name": "Opt", "oracle_text": "Scry 1.", "legalities": {"modern": "legal"}},
+        {"id": "ponder", "name": "Ponder", "oracle_text": "Look.", "legalities": {"modern": "legal"}},
+    ]
+    await ingest_bulk_stream(
+        db_session, iter_bulk_lines(_streaming_gzip_jsonl_client(rows), "https://x")
+    )
+
+    rows[0] = {**rows[0], "oracle_text": "Lightning Bolt deals 3 damage to any target."}
+    rows[2] = {**rows[2], "legalities": {"modern": "banned"}}
+    rows.append({"id": "brainstorm", "name": "Brainstorm"})
+    report = await ingest_bulk_stream(
+        db_session, iter_bulk_lines(_streaming_gzip_jsonl_client(rows), "https://x")
+    )
+
+    assert (report.seen, report.new, report.changed, report.unchanged) == (4, 1, 2, 1)
+    assert report.new_cards == ["Brainstorm"]
+    assert report.oracle_changed_cards == ["Lightning Bolt"]
+    assert report.legality_changed_cards == ["Ponder"]
+    bolt = (await db_session.execute(select(Card).where(Card.id == "bolt"))).scalar_one()
+    assert bolt.oracle_text == "Lightning Bolt deals 3 damage to any target."
+
+
 @pytest.mark.asyncio
 async def test_upsert_cards_inserts_new_and_updates_existing(db_session) -> None:
     db_session.add(Card(id="sol-ring", name="Sol Ring (stale)", legalities={}))
@@ -193,3 +246,20 @@ def test_card_row_prefers_front_face_name_for_reversible_card() -> None:
     assert row["name"] == "Command Tower"
     assert row["type_line"] == "Land"
     assert row["image_uris"] == {"normal": "https://example.com/front.jpg"}
+
+
+@pytest.mark.asyncio
+async def test_ingest_bulk_stream_transforms_in_worker_processes(db_session) -> None:
+    rows = [{"id": f"card-{i}", "name": f"Card {i}"} for i in range(30)]
+    client = _streaming_gzip_jsonl_client(rows)
+
+    report = await ingest_bulk_stream(
+        db_session, iter_bulk_lines(client, "https://x"), batch_size=4, workers=2
+    )
+
+    assert report.new == 30
+    assert report.stages["transform"].items == 30
+    assert report.stages["transform"].batches == 8
+    assert report.stages["write"].items == 30
+    names = (await db_session.execute(select(Card.name))).scalars().all()
+    assert sorted(names) == sorted(r["name"] for r in rows)
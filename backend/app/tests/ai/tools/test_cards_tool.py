@@ -4,6 +4,7 @@ import pytest
 from app.ai.tools import cards as cards_module
 from app.ai.tools.cards import search_cards
 from app.models.card import Card
+from app.models.ingestion import IngestionRun
 from app.services.scryfall import ScryfallService
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -98,6 +99,7 @@ async def test_search_cards_hits_local_cache_before_scryfall(db_session) -> None
             legalities={"modern": "legal"},
         )
     )
+    db_session.add(IngestionRun(job="scryfall", status="succeeded", worker_id="test"))
     await db_session.commit()
 
     with patch.object(
@@ -141,7 +143,9 @@ async def test_search_cards_falls_back_to_scryfall_when_local_cache_misses(
 
 
 @pytest.mark.asyncio
-async def test_search_cards_with_operator_syntax_skips_local_cache(db_session) -> None:
+async def test_search_cards_with_operator_syntax_falls_back_when_no_local_match(
+    db_session,
+) -> None:
     db_session.add(
         Card(id="lightning-bolt", name="Lightning Bolt", legalities={"modern": "legal"})
     )
@@ -158,3 +162,65 @@ async def test_search_cards_with_operator_syntax_skips_local_cache(db_session) -
 
     mock_search.assert_awaited_once()
     assert "Some Red Creature" in result
+
+
+@pytest.mark.asyncio
+async def test_search_cards_answers_operator_syntax_locally(db_session) -> None:
+    db_session.add_all(
+        [
+            Card(id="bolt", name="Lightning Bolt", type_line="Instant", colors=["R"]),
+            Card(id="bear", name="Grizzly Bears", type_line="Creature — Bear", colors=["G"]),
+        ]
+    )
+    db_session.add(IngestionRun(job="scryfall", status="succeeded", worker_id="test"))
+    await db_session.commit()
+
+    with patch.object(
+        cards_module, "get_tool_session", lambda: _SessionCtx(db_session)
+    ):
+        with patch.object(
+            ScryfallService,
+            "search_cards",
+            new=AsyncMock(side_effect=AssertionError("should not hit Scryfall")),
+        ):
+            result = await search_cards("t:instant c:red")
+
+    assert "Lightning Bolt" in result
+    assert "Grizzly Bears" not in result
+
+
+@pytest.mark.asyncio
+async def test_search_cards_with_unsupported_syntax_asks_scryfall(db_session) -> None:
+    db_session.add(Card(id="bolt", name="Lightning Bolt", type_line="Instant"))
+    await db_session.commit()
+
+    mock_response = {"data": [{"name": "Lightning Bolt", "type_line": "Instant"}]}
+    with patch.object(
+        cards_module, "get_tool_session", lambda: _SessionCtx(db_session)
+    ):
+        with patch.object(
+            ScryfallService, "search_cards", new=AsyncMock(return_value=mock_response)
+        ) as mock_search:
+            await search_cards("bolt usd<1")
+
+    mock_search.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_search_cards_asks_scryfall_before_the_first_bulk_ingestion(
+    db_session,
+) -> None:
+    # Only a deck-synced card locally, so a local answer would look complete.
+    db_session.add(Card(id="bolt", name="Lightning Bolt", type_line="Instant"))
+    await db_session.commit()
+
+    mock_response = {"data": [{"name": "Lightning Bolt", "type_line": "Instant"}]}
+    with patch.object(
+        cards_module, "get_tool_session", lambda: _SessionCtx(db_session)
+    ):
+        with patch.object(
+            ScryfallService, "search_cards", new=AsyncMock(return_value=mock_response)
+        ) as mock_search:
+            await search_cards("t:instant")
+
+    mock_search.assert_awaited_once()
@@ -1,6 +1,11 @@
+from unittest.mock import AsyncMock
+
 import pytest
 from app.core.config import settings
+from app.main import app
 from app.models.card import Card
+from app.models.ingestion import IngestionRun
+from app.services.scryfall import get_scryfall_service
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -43,6 +48,29 @@ async def test_local_search_dedupes_reprints_by_name(
     assert len(data) == 1
 
 
+@pytest.mark.asyncio
+async def test_local_search_ranks_prefix_matches_and_tolerates_typos(
+    client: AsyncClient, db_session: AsyncSession
+) -> None:
+    db_session.add_all(
+        [
+            Card(id="sr-1", name="Sol Ring", type_line="Artifact"),
+            Card(id="ss-1", name="Solemn Simulacrum", type_line="Artifact Creature"),
+            Card(id="rw-1", name="Ring of Three Wishes", type_line="Artifact"),
+        ]
+    )
+    await db_session.commit()
+
+    response = await client.get(f'{settings.API_V1_STR}/cards/local-search?q=ring')
+    assert [card["name"] for card in response.json()] == [
+        "Ring of Three Wishes",
+        "Sol Ring",
+    ]
+
+    response = await client.get(f'{settings.API_V1_STR}/cards/local-search?q=solemn simulacrm')
+    assert [card["name"] for card in response.json()] == ["Solemn Simulacrum"]
+
+
 @pytest.mark.asyncio
 async def test_local_search_empty_query_returns_empty(client: AsyncClient) -> None:
     response = await client.get(f'{settings.API_V1_STR}/cards/local-search?q=')
@@ -72,3 +100,180 @@ async def test_get_card_by_id(client: AsyncClient) -> None:
     data = response.json()
     assert data["name"] == "Black Lotus"
     assert data["id"] == card_id
+
+
+def _bulk_ingested() -> IngestionRun:
+    """/cards/search only answers locally once a Scryfall bulk load succeeded."""
+    return IngestionRun(job="scryfall", status="succeeded", worker_id="test")
+
+
+def _query_cards():
+    return [
+        Card(
+            id="bolt", name="Lightning Bolt", type_line="Instant", mana_cost="{R}",
+            oracle_text="Lightning Bolt deals 3 damage to any target.",
+            colors=["R"], color_identity=["R"], mana_value=1.0, produced_mana=[],
+            legalities={"modern": "legal", "commander": "legal", "standard": "not_legal"},
+        ),
+        Card(
+            id="growth", name="Lightning Growth", type_line="Instant", mana_cost="{R}{G}",
+            oracle_text="Draw a card.",
+            colors=["R", "G"], color_identity=["R", "G"], mana_value=2.0,
+            legalities={"modern": "banned", "commander": "legal"},
+        ),
+        Card(
+            id="signet", name="Arcane Signet", type_line="Artifact", mana_cost="{2}",
+            oracle_text="{T}: Add one mana of any color in your commander's color identity.",
+            colors=[], color_identity=[], mana_value=2.0,
+            produced_mana=["W", "U", "B", "R", "G"],
+            legalities={"commander": "legal"},
+        ),
+        Card(
+            id="temple", name="Temple of Epiphany", type_line="Land — Island Mountain",
+            oracle_text="Temple of Epiphany enters tapped.",
+            colors=[], color_identity=["U", "R"], mana_value=0.0,
+            produced_mana=["U", "R"], legalities={"modern": "legal"},
+        ),
+        # No mana value (NULL): every mv comparison on it is unknown in SQL.
+        Card(
+            id="vanguard", name="Vanguard Avatar", type_line="Vanguard",
+            colors=["W"], color_identity=["W"], mana_value=None,
+        ),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("catalog", [True, False], ids=["catalog", "sql"])
+@pytest.mark.parametrize(
+    "query, names",
+    [
+        ("t:instant", ["Lightning Bolt", "Lightning Growth"]),
+        ("c:rg", ["Lightning Growth"]),
+        ("c:c", ["Arcane Signet", "Temple of Epiphany"]),
+        ("c:m", ["Lightning Growth"]),
+        ("id:izzet", ["Arcane Signet", "Lightning Bolt", "Temple of Epiphany"]),
+        ("mv>=2 -t:land", ["Arcane Signet", "Lightning Growth"]),
+        ("f:modern", ["Lightning Bolt", "Temple of Epiphany"]),
+        ("banned:modern", ["Lightning Growth"]),
+        ("produces:u", ["Arcane Signet", "Temple of Epiphany"]),
+        ('o:"~ deals 3"', ["Lightning Bolt"]),
+        ("lightning (o:draw or mv=1)", ["Lightning Bolt", "Lightning Growth"]),
+        ('!"lightning bolt"', ["Lightning Bolt"]),
+        ("-mv<=1", ["Arcane Signet", "Lightning Growth"]),
+        ("mv!=2", ["Lightning Bolt", "Temple of Epiphany"]),
+        ("-mv<=1 or t:vanguard", ["Arcane Signet", "Lightning Growth", "Vanguard Avatar"]),
+        ("-(mv>1 and t:vanguard)", ["Arcane Signet", "Lightning Bolt", "Lightning Growth", "Temple of Epiphany"]),
+    ],
+)
+async def test_search_answers_supported_syntax_locally(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    catalog: bool,
+    query: str,
+    names: list,
+) -> None:
+    # The in-memory catalog and the compiled SQL must agree on every query.
+    monkeypatch.setattr(settings, "CARD_CATALOG_ENABLED", catalog)
+    db_session.add_all([*_query_cards(), _bulk_ingested()])
+    await db_session.commit()
+
+    response = await client.get(f"{settings.API_V1_STR}/cards/search", params={"q": query})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["object"] == "list"
+    assert [card["name"] for card in data["data"]] == names
+
+
+@pytest.mark.asyncio
+async def test_local_search_only_sees_committed_upserts(
+    client: AsyncClient, db_session: AsyncSession
+) -> None:
+    from app.services.card_index import card_name_index
+    from app.services.card_store import card_row, upsert_card_rows
+
+    db_session.add(Card(id="sr-1", name="Sol Ring", type_line="Artifact"))
+    await db_session.commit()
+    # Built now, so the writes below are patched in rather than loaded.
+    await client.get(f"{settings.API_V1_STR}/cards/local-search?q=sol")
+
+    await upsert_card_rows(db_session, [card_row({"id": "ph-1", "name": "Phantom Signet"})])
+    assert card_name_index.search("phantom") == []  # not until it commits
+    await db_session.rollback()
+    assert card_name_index.search("phantom") == []
+
+    await upsert_card_rows(db_session, [card_row({"id": "as-1", "name": "Arcane Signet"})])
+    await db_session.commit()
+    response = await client.get(f"{settings.API_V1_STR}/cards/local-search?q=arcane")
+    assert [card["name"] for card in response.json()] == ["Arcane Signet"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("catalog", [True, False], ids=["catalog", "sql"])
+async def test_search_counts_and_pages_past_the_page_size(
+    client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    catalog: bool,
+) -> None:
+    monkeypatch.setattr(settings, "CARD_CATALOG_ENABLED", catalog)
+    db_session.add_all(
+        [Card(id=f"gob-{i:03}", name=f"Goblin {i:03}", type_line="Creature") for i in range(180)]
+        # A reprint: still one name.
+        + [Card(id="gob-reprint", name="Goblin 000", type_line="Creature")]
+        + [_bulk_ingested()]
+    )
+    await db_session.commit()
+
+    url = f"{settings.API_V1_STR}/cards/search"
+    first = (await client.get(url, params={"q": "t:creature"})).json()
+    assert first["total_cards"] == 180
+    assert len(first["data"]) == 175
+    assert first["has_more"] is True
+    assert "page=2" in first["next_page"]
+
+    second = (await client.get(url, params={"q": "t:creature", "page": 2})).json()
+    assert second["total_cards"] == 180
+    assert [card["name"] for card in second["data"]] == [
+        f"Goblin {i:03}" for i in range(175, 180)
+    ]
+    assert second["has_more"] is False
+    assert "next_page" not in second
+
+
+@pytest.mark.asyncio
+async def test_search_asks_scryfall_until_a_bulk_ingestion_succeeds(
+    client: AsyncClient, db_session: AsyncSession
+) -> None:
+    # Only deck-synced cards locally: a local answer would look complete.
+    db_session.add_all(_query_cards())
+    db_session.add(IngestionRun(job="scryfall", status="failed", worker_id="test"))
+    await db_session.commit()
+    scryfall = AsyncMock()
+    scryfall.search_cards.return_value = {"object": "list", "data": []}
+    app.dependency_overrides[get_scryfall_service] = lambda: scryfall
+    try:
+        url = f"{settings.API_V1_STR}/cards/search"
+        await client.get(url, params={"q": "t:instant"})
+        await client.get(url, params={"q": "t:instant", "page": 3})
+    finally:
+        app.dependency_overrides.pop(get_scryfall_service)
+
+    assert [c.args for c in scryfall.search_cards.await_args_list] == [
+        ("t:instant", 1),
+        ("t:instant", 3),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_card_snapshots_are_built_at_startup(db_session: AsyncSession) -> None:
+    from app.services.card_catalog import card_catalog
+    from app.services.card_index import card_name_index
+
+    db_session.add(Card(id="sr-1", name="Sol Ring", type_line="Artifact"))
+    await db_session.commit()
+
+    async with app.router.lifespan_context(app):
+        assert card_name_index.built and card_catalog.built
+        assert card_name_index.search("sol") == ["sr-1"]
+        assert card_catalog.ids == ["sr-1"]
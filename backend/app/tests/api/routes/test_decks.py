@@ -6,6 +6,7 @@ from app.core.config import settings
 from app.main import app
 from app.models.card import Card
 from app.models.user import User
+from app.services.card_store import card_row, upsert_card_rows
 from app.services.scryfall import get_scryfall_service
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -113,6 +114,44 @@ async def test_create_deck_syncs_reversible_card_using_front_face_fields(
     assert card.image_uris == {"normal": "https://example.com/front.jpg"}
 
 
+@pytest.mark.asyncio
+async def test_create_deck_batch_syncs_new_and_stale_cards(
+    client: AsyncClient, db_session: AsyncSession, mock_scryfall
+) -> None:
+    user = User(email="sync@example.com", google_sub="sync123", full_name="Sync User")
+    # Already cached but never synced (NULL produced_mana), and loaded in
+    # the session — the bulk update must refresh this instance too.
+    stale = Card(id="stale-bolt", name="Lightning Bolt (stale)")
+    db_session.add_all([user, stale])
+    await db_session.commit()
+    await db_session.refresh(user)
+
+    mock_scryfall.get_cards_by_ids.return_value = [
+        {"id": "stale-bolt", "name": "Lightning Bolt", "type_line": "Instant", "mana_cost": "{R}"},
+        {"id": "new-forest", "name": "Forest", "type_line": "Basic Land — Forest", "produced_mana": ["G"]},
+    ]
+    response = await client.post(
+        f"{settings.API_V1_STR}/decks/",
+        json={
+            "title": "Sync Deck",
+            "user_id": user.id,
+            "cards": [
+                {"card_id": "stale-bolt", "quantity": 4, "board": "main"},
+                {"card_id": "new-forest", "quantity": 20, "board": "main"},
+            ],
+        },
+    )
+    assert response.status_code == 200, response.json()
+
+    assert stale.name == "Lightning Bolt"
+    # Scryfall omits produced_mana for non-mana cards; [] marks it synced.
+    assert stale.produced_mana == []
+    forest = (
+        await db_session.execute(select(Card).where(Card.id == "new-forest"))
+    ).scalar_one()
+    assert forest.produced_mana == ["G"]
+
+
 @pytest.mark.asyncio
 async def test_update_deck_cards(client: AsyncClient, db_session: AsyncSession) -> None:
     user = User(
@@ -225,3 +264,265 @@ async def test_cannot_access_another_users_deck(
         assert all(d["id"] != deck_id for d in list_res.json())
     finally:
         app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_deck_etag_conditional_get(
+    client: AsyncClient, db_session: AsyncSession, mock_scryfall
+) -> None:
+    user = User(email="etag@example.com", google_sub="etag_sub", full_name="ETag User")
+    db_session.add(user)
+    await db_session.commit()
+    await db_session.refresh(user)
+
+    deck_id = (
+        await client.post(
+            f"{settings.API_V1_STR}/decks/",
+            json={"title": "Cached Deck", "user_id": user.id},
+        )
+    ).json()["id"]
+    url = f"{settings.API_V1_STR}/decks/{deck_id}"
+
+    first = await client.get(url)
+    etag = first.headers["ETag"]
+    list_etag = (await client.get(f"{settings.API_V1_STR}/decks/")).headers["ETag"]
+
+    unchanged = await client.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+    unchanged_list = await client.get(
+        f"{settings.API_V1_STR}/decks/", headers={"If-None-Match": list_etag}
+    )
+    assert unchanged_list.status_code == 304
+
+    await client.put(url, json={"title": "Renamed Deck"})
+
+    changed = await client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "Renamed Deck"
+    assert changed.headers["ETag"] != etag
+    changed_list = await client.get(
+        f"{settings.API_V1_STR}/decks/", headers={"If-None-Match": list_etag}
+    )
+    assert changed_list.status_code == 200
+
+    # Card data changing underneath (a ban, an errata) changes the tags too,
+    # though the deck itself wasn't edited.
+    card = Card(
+        id="etag-card", name="Etag Card", produced_mana=[],
+        legalities={"modern": "legal"}, content_hash="v1",
+    )
+    db_session.add(card)
+    await db_session.commit()
+    await client.put(url, json={"cards": [{"card_id": "etag-card", "quantity": 1}]})
+    etag = (await client.get(url)).headers["ETag"]
+    list_etag = (await client.get(f"{settings.API_V1_STR}/decks/")).headers["ETag"]
+    card.legalities = {"modern": "banned"}
+    card.content_hash = "v2"
+    db_session.add(card)
+    await db_session.commit()
+
+    banned = await client.get(url, headers={"If-None-Match": etag})
+    assert banned.status_code == 200
+    assert banned.json()["cards"][0]["card"]["legalities"] == {"modern": "banned"}
+    banned_list = await client.get(
+        f"{settings.API_V1_STR}/decks/", headers={"If-None-Match": list_etag}
+    )
+    assert banned_list.status_code == 200
+
+    # Same through card_store's bulk upsert (ingestion, syncs); rewriting
+    # identical content leaves the tags alone.
+    etag = banned.headers["ETag"]
+    await upsert_card_rows(
+        db_session, [card_row({"id": "etag-card", "name": "Etag Card", "legalities": {"modern": "legal"}})]
+    )
+    await db_session.commit()
+    unbanned = await client.get(url, headers={"If-None-Match": etag})
+    assert unbanned.status_code == 200
+    etag = unbanned.headers["ETag"]
+    await upsert_card_rows(
+        db_session, [card_row({"id": "etag-card", "name": "Etag Card", "legalities": {"modern": "legal"}})]
+    )
+    await db_session.commit()
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_validate_all_decks(client: AsyncClient, db_session: AsyncSession) -> None:
+    user = User(email="validate@example.com", google_sub="validate_sub", full_name="V")
+    db_session.add(user)
+    db_session.add_all(
+        [
+            Card(
+                id="krenko",
+                name="Krenko, Mob Boss",
+                type_line="Legendary Creature — Goblin Warrior",
+                color_identity=["R"],
+                legalities={"commander": "legal", "modern": "legal"},
+            ),
+            Card(
+                id="llanowar",
+                name="Llanowar Elves",
+                type_line="Creature — Elf Druid",
+                color_identity=["G"],
+                legalities={"commander": "legal", "modern": "not_legal"},
+            ),
+            Card(
+                id="mountain",
+                name="Mountain",
+                type_line="Basic Land — Mountain",
+                color_identity=[],
+                legalities={"commander": "legal", "modern": "legal"},
+            ),
+        ]
+    )
+    await db_session.commit()
+    await db_session.refresh(user)
+
+    decks = [
+        {
+            "title": "Goblins",
+            "format": "Commander",
+            "cards": [
+                {"card_id": "krenko", "quantity": 1, "board": "commander"},
+                {"card_id": "llanowar", "quantity": 1, "board": "main"},
+                {"card_id": "mountain", "quantity": 98, "board": "main"},
+            ],
+        },
+        {
+            "title": "Burn",
+            "format": "Modern",
+            "cards": [
+                {"card_id": "llanowar", "quantity": 4, "board": "main"},
+                {"card_id": "mountain", "quantity": 56, "board": "main"},
+                {"card_id": "krenko", "quantity": 9, "board": "maybe"},
+            ],
+        },
+        {"title": "Mystery", "format": "Kitchen Table", "cards": []},
+    ]
+    for deck in decks:
+        res = await client.post(
+            f"{settings.API_V1_STR}/decks/", json={**deck, "user_id": user.id}
+        )
+        assert res.status_code == 200, res.json()
+
+    response = await client.get(f"{settings.API_V1_STR}/decks/validate")
+    assert response.status_code == 200, response.json()
+    results = {r["title"]: r for r in response.json()}
+    assert list(results) == ["Goblins", "Burn", "Mystery"]
+
+    goblins = results["Goblins"]
+    assert goblins["format"] == "Commander"
+    assert goblins["valid"] is False
+    assert [(v["code"], v["card_ids"]) for v in goblins["violations"]] == [
+        ("color_identity", ["llanowar"])
+    ]
+
+    # Maybeboard cards are ignored: 9 Krenkos there don't break the copy limit.
+    burn = results["Burn"]
+    assert [(v["code"], v["card_ids"]) for v in burn["violations"]] == [
+        ("legality", ["llanowar"])
+    ]
+
+    assert [v["code"] for v in results["Mystery"]["violations"]] == ["format"]
+
+
+@pytest.mark.asyncio
+async def test_deck_summaries_paginate_by_last_update(
+    client: AsyncClient, db_session: AsyncSession
+) -> None:
+    user = User(email="summary@example.com", google_sub="summary_sub", full_name="S")
+    db_session.add(user)
+    db_session.add_all(
+        [
+            Card(
+                id="sum-krenko",
+                name="Krenko, Mob Boss",
+                color_identity=["R"],
+                image_uris={"art_crop": "https://img/krenko-art", "normal": "https://img/krenko"},
+            ),
+            Card(
+                id="sum-elves",
+                name="Llanowar Elves",
+                color_identity=["G"],
+                image_uris={"normal": "https://img/elves"},
+            ),
+            Card(
+                id="sum-delver",
+                name="Delver of Secrets",
+                color_identity=["U"],
+                card_faces=[
+                    {"name": "Delver of Secrets", "image_uris": {"normal": "https://img/delver"}},
+                    {"name": "Insectile Aberration", "image_uris": {"normal": "https://img/insect"}},
+                ],
+            ),
+        ]
+    )
+    await db_session.commit()
+    await db_session.refresh(user)
+
+    decks = [
+        {
+            "title": "Gruul",
+            "format": "Commander",
+            "cards": [
+                {"card_id": "sum-krenko", "quantity": 1, "board": "commander"},
+                {"card_id": "sum-elves", "quantity": 30, "board": "main"},
+                {"card_id": "sum-delver", "quantity": 4, "board": "maybe"},
+            ],
+        },
+        {
+            "title": "Tempo",
+            "cards": [
+                {"card_id": "sum-delver", "quantity": 4, "board": "main"},
+                {"card_id": "sum-elves", "quantity": 2, "board": "side"},
+            ],
+        },
+        {"title": "Empty"},
+    ]
+    ids = {}
+    for deck in decks:
+        res = await client.post(
+            f"{settings.API_V1_STR}/decks/", json={**deck, "user_id": user.id}
+        )
+        ids[deck["title"]] = res.json()["id"]
+    # Editing a deck moves it to the front.
+    await client.put(
+        f"{settings.API_V1_STR}/decks/{ids['Gruul']}", json={"title": "Gruul"}
+    )
+
+    url = f"{settings.API_V1_STR}/decks/summary"
+    first = await client.get(url, params={"limit": 2})
+    assert first.status_code == 200, first.json()
+    page = first.json()
+    assert [d["title"] for d in page["data"]] == ["Gruul", "Empty"]
+    gruul = page["data"][0]
+    assert gruul["card_count"] == 31
+    assert gruul["color_identity"] == ["R", "G"]
+    assert gruul["cover_image"] == "https://img/krenko-art"
+    assert gruul["cards"] is None
+    assert page["data"][1]["card_count"] == 0
+    assert page["data"][1]["cover_image"] is None
+    assert page["next_cursor"]
+
+    second = await client.get(
+        url, params={"limit": 2, "cursor": page["next_cursor"], "include_cards": True}
+    )
+    page = second.json()
+    assert page["next_cursor"] is None
+    [tempo] = page["data"]
+    assert tempo["title"] == "Tempo"
+    assert tempo["card_count"] == 4
+    assert tempo["color_identity"] == ["U"]
+    assert tempo["cover_image"] == "https://img/delver"
+    assert sorted((c["card_id"], c["board"]) for c in tempo["cards"]) == [
+        ("sum-delver", "main"),
+        ("sum-elves", "side"),
+    ]
+    assert {c["card"]["name"] for c in tempo["cards"]} == {
+        "Delver of Secrets",
+        "Llanowar Elves",
+    }
+
+    bad = await client.get(url, params={"cursor": "not-a-cursor"})
+    assert bad.status_code == 400
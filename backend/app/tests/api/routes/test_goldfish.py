@@ -105,6 +105,41 @@ async def test_get_session_tree_starts_with_auto_created_root(
     assert root["state"]["life_total"] == 20  # no format set -> not commander-like
 
 
+@pytest.mark.asyncio
+async def test_session_tree_etag_changes_on_node_writes(
+    client: AsyncClient, db_session
+) -> None:
+    _user, deck_id = await _make_user_and_deck(
+        client, db_session, "goldfish_etag@example.com", "gf_sub_etag"
+    )
+    session_id = (
+        await client.post(
+            f"{settings.API_V1_STR}/goldfish/sessions", json={"deck_id": deck_id}
+        )
+    ).json()["id"]
+    url = f"{settings.API_V1_STR}/goldfish/sessions/{session_id}"
+
+    first = await client.get(url)
+    etag = first.headers["ETag"]
+    root_id = first.json()["nodes"][0]["id"]
+
+    unchanged = await client.get(url, headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    node = (
+        await client.post(f"{url}/nodes", json={"parent_id": root_id, "label": "T1"})
+    ).json()
+    after_add = await client.get(url, headers={"If-None-Match": etag})
+    assert after_add.status_code == 200
+    assert len(after_add.json()["nodes"]) == 2
+    add_etag = after_add.headers["ETag"]
+
+    await client.delete(f"{settings.API_V1_STR}/goldfish/nodes/{node['id']}")
+    after_delete = await client.get(url, headers={"If-None-Match": add_etag})
+    assert after_delete.status_code == 200
+    assert len(after_delete.json()["nodes"]) == 1
+
+
 @pytest.mark.asyncio
 async def test_add_root_and_branching_nodes(client: AsyncClient, db_session) -> None:
     _user, deck_id = await _make_user_and_deck(
@@ -296,3 +331,152 @@ async def test_cannot_access_another_users_session(
         assert add_res.status_code == 403
     finally:
         app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_skeleton_subtree_and_single_node(client: AsyncClient, db_session) -> None:
+    _user, deck_id = await _make_user_and_deck(
+        client, db_session, "goldfish_lazy@example.com", "gf_sub_lazy"
+    )
+    session_id = (
+        await client.post(
+            f"{settings.API_V1_STR}/goldfish/sessions", json={"deck_id": deck_id}
+        )
+    ).json()["id"]
+    url = f"{settings.API_V1_STR}/goldfish/sessions/{session_id}"
+    root_id = (await client.get(url)).json()["nodes"][0]["id"]
+
+    async def add(parent_id: int, label: str) -> int:
+        res = await client.post(f"{url}/nodes", json={"parent_id": parent_id, "label": label})
+        return res.json()["id"]
+
+    # root -> a -> (a1 -> a1x, a2); root -> b
+    a = await add(root_id, "A")
+    b = await add(root_id, "B")
+    a1 = await add(a, "A1")
+    a2 = await add(a, "A2")
+    a1x = await add(a1, "A1x")
+
+    skeleton_res = await client.get(f"{url}/skeleton")
+    assert skeleton_res.status_code == 200
+    assert skeleton_res.headers["ETag"]
+    skeleton = skeleton_res.json()
+    assert skeleton["session"]["id"] == session_id
+    shape = {n["id"]: (n["parent_id"], n["depth"], n["child_count"]) for n in skeleton["nodes"]}
+    assert shape == {
+        root_id: (None, 0, 2),
+        a: (root_id, 1, 2),
+        b: (root_id, 1, 0),
+        a1: (a, 2, 1),
+        a2: (a, 2, 0),
+        a1x: (a1, 3, 0),
+    }
+    assert "state" not in skeleton["nodes"][0]
+
+    nodes_url = f"{settings.API_V1_STR}/goldfish/nodes"
+    single = await client.get(f"{nodes_url}/{a1}")
+    assert single.status_code == 200
+    assert single.json()["label"] == "A1"
+
+    window = (await client.get(f"{nodes_url}/{a}/subtree", params={"max_depth": 1})).json()
+    assert [n["id"] for n in window["nodes"]] == [a, a1, a2]
+    assert window["next_cursor"] is None
+
+    first = (await client.get(f"{nodes_url}/{a}/subtree", params={"limit": 2})).json()
+    assert [n["id"] for n in first["nodes"]] == [a, a1]
+    rest = (
+        await client.get(
+            f"{nodes_url}/{a}/subtree",
+            params={"limit": 2, "cursor": first["next_cursor"], "states": "none"},
+        )
+    ).json()
+    assert [n["id"] for n in rest["nodes"]] == [a2, a1x]
+    assert rest["next_cursor"] is None
+
+    bad = await client.get(f"{nodes_url}/{a}/subtree", params={"cursor": "x"})
+    assert bad.status_code == 400
+    missing = await client.get(f"{nodes_url}/999999")
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_lazy_endpoints_check_ownership(client: AsyncClient, db_session) -> None:
+    _owner, deck_id = await _make_user_and_deck(
+        client, db_session, "goldfish_lazy_owner@example.com", "gf_sub_lazy_owner"
+    )
+    session_id = (
+        await client.post(
+            f"{settings.API_V1_STR}/goldfish/sessions", json={"deck_id": deck_id}
+        )
+    ).json()["id"]
+    url = f"{settings.API_V1_STR}/goldfish/sessions/{session_id}"
+    root_id = (await client.get(url)).json()["nodes"][0]["id"]
+
+    other = User(email="goldfish_lazy_other@example.com", google_sub="gf_sub_lazy_other")
+    db_session.add(other)
+    await db_session.commit()
+    await db_session.refresh(other)
+    app.dependency_overrides[get_current_user] = lambda: other
+    try:
+        nodes_url = f"{settings.API_V1_STR}/goldfish/nodes/{root_id}"
+        assert (await client.get(f"{url}/skeleton")).status_code == 403
+        assert (await client.get(nodes_url)).status_code == 403
+        assert (await client.get(f"{nodes_url}/subtree")).status_code == 403
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+
+@pytest.mark.asyncio
+async def test_branch_path_count_clone_and_prune(client: AsyncClient, db_session) -> None:
+    _user, deck_id = await _make_user_and_deck(
+        client, db_session, "goldfish_cte@example.com", "gf_sub_cte"
+    )
+    session_id = (
+        await client.post(
+            f"{settings.API_V1_STR}/goldfish/sessions", json={"deck_id": deck_id}
+        )
+    ).json()["id"]
+    url = f"{settings.API_V1_STR}/goldfish/sessions/{session_id}"
+    root_id = (await client.get(url)).json()["nodes"][0]["id"]
+
+    async def add(parent_id: int, label: str) -> int:
+        res = await client.post(f"{url}/nodes", json={"parent_id": parent_id, "label": label})
+        return res.json()["id"]
+
+    a = await add(root_id, "A")
+    b = await add(root_id, "B")
+    a1 = await add(a, "A1")
+    a1x = await add(a1, "A1x")
+    await add(a, "A2")
+
+    nodes_url = f"{settings.API_V1_STR}/goldfish/nodes"
+    path = (await client.get(f"{nodes_url}/{a1x}/path")).json()
+    assert [(n["label"], n["depth"]) for n in path] == [
+        ("Game start", 0), ("A", 1), ("A1", 2), ("A1x", 3)
+    ]
+    count = (await client.get(f"{nodes_url}/{a}/descendants/count")).json()
+    assert count == {"node_id": a, "count": 3}
+
+    # Beside the original by default, then under B.
+    beside = (await client.post(f"{nodes_url}/{a}/clone", json={})).json()
+    assert beside["parent_id"] == root_id and beside["label"] == "A"
+    assert beside["order_index"] == 2
+    under_b = (await client.post(f"{nodes_url}/{a1}/clone", json={"parent_id": b})).json()
+    assert under_b["parent_id"] == b
+    skeleton = (await client.get(f"{url}/skeleton")).json()["nodes"]
+    labels = sorted(n["label"] for n in skeleton)
+    assert labels == sorted(
+        ["Game start", "A", "B", "A1", "A1x", "A2", "A", "A1", "A1x", "A2", "A1", "A1x"]
+    )
+    assert (await client.get(f"{nodes_url}/{beside['id']}/descendants/count")).json()[
+        "count"
+    ] == 3
+
+    into_itself = await client.post(f"{nodes_url}/{a}/clone", json={"parent_id": a1x})
+    assert into_itself.status_code == 400
+
+    pruned = (await client.delete(f"{nodes_url}/{a}")).json()
+    assert pruned == {"status": "ok", "deleted": 4}
+    remaining = (await client.get(f"{url}/skeleton")).json()["nodes"]
+    assert len(remaining) == 12 - 4
+    assert (await client.get(f"{nodes_url}/{a1x}")).status_code == 404
@@ -7,8 +7,10 @@ from app.main import app
 from app.models.card import Card
 from app.models.goldfish import GoldfishNode, GoldfishSession
 from app.models.user import User
+from app.services.goldfish_storage import node_state_cache
 from app.services.scryfall import get_scryfall_service
 from httpx import AsyncClient
+from sqlmodel import select
 
 
 async def _make_deck_with_cards(
@@ -1398,3 +1400,156 @@ async def test_next_turn_never_touches_opponent_zones_in_two_deck_session(
     assert turn_res.status_code == 200
     node = turn_res.json()
     assert node["state"]["opponent_zones"] == opponent_zones_before
+
+
+@pytest.mark.asyncio
+async def test_nodes_store_deltas_between_keyframes(
+    client: AsyncClient, db_session, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "GOLDFISH_KEYFRAME_INTERVAL", 8)
+
+    user = User(email="delta@example.com", google_sub="delta_sub")
+    db_session.add(user)
+    db_session.add_all(
+        [
+            Card(id="d-main", name="Main", type_line="Land", produced_mana=["C"]),
+            Card(id="d-opp", name="Opp", type_line="Land", produced_mana=["C"]),
+        ]
+    )
+    await db_session.commit()
+    await db_session.refresh(user)
+    deck_id = await _make_deck_for_user(
+        client, db_session, user, "Delta", [{"card_id": "d-main", "quantity": 40, "board": "main"}]
+    )
+    opponent_id = await _make_deck_for_user(
+        client, db_session, user, "Delta Opp", [{"card_id": "d-opp", "quantity": 40, "board": "main"}]
+    )
+    session_id = (
+        await client.post(
+            f"{settings.API_V1_STR}/goldfish/sessions",
+            json={"deck_id": deck_id, "opponent_deck_id": opponent_id},
+        )
+    ).json()["id"]
+    url = f"{settings.API_V1_STR}/goldfish/sessions/{session_id}"
+    tree = (await client.get(url)).json()
+    parent = next(n for n in tree["nodes"] if n["depth"] == 1)
+
+    returned = {}
+    actions = [
+        {"type": "next_turn"},
+        {"type": "play_land", "card_id": "d-main"},
+        {"type": "draw", "target": "opponent"},
+        {"type": "set_life", "life_total": 17},
+        {"type": "move_zone", "card_id": "d-main", "from_zone": "battlefield", "to_zone": "graveyard"},
+        {"type": "shuffle"},
+        {"type": "next_turn"},
+        {"type": "cast", "card_id": "d-opp", "target": "opponent"},
+        {"type": "draw"},
+    ]
+    for i, action in enumerate(actions):
+        if i == 4:
+            # Cold cache: the parent state has to be rebuilt from the DB.
+            node_state_cache.clear()
+        res = await client.post(
+            f"{url}/nodes", json={"parent_id": parent["id"], "action": action}
+        )
+        assert res.status_code == 200, res.json()
+        parent = res.json()
+        assert parent["depth"] == i + 2
+        # Full state out; never the stored (dictionary-packed) delta.
+        assert parent["delta"] is None
+        returned[parent["id"]] = parent["state"]
+    assert returned[parent["id"]]["life_total"] == 17
+    assert len(returned[parent["id"]]["opponent_zones"]["battlefield"]) == 1
+
+    stored = (
+        await db_session.execute(
+            select(GoldfishNode).where(GoldfishNode.session_id == session_id)
+        )
+    ).scalars().all()
+    session = await db_session.get(GoldfishSession, session_id)
+    assert session.card_ids == ["d-main", "d-opp"]
+    for node in stored:
+        if node.depth % 8 == 0:
+            assert node.state is not None and node.delta is None
+            # Zones are packed against the session's card dictionary.
+            assert isinstance(node.state["library"], str)
+        else:
+            assert node.state is None and node.delta is not None
+
+    node_state_cache.clear()
+    last = await client.get(f"{settings.API_V1_STR}/goldfish/nodes/{parent['id']}")
+    assert last.json()["state"] == returned[parent["id"]]
+    subtree = await client.get(
+        f"{settings.API_V1_STR}/goldfish/nodes/{tree['nodes'][0]['id']}/subtree"
+    )
+    assert {
+        n["id"]: n["state"] for n in subtree.json()["nodes"] if n["id"] in returned
+    } == returned
+
+    node_state_cache.clear()
+    full = (await client.get(url)).json()["nodes"]
+    assert all(n["delta"] is None and n["state"] for n in full)
+    assert {n["id"]: n["state"] for n in full if n["id"] in returned} == returned
+
+    compact = await client.get(url, params={"states": "compact"})
+    assert compact.headers["ETag"] != (await client.get(url)).headers["ETag"]
+    assert len(compact.content) * 2 < len((await client.get(url)).content)
+
+
+@pytest.mark.asyncio
+async def test_cloned_branch_keeps_its_game_states(
+    client: AsyncClient, db_session, monkeypatch
+) -> None:
+    monkeypatch.setattr(settings, "GOLDFISH_KEYFRAME_INTERVAL", 2)
+    _user, deck_id = await _make_deck_with_many_cards(
+        client, db_session, "clone@example.com", "clone_sub"
+    )
+    session_id = (
+        await client.post(
+            f"{settings.API_V1_STR}/goldfish/sessions", json={"deck_id": deck_id}
+        )
+    ).json()["id"]
+    url = f"{settings.API_V1_STR}/goldfish/sessions/{session_id}"
+    tree = (await client.get(url)).json()
+    root = next(n for n in tree["nodes"] if n["parent_id"] is None)
+    opening = next(n for n in tree["nodes"] if n["parent_id"] == root["id"])
+
+    played = (
+        await client.post(
+            f"{url}/nodes",
+            json={
+                "parent_id": opening["id"],
+                "action": {"type": "play_land", "card_id": "card-many"},
+            },
+        )
+    ).json()
+    drew = (
+        await client.post(
+            f"{url}/nodes", json={"parent_id": played["id"], "action": {"type": "draw"}}
+        )
+    ).json()
+
+    # Cloned under the root: the copy of `played` no longer sits under the
+    # node its delta was taken against, so it has to become a keyframe.
+    nodes_url = f"{settings.API_V1_STR}/goldfish/nodes"
+    copy = (
+        await client.post(f"{nodes_url}/{played['id']}/clone", json={"parent_id": root["id"]})
+    ).json()
+    assert copy["state"] == played["state"]
+    assert copy["depth"] == 1
+    node_state_cache.clear()
+    subtree = (await client.get(f"{nodes_url}/{copy['id']}/subtree")).json()["nodes"]
+    assert [n["state"] for n in subtree] == [played["state"], drew["state"]]
+    assert [n["depth"] for n in subtree] == [1, 2]
+
+    # The copy of `drew` moved from depth 3 (a delta) to depth 2, a keyframe
+    # depth, so later nodes under it still replay at most interval - 1 deltas.
+    stored = (
+        await db_session.execute(
+            select(GoldfishNode).where(GoldfishNode.id.in_([n["id"] for n in subtree]))
+        )
+    ).scalars().all()
+    assert all(n.state is not None and n.delta is None for n in stored)
+    original = await db_session.get(GoldfishNode, drew["id"])
+    assert original.depth == 3 and original.delta is not None
@@ -0,0 +1,35 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from app.ai.ingestion import worker
+from app.core.config import settings
+from app.models.user import User
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_ingestion_status_reports_last_run(
+    client: AsyncClient, db_session, monkeypatch
+) -> None:
+    db_session.add(User(email="ingest@example.com", google_sub="ingest_sub"))
+    await db_session.commit()
+
+    async def ok(session, run):
+        return {"seen": 2, "stages": {"write": {"items": 2, "rate": 100.0}}}
+
+    @asynccontextmanager
+    async def factory():
+        yield db_session
+
+    monkeypatch.setitem(worker.JOBS, "scryfall", ok)
+    await worker.run_job("scryfall", factory, owner="w1")
+
+    resp = await client.get(f"{settings.API_V1_STR}/ingestion/status")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["schedule_enabled"] is False
+    scryfall = data["jobs"]["scryfall"]
+    assert scryfall["lock_owner"] is None
+    assert scryfall["last_run"]["status"] == "succeeded"
+    assert scryfall["last_success"]["report"]["stages"]["write"]["rate"] == 100.0
+    assert data["jobs"]["rules"]["last_run"] is None
@@ -77,3 +77,92 @@ async def test_legalities_sync(client: AsyncClient, db_session, mock_scryfall):
     # Verify legailties were saved and returned
     assert banned_card["card"]["legalities"]["standard"] == "banned"
     assert legal_card["card"]["legalities"]["standard"] == "legal"
+
+
+@pytest.mark.asyncio
+async def test_deck_legality_reports_offending_cards(
+    client: AsyncClient, db_session, mock_scryfall
+):
+    app.dependency_overrides[get_scryfall_service] = lambda: mock_scryfall
+    db_session.add(User(id=1, email="test@example.com", google_sub="sub123"))
+    await db_session.commit()
+    resp = await client.post("/api/v1/decks/", json=MOCK_DECK_WITH_ILLEGAL)
+    deck_id = resp.json()["id"]
+    # Only drop the Scryfall override; clear() would also drop the test DB.
+    app.dependency_overrides.pop(get_scryfall_service)
+
+    resp = await client.get(f"/api/v1/decks/{deck_id}/legality")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["format"] == "standard"
+    assert data["legal"] is False
+    assert data["issues"] == [
+        {
+            "card_id": "banned-card",
+            "name": "Banned Card",
+            "board": "main",
+            "quantity": 1,
+            "status": "banned",
+        }
+    ]
+
+    resp = await client.get(f"/api/v1/decks/{deck_id}/legality?format=EDH")
+    assert resp.json() == {
+        "deck_id": deck_id,
+        "format": "commander",
+        "legal": True,
+        "issues": [],
+    }
+
+    resp = await client.get(f"/api/v1/decks/{deck_id}/legality?format=Limited")
+    assert resp.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_deck_legality_counts_restricted_copies_by_name(
+    client: AsyncClient, db_session, mock_scryfall
+):
+    from app.models.card import Card
+
+    app.dependency_overrides[get_scryfall_service] = lambda: mock_scryfall
+    db_session.add(User(id=1, email="test@example.com", google_sub="sub123"))
+    restricted = {"vintage": "restricted"}
+    db_session.add_all(
+        [
+            Card(id="ancestral-1", name="Ancestral Recall", legalities=restricted, produced_mana=[]),
+            Card(id="ancestral-2", name="Ancestral Recall", legalities=restricted, produced_mana=[]),
+            Card(id="lotus-1", name="Black Lotus", legalities=restricted, produced_mana=[]),
+            # Synced before legalities existed: no data, so not judged.
+            Card(id="old-1", name="Old Card", legalities=None, produced_mana=[]),
+        ]
+    )
+    await db_session.commit()
+    resp = await client.post(
+        "/api/v1/decks/",
+        json={
+            "title": "Vintage",
+            "format": "Vintage",
+            "user_id": 1,
+            "cards": [
+                # Two printings, one copy each: two copies of the name.
+                {"card_id": "ancestral-1", "quantity": 1, "board": "main"},
+                {"card_id": "ancestral-2", "quantity": 1, "board": "side"},
+                {"card_id": "lotus-1", "quantity": 1, "board": "main"},
+                {"card_id": "old-1", "quantity": 4, "board": "main"},
+            ],
+        },
+    )
+    deck_id = resp.json()["id"]
+    app.dependency_overrides.pop(get_scryfall_service)
+
+    data = (await client.get(f"/api/v1/decks/{deck_id}/legality")).json()
+    assert data["legal"] is False
+    assert [(i["card_id"], i["status"]) for i in data["issues"]] == [
+        ("ancestral-1", "restricted"),
+        ("ancestral-2", "restricted"),
+    ]
+
+    # /decks/validate agrees on the same deck.
+    validation = (await client.get("/api/v1/decks/validate")).json()
+    legality = [v for v in validation[0]["violations"] if v["code"] == "legality"]
+    assert [v["card_ids"] for v in legality] == [["ancestral-1", "ancestral-2"]]
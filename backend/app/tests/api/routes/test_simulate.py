@@ -0,0 +1,112 @@
+import pytest
+from httpx import AsyncClient
+from unittest.mock import AsyncMock
+from app.core.config import settings
+from app.models.card import Card
+from app.models.user import User
+from app.main import app
+from app.services.scryfall import get_scryfall_service
+
+
+async def _make_deck(client: AsyncClient, db_session, cards: list[dict]) -> int:
+    user = User(email="sim@example.com", google_sub="sim_sub")
+    db_session.add(user)
+    db_session.add_all(
+        [
+            Card(id="forest", name="Forest", type_line="Basic Land — Forest", produced_mana=["G"]),
+            Card(id="bear", name="Grizzly Bears", type_line="Creature — Bear", mana_cost="{1}{G}", produced_mana=[]),
+        ]
+    )
+    await db_session.commit()
+    await db_session.refresh(user)
+
+    app.dependency_overrides[get_scryfall_service] = lambda: AsyncMock()
+    try:
+        resp = await client.post(
+            f"{settings.API_V1_STR}/decks/",
+            json={"title": "Sim Deck", "user_id": user.id, "cards": cards},
+        )
+    finally:
+        del app.dependency_overrides[get_scryfall_service]
+    assert resp.status_code == 200
+    return resp.json()["id"]
+
+
+@pytest.mark.asyncio
+async def test_simulate_returns_distributions(client: AsyncClient, db_session) -> None:
+    deck_id = await _make_deck(
+        client,
+        db_session,
+        [
+            {"card_id": "forest", "quantity": 24, "board": "main"},
+            {"card_id": "bear", "quantity": 36, "board": "main"},
+            # Sideboard never enters the simulated library.
+            {"card_id": "bear", "quantity": 15, "board": "side"},
+        ],
+    )
+
+    resp = await client.get(
+        f"{settings.API_V1_STR}/decks/{deck_id}/simulate",
+        params={"games": 5000, "turns": 4, "seed": 7},
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+
+    assert data["deck_size"] == 60
+    assert data["land_count"] == 24
+    assert sum(data["mulligans"].values()) == pytest.approx(1.0)
+    assert sum(data["opening_hand_lands"].values()) == pytest.approx(1.0)
+    assert [t["turn"] for t in data["per_turn"]] == [1, 2, 3, 4]
+    # 24 lands in 60: turn-1 land drop is near-certain, and land-drop odds
+    # only fall from there.
+    rates = [t["land_drop_rate"] for t in data["per_turn"]]
+    assert rates[0] > 0.99
+    assert rates == sorted(rates, reverse=True)
+    # No 2-drop is castable on turn 1, off one land.
+    assert data["per_turn"][0]["castable_spell_rate"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_simulate_is_reproducible_with_seed(client: AsyncClient, db_session) -> None:
+    deck_id = await _make_deck(
+        client,
+        db_session,
+        [
+            {"card_id": "forest", "quantity": 17, "board": "main"},
+            {"card_id": "bear", "quantity": 23, "board": "main"},
+        ],
+    )
+    url = f"{settings.API_V1_STR}/decks/{deck_id}/simulate"
+    params = {"games": 2000, "turns": 3, "seed": 42, "on_the_play": False}
+
+    first = (await client.get(url, params=params)).json()
+    second = (await client.get(url, params=params)).json()
+
+    assert first == second
+    assert first["on_the_play"] is False
+
+
+@pytest.mark.asyncio
+async def test_simulate_rejects_inverted_land_range(client: AsyncClient, db_session) -> None:
+    deck_id = await _make_deck(
+        client, db_session, [{"card_id": "forest", "quantity": 10, "board": "main"}]
+    )
+
+    resp = await client.get(
+        f"{settings.API_V1_STR}/decks/{deck_id}/simulate",
+        params={"min_lands": 5, "max_lands": 2},
+    )
+    assert resp.status_code == 400
+
+
+def test_shuffles_are_chunked_into_full_prefixes(monkeypatch) -> None:
+    import numpy as np
+    from app.services import simulation
+
+    monkeypatch.setattr(simulation, "SHUFFLE_CHUNK", 3)
+    prefixes = simulation._shuffled_prefixes(np.random.default_rng(1), 10, 60, 8)
+
+    assert prefixes.shape == (10, 8)
+    # Every game's prefix is the top of its own permutation: no repeats.
+    assert all(len(set(row)) == 8 for row in prefixes.tolist())
+    assert len({tuple(row) for row in prefixes.tolist()}) == 10
@@ -103,3 +103,185 @@ async def test_get_deck_stats(client: AsyncClient, db_session, mock_scryfall):
     odds = data["draw_odds"]
     assert "opening_hand" in odds
     assert "on_curve" in odds
+
+
+@pytest.mark.asyncio
+async def test_get_deck_draw_odds_multivariate(client: AsyncClient, db_session, mock_scryfall):
+    app.dependency_overrides[get_scryfall_service] = lambda: mock_scryfall
+
+    user = User(id=103, email="test_odds@example.com", google_sub="subodds")
+    db_session.add(user)
+    db_session.add_all(
+        [
+            Card(id="island", name="Island", type_line="Basic Land — Island", produced_mana=["U"]),
+            Card(id="mountain", name="Mountain", type_line="Basic Land — Mountain", produced_mana=["R"]),
+            Card(id="bolt", name="Bolt", type_line="Instant", mana_cost="{R}", produced_mana=[]),
+        ]
+    )
+    await db_session.commit()
+
+    resp = await client.post(
+        "/api/v1/decks/",
+        json={
+            "title": "Odds Deck",
+            "user_id": 103,
+            "cards": [
+                {"card_id": "island", "quantity": 10, "board": "main"},
+                {"card_id": "mountain", "quantity": 7, "board": "main"},
+                {"card_id": "bolt", "quantity": 43, "board": "main"},
+            ],
+        },
+    )
+    deck_id = resp.json()["id"]
+
+    stats = (await client.get(f"/api/v1/decks/{deck_id}/stats")).json()
+    odds_resp = await client.post(
+        f"/api/v1/decks/{deck_id}/odds",
+        json={
+            "turn": 3,
+            "on_the_play": True,
+            "requirements": [{"color": "u", "at_least": 2}, {"at_least": 3}],
+        },
+    )
+    bad_color = await client.post(
+        f"/api/v1/decks/{deck_id}/odds",
+        json={"turn": 3, "requirements": [{"color": "blue", "at_least": 1}]},
+    )
+    app.dependency_overrides.clear()
+
+    assert bad_color.status_code == 422
+
+    assert len(stats["draw_odds"]["grid"]["on_the_play"]) == 15
+    assert odds_resp.status_code == 200
+    odds = odds_resp.json()
+    assert odds["cards_seen"] == 9
+    # Same scenario as tests/test_probability.py's hand-computed check.
+    assert odds["probability"] == pytest.approx(0.3693, abs=1e-4)
+
+
+@pytest.mark.asyncio
+async def test_deck_stats_snapshot_tracks_updates(client: AsyncClient, db_session, mock_scryfall):
+    from sqlalchemy import delete
+    from app.models.deck import DeckStats
+
+    app.dependency_overrides[get_scryfall_service] = lambda: mock_scryfall
+
+    user = User(id=104, email="test_snapshot@example.com", google_sub="subsnap")
+    db_session.add(user)
+    db_session.add_all(
+        [
+            Card(id="plains-1", name="Plains", type_line="Basic Land — Plains", produced_mana=["W"], mana_cost=""),
+            Card(id="creature-w-1", name="White Weenie", type_line="Creature", mana_cost="{W}", produced_mana=[]),
+            Card(id="counterspell", name="Counterspell", type_line="Instant", mana_cost="{U}{U}", produced_mana=[]),
+        ]
+    )
+    await db_session.commit()
+
+    resp = await client.post(
+        "/api/v1/decks/",
+        json={
+            "title": "Snapshot Deck",
+            "user_id": 104,
+            "cards": [
+                {"card_id": "plains-1", "quantity": 10, "board": "main"},
+                {"card_id": "creature-w-1", "quantity": 4, "board": "main"},
+            ],
+        },
+    )
+    deck_id = resp.json()["id"]
+
+    first = (await client.get(f"/api/v1/decks/{deck_id}/stats")).json()
+    assert first["version"] == 0
+    assert first["color_stats"]["W"]["recommended_sources"] == 14
+
+    # Drop the white one-drops entirely, add counterspells.
+    await client.put(
+        f"/api/v1/decks/{deck_id}",
+        json={
+            "cards": [
+                {"card_id": "plains-1", "quantity": 12, "board": "main"},
+                {"card_id": "counterspell", "quantity": 3, "board": "main"},
+            ]
+        },
+    )
+    updated = (await client.get(f"/api/v1/decks/{deck_id}/stats")).json()
+
+    assert updated["version"] == 1
+    assert updated["total_cards"] == 15
+    assert updated["mana_curve"]["1"] == 0
+    assert updated["mana_curve"]["2"] == 3
+    assert updated["color_stats"]["W"]["pips"] == 0
+    # The removed card's Karsten requirement goes away with it.
+    assert updated["color_stats"]["W"]["recommended_sources"] == 0
+    assert updated["color_stats"]["W"]["sources"] == 12
+    assert updated["color_stats"]["U"]["pips"] == 6
+
+    # A deck with no snapshot (pre-DeckStats) gets one rebuilt on read, with
+    # the same numbers the delta path produced.
+    await db_session.execute(delete(DeckStats).where(DeckStats.deck_id == deck_id))
+    await db_session.commit()
+    rebuilt = (await client.get(f"/api/v1/decks/{deck_id}/stats")).json()
+    app.dependency_overrides.clear()
+
+    assert {k: v for k, v in rebuilt.items() if k != "version"} == {
+        k: v for k, v in updated.items() if k != "version"
+    }
+
+
+@pytest.mark.asyncio
+async def test_deck_stats_rebuild_when_cards_change_underneath(
+    client: AsyncClient, db_session, mock_scryfall
+):
+    app.dependency_overrides[get_scryfall_service] = lambda: mock_scryfall
+
+    user = User(id=105, email="test_rehash@example.com", google_sub="subrehash")
+    db_session.add(user)
+    db_session.add(
+        Card(id="plains-2", name="Plains", type_line="Basic Land — Plains", produced_mana=["W"], content_hash="p1")
+    )
+    await db_session.commit()
+
+    # "late" has no Card row yet: counted toward the deck size only.
+    resp = await client.post(
+        "/api/v1/decks/",
+        json={
+            "title": "Rehash Deck",
+            "user_id": 105,
+            "cards": [
+                {"card_id": "plains-2", "quantity": 10, "board": "main"},
+                {"card_id": "late", "quantity": 4, "board": "main"},
+            ],
+        },
+    )
+    deck_id = resp.json()["id"]
+    before_sync = (await client.get(f"/api/v1/decks/{deck_id}/stats")).json()
+    assert before_sync["total_cards"] == 14
+    assert before_sync["mana_curve"]["2"] == 0
+
+    # Synced later, then re-hashed by ingestion as something else entirely.
+    late = Card(id="late", name="Late", type_line="Creature", mana_cost="{1}{W}", content_hash="l1")
+    db_session.add(late)
+    await db_session.commit()
+    synced = (await client.get(f"/api/v1/decks/{deck_id}/stats")).json()
+    assert synced["mana_curve"]["2"] == 4
+
+    late.type_line = "Land"
+    late.mana_cost = ""
+    late.produced_mana = ["W"]
+    late.content_hash = "l2"
+    db_session.add(late)
+    await db_session.commit()
+
+    # Removing it subtracts what it is now, not what was counted: rebuilt
+    # instead of drifting negative.
+    await client.put(
+        f"/api/v1/decks/{deck_id}",
+        json={"cards": [{"card_id": "plains-2", "quantity": 10, "board": "main"}]},
+    )
+    after = (await client.get(f"/api/v1/decks/{deck_id}/stats")).json()
+    app.dependency_overrides.clear()
+
+    assert after["total_cards"] == 10
+    assert after["mana_curve"]["2"] == 0
+    assert after["average_cmc"] == 0
+    assert after["color_stats"]["W"]["sources"] == 10
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
 import pytest_asyncio
@@ -8,6 +9,9 @@ from sqlmodel import SQLModel
 
 from app.core.db import get_db
 from app.main import app
+from app.services.card_catalog import card_catalog
+from app.services.card_index import card_name_index
+from app.services.goldfish_storage import node_state_cache
 
 # In-memory SQLite, fresh per test: avoids cross-test data leakage that a
 # shared file-based db + session-scoped create/drop can't prevent, since app
@@ -25,6 +29,12 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
     )
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+    # In-process snapshots of the card table (and cached goldfish states)
+    # must not outlive the DB they were built from (tests that don't use
+    # `client` skip the lifespan reset).
+    card_name_index.reset()
+    card_catalog.reset()
+    node_state_cache.clear()
 
     session_local = async_sessionmaker(
         autocommit=False,
@@ -34,7 +44,15 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
         expire_on_commit=False,
     )
     async with session_local() as session:
+        # Snapshot builds normally open their own SessionLocal session; here
+        # they borrow the test's, which sees the same in-memory DB.
+        @asynccontextmanager
+        async def _borrowed():
+            yield session
+
+        card_name_index.session_factory = card_catalog.session_factory = _borrowed
         yield session
+        del card_name_index.session_factory, card_catalog.session_factory
 
     await engine.dispose()
 
@@ -50,6 +68,10 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     # shared Scryfall httpx client set up in app/main.py) is populated the
     # same way it is for a real request.
     async with app.router.lifespan_context(app):
+        # Tests seed their cards after startup, so drop the snapshots the
+        # lifespan built over the empty DB; first use rebuilds them.
+        card_name_index.reset()
+        card_catalog.reset()
         async with AsyncClient(
             transport=ASGITransport(app=app), base_url="http://test"
         ) as ac:
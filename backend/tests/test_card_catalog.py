@@ -0,0 +1,107 @@
+import numpy as np
+
+from app.core.legality import FORMAT_BITS, legality_masks
+from app.services.card_catalog import CardCatalog
+from app.services.card_query import parse
+
+
+def _row(id, name, type_line, mv, colors, produced=(), legalities=None, identity=None):
+    legalities = legalities or {"commander": "legal"}
+    return {
+        "id": id,
+        "name": name,
+        "type_line": type_line,
+        "oracle_text": None,
+        "mana_value": mv,
+        "colors": list(colors),
+        "color_identity": list(identity if identity is not None else colors),
+        "produced_mana": list(produced),
+        "legalities": legalities,
+        **legality_masks(legalities),
+    }
+
+
+def _catalog():
+    catalog = CardCatalog()
+    catalog.load(
+        [
+            _row("elves-2", "Llanowar Elves", "Creature — Elf Druid", 1.0, "G", "G"),
+            _row("elves-1", "Llanowar Elves", "Creature — Elf Druid", 1.0, "G", "G"),
+            _row("bears", "Grizzly Bears", "Creature — Bear", 2.0, "G"),
+            _row("ramp", "Rampant Growth", "Sorcery", 2.0, "G"),
+            _row("lotus", "Lotus Cobra", "Creature — Snake", 2.0, "G", "WUBRG",
+                 {"commander": "legal", "modern": "banned"}),
+            _row("ancient", "Ancient Tomb", "Land", 0.0, "", "C"),
+            _row("wall", "Axebane Guardian", "Creature — Human Druid", 3.0, "G", "WUBRG"),
+        ]
+    )
+    return catalog
+
+
+def _names(catalog, query):
+    return [catalog.names[catalog.row_of(i)] for i in catalog.search(parse(query))[0]]
+
+
+def test_one_row_per_name_with_reprints_mapped():
+    catalog = _catalog()
+    assert len(catalog) == 6
+    assert catalog.search(parse("llanowar")) == (["elves-1"], 1)
+    assert catalog.row_of("elves-2") == catalog.row_of("elves-1")
+
+
+def test_commander_legal_green_mana_creatures_with_low_mv():
+    catalog = _catalog()
+    mask = catalog.mask(parse("f:commander c:g t:creature mv<=2")) & (catalog.produces != 0)
+    assert [catalog.names[i] for i in np.flatnonzero(mask)] == [
+        "Llanowar Elves",
+        "Lotus Cobra",
+    ]
+
+
+def test_columns_are_vectorized():
+    catalog = _catalog()
+    assert catalog.mana_value.dtype == np.float32
+    assert catalog.banned[catalog.row_of("lotus")] & FORMAT_BITS["modern"]
+    assert catalog.legal[catalog.row_of("bears")] & FORMAT_BITS["commander"]
+    assert _names(catalog, "banned:modern") == ["Lotus Cobra"]
+    assert _names(catalog, "c:c") == ["Ancient Tomb"]
+    assert _names(catalog, "-t:creature") == ["Ancient Tomb", "Rampant Growth"]
+
+
+def test_patches_small_upserts_in_place():
+    catalog = _catalog()
+    catalog.note_upserted(
+        [
+            _row("birds", "Birds of Paradise", "Creature — Bird", 1.0, "G", "WUBRG"),
+            _row("bears", "Grizzly Bears", "Creature — Bear", 2.0, "G",
+                 legalities={"commander": "banned"}),
+        ]
+    )
+    assert _names(catalog, "t:creature mv<=1") == ["Birds of Paradise", "Llanowar Elves"]
+    assert _names(catalog, "banned:commander") == ["Grizzly Bears"]
+
+
+def test_any_printing_updates_the_names_columns():
+    catalog = _catalog()
+    # elves-2 isn't the name's representative (elves-1 is), but legality is
+    # name-level data: its sync still updates the row.
+    catalog.note_upserted(
+        [_row("elves-2", "Llanowar Elves", "Creature — Elf Druid", 1.0, "G", "G",
+              {"commander": "banned"})]
+    )
+    assert _names(catalog, "banned:commander") == ["Llanowar Elves"]
+    assert catalog.search(parse("llanowar"))[0] == ["elves-1"]
+
+
+def test_null_mana_value_is_unknown_under_negation():
+    catalog = _catalog()
+    catalog.note_upserted([_row("token", "Germ Token", "Token Creature", None, "B")])
+    assert "Germ Token" not in _names(catalog, "-mv<=2")
+    assert "Germ Token" not in _names(catalog, "mv!=2")
+    assert "Germ Token" in _names(catalog, "-mv<=2 or t:token")
+
+
+def test_renaming_a_names_representative_rebuilds():
+    catalog = _catalog()
+    catalog.note_upserted([_row("bears", "Grizzlier Bears", "Creature — Bear", 2.0, "G")])
+    assert not catalog.built
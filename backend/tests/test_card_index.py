@@ -0,0 +1,102 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from app.services.card_index import CardNameIndex, normalize
+
+
+def _index(names, popularity=None):
+    index = CardNameIndex()
+    index.load(
+        [(f"{name.lower().replace(' ', '-')}-{i}", name) for i, name in enumerate(names)],
+        popularity or {},
+    )
+    return index
+
+
+def _names(index, query, limit=20):
+    by_id = {card_id: card_id.rsplit("-", 1)[0] for card_id in index._ids}
+    return [by_id[card_id] for card_id in index.search(query, limit)]
+
+
+def test_normalize_folds_case_accents_and_spaces():
+    assert normalize("  Lim-Dûl's   Vault ") == "lim-dul's vault"
+
+
+def test_exact_then_prefix_then_substring():
+    index = _index(["Sol Ring", "Solemn Simulacrum", "Mind Stone", "Ring of Three Wishes", "Sol"])
+    assert _names(index, "sol")[:2] == ["sol", "sol-ring"]
+    # Word-prefix and substring matches come after every name-prefix match.
+    assert _names(index, "ring") == ["ring-of-three-wishes", "sol-ring"]
+
+
+def test_popularity_orders_within_a_tier():
+    index = _index(
+        ["Lightning Greaves", "Lightning Bolt"], popularity={"Lightning Greaves": 5}
+    )
+    assert _names(index, "lightning") == ["lightning-greaves", "lightning-bolt"]
+
+
+def test_reprints_collapse_to_lowest_id():
+    index = CardNameIndex()
+    index.load([("b", "Command Tower"), ("a", "Command Tower")], {})
+    assert index.search("command") == ["a"]
+    assert len(index) == 1
+
+
+def test_typos_still_match():
+    index = _index(["Lightning Bolt", "Counterspell", "Swords to Plowshares"])
+    assert _names(index, "lightnig bolt") == ["lightning-bolt"]
+    assert _names(index, "counterspel")[0] == "counterspell"
+    assert _names(index, "sowrds to plowshares")[0] == "swords-to-plowshares"
+
+
+def test_note_upserted_patches_small_batches_and_drops_big_ones():
+    index = _index(["Sol Ring"])
+    index.note_upserted([{"id": "arcane-signet-1", "name": "Arcane Signet"}])
+    assert index.search("arcane") == ["arcane-signet-1"]
+
+    index.note_upserted([{"id": str(i), "name": f"Card {i}"} for i in range(500)])
+    assert not index.built
+
+
+def test_renamed_cards_leave_their_old_name():
+    index = CardNameIndex()
+    index.load([("a", "Jace, the Mind Sculptor"), ("b", "Jace, the Mind Sculptor"), ("c", "Opt")], {})
+
+    # The only printing of a name renamed: the old name goes entirely.
+    index.note_upserted([{"id": "c", "name": "Optt"}])
+    assert index.search("optt") == ["c"]
+    assert normalize("Opt") not in index._by_name
+    assert len(index) == 2
+
+    # A non-representative printing renamed: the old name keeps its entry.
+    index.note_upserted([{"id": "b", "name": "Jace, the Mind Sculptor (alt)"}])
+    assert index.search("jace, the mind sculptor")[0] == "a"
+    assert index.built
+
+    # The representative one renamed away from a name with other printings
+    # left: rebuilt rather than left pointing at the renamed card.
+    index.load([("a", "Opt"), ("b", "Opt")], {})
+    index.note_upserted([{"id": "a", "name": "Opt Prime"}])
+    assert not index.built
+
+
+def test_upserts_committed_during_a_build_are_replayed():
+    index = CardNameIndex()
+
+    @asynccontextmanager
+    async def no_session():
+        yield None
+
+    async def build(db):
+        # A deck sync commits while the build's query is still running.
+        index.note_upserted([{"id": "as-1", "name": "Arcane Signet"}])
+        index.load([("sr-1", "Sol Ring")], {})
+
+    index.session_factory = no_session
+    index.build = build
+    asyncio.run(index.refresh())
+
+    assert index.built and index.in_use
+    assert index.search("signet") == ["as-1"]
+    assert index.search("sol ring") == ["sr-1"]
@@ -0,0 +1,58 @@
+import pytest
+
+from app.services.card_query import (
+    MULTICOLOR,
+    And,
+    Not,
+    Or,
+    QuerySyntaxError,
+    Term,
+    UnsupportedQuery,
+    parse,
+)
+
+
+def test_bare_words_are_anded_name_terms():
+    assert parse('lightning "bolt of"') == And(
+        (Term("name", ":", "lightning"), Term("name", ":", "bolt of"))
+    )
+
+
+def test_operators_and_defaults():
+    assert parse("t:creature") == Term("type", ":", "creature")
+    assert parse("c:rg") == Term("color", ">=", frozenset("RG"))
+    assert parse("c:c") == Term("color", "=", frozenset())
+    assert parse("id:esper") == Term("identity", "<=", frozenset("WUB"))
+    assert parse("c:m") == Term("color", ">=", MULTICOLOR)
+    assert parse("produces:c") == Term("produces", ">=", frozenset("C"))
+    assert parse("mv>=3") == Term("mv", ">=", 3.0)
+    assert parse("cmc:2") == Term("mv", "=", 2.0)
+    assert parse("f:Commander") == Term("format", ":", "commander")
+    assert parse('!"Sol Ring"') == Term("exact", ":", "Sol Ring")
+
+
+def test_boolean_structure():
+    node = parse("t:instant (o:draw or o:scry) -c:u")
+    assert node == And(
+        (
+            Term("type", ":", "instant"),
+            Or((Term("oracle", ":", "draw"), Term("oracle", ":", "scry"))),
+            Not(Term("color", ">=", frozenset("U"))),
+        )
+    )
+    # `or` binds looser than the implicit AND.
+    assert parse("a b or c") == Or(
+        (And((Term("name", ":", "a"), Term("name", ":", "b"))), Term("name", ":", "c"))
+    )
+
+
+@pytest.mark.parametrize("query", ["is:commander", "mv:even", "c:purple", "usd<1"])
+def test_unsupported_syntax(query):
+    with pytest.raises(UnsupportedQuery):
+        parse(query)
+
+
+@pytest.mark.parametrize("query", ["", "(t:land", "t:land)", "t:land or", "-(t:land"])
+def test_malformed(query):
+    with pytest.raises(QuerySyntaxError):
+        parse(query)
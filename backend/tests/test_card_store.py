@@ -0,0 +1,35 @@
+import json
+
+from app.services.card_store import card_row, content_hash, copy_records
+
+
+def test_copy_records_serializes_json_columns_in_column_order():
+    row = card_row(
+        {
+            "id": "opt",
+            "name": "Opt",
+            "mana_cost": "{U}",
+            "colors": ["U"],
+            "legalities": {"modern": "legal"},
+        }
+    )
+    columns = list(row)
+
+    (record,) = copy_records([row], columns)
+
+    by_column = dict(zip(columns, record))
+    assert by_column["id"] == "opt"
+    assert by_column["mana_cost"] == "{U}"
+    assert json.loads(by_column["colors"]) == ["U"]
+    assert json.loads(by_column["legalities"]) == {"modern": "legal"}
+    # NULL stays NULL rather than becoming the JSON text "null".
+    assert by_column["image_uris"] is None
+
+
+def test_content_hash_ignores_key_order_and_tracks_content():
+    row = card_row({"id": "opt", "name": "Opt", "legalities": {"a": "legal", "b": "banned"}})
+    reordered = dict(reversed(list(row.items())))
+    reordered["legalities"] = {"b": "banned", "a": "legal"}
+
+    assert content_hash(reordered) == row["content_hash"]
+    assert content_hash({**row, "oracle_text": "Scry 1."}) != row["content_hash"]
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.deck_summary import (
+    InvalidCursor,
+    cover_image,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+def test_cursor_round_trip():
+    updated_at = datetime(2026, 10, 17, 12, 30, 5, 123456)
+    assert decode_cursor(encode_cursor(updated_at, 42)) == (updated_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "MjAyNnw"])
+def test_bad_cursor(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+
+def test_cover_image_prefers_art_then_front_face():
+    assert cover_image({"normal": "n", "art_crop": "a"}, None) == "a"
+    assert cover_image(None, [{"image_uris": {"normal": "front"}}, {}]) == "front"
+    assert cover_image(None, None) is None
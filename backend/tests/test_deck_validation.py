@@ -0,0 +1,86 @@
+from app.core.legality import legality_masks
+from app.services.deck_validation import DeckCardRow, rules_for, validate_deck
+
+
+def _row(card_id, quantity=1, board="main", name=None, type_line="Creature",
+         oracle_text=None, identity=(), legalities=None):
+    return DeckCardRow(
+        card_id=card_id,
+        board=board,
+        quantity=quantity,
+        name=name or card_id,
+        type_line=type_line,
+        oracle_text=oracle_text,
+        color_identity=list(identity),
+        **legality_masks(
+            {"commander": "legal", "modern": "legal", "vintage": "legal"}
+            if legalities is None
+            else legalities
+        ),
+    )
+
+
+def _codes(violations):
+    return sorted(v.code for v in violations)
+
+
+def test_rules_for_format_names():
+    assert rules_for("Commander").max_copies == 1
+    assert rules_for("Modern").size == 60
+    assert rules_for("Draft").max_copies is None
+    assert rules_for("Homebrew") is None
+    assert rules_for("Brawl").size == 100
+    assert rules_for("Standard Brawl").size == 60
+
+
+def test_legal_sixty_card_deck():
+    rows = [_row(f"card-{i}", 4) for i in range(15)]
+    assert validate_deck("Modern", rows) == []
+
+
+def test_copy_limits_count_across_printings_and_skip_basics():
+    rows = [_row(f"card-{i}", 4) for i in range(14)]
+    rows += [
+        _row("bolt-a", 3, name="Lightning Bolt"),
+        _row("bolt-b", 2, name="Lightning Bolt", board="side"),
+        _row("mountain", 20, name="Mountain", type_line="Basic Land — Mountain"),
+    ]
+    violations = validate_deck("Modern", rows)
+    assert _codes(violations) == ["copies"]
+    assert violations[0].card_ids == ["bolt-a", "bolt-b"]
+
+
+def test_legality_and_restricted():
+    rows = [_row(f"card-{i}", 4) for i in range(15)]
+    rows += [
+        _row("ban", 1, legalities={"modern": "banned", "vintage": "legal"}),
+        _row("lotus", 2, legalities={"vintage": "restricted"}),
+        _row("unsynced", 1, legalities={}),
+    ]
+    modern = validate_deck("Modern", rows)
+    assert [(v.code, v.card_ids) for v in modern] == [
+        ("legality", ["ban"]),
+        ("legality", ["lotus"]),
+    ]
+    assert "banned" in modern[0].message and "not legal" in modern[1].message
+    vintage = validate_deck("Vintage", rows)
+    assert [(v.code, v.card_ids) for v in vintage] == [("legality", ["lotus"])]
+    assert "restricted" in vintage[0].message
+
+
+def test_commander_singleton_identity_and_size():
+    rows = [
+        _row("krenko", board="commander", identity="R"),
+        _row("goblin", 2, identity="R"),
+        _row("elf", identity="G"),
+        _row("forest", 30, type_line="Basic Land — Forest"),
+    ]
+    violations = validate_deck("EDH", rows)
+    assert _codes(violations) == ["color_identity", "copies", "size"]
+    identity = next(v for v in violations if v.code == "color_identity")
+    assert identity.card_ids == ["elf"]
+
+
+def test_missing_commander_and_unknown_format():
+    assert _codes(validate_deck("Commander", [_row("x", 100)])) == ["commander", "copies"]
+    assert _codes(validate_deck(None, [])) == ["format"]
@@ -0,0 +1,73 @@
+import pytest
+from pydantic import ValidationError
+
+from app.models.goldfish import GameState, GoldfishActionIn, Zones
+from app.services.goldfish import apply_action, draw_cards, draw_opening_hand
+
+
+def _state(**kwargs) -> GameState:
+    return GameState(
+        library=[f"c{i}" for i in range(10)],
+        opponent_zones=Zones(library=[f"o{i}" for i in range(10)]),
+        **kwargs,
+    )
+
+
+def test_stored_lists_parse_into_frozen_tuples():
+    state = GameState(**{"library": ["a", "b"], "hand": ["c"]})
+    assert state.library == ("a", "b")
+    with pytest.raises(ValidationError):
+        state.life_total = 3
+    assert state.model_dump(mode="json")["library"] == ["a", "b"]
+
+
+def test_draw_cards_shares_untouched_zones():
+    state = _state(battlefield=["land"])
+    drawn_state, drawn = draw_cards(state, 3)
+    assert drawn == ("c0", "c1", "c2")
+    assert drawn_state.hand == drawn
+    assert drawn_state.library == state.library[3:]
+    assert isinstance(drawn_state, GameState)
+    assert drawn_state.battlefield is state.battlefield
+    assert drawn_state.opponent_zones is state.opponent_zones
+    # The original is untouched.
+    assert len(state.library) == 10 and state.hand == ()
+
+
+def test_opening_hand_draws_each_side_once():
+    state, label = draw_opening_hand(_state(), count=7)
+    assert len(state.hand) == 7 and len(state.opponent_zones.hand) == 7
+    assert label == "Drew opening hands (7 cards each)"
+
+
+def test_actions_rebuild_only_the_target_side():
+    state, _ = draw_opening_hand(_state(), count=2)
+    cast = GoldfishActionIn(type="cast", card_id="c1")
+    next_state, label = apply_action(state, cast, {"c1": "Bolt"})
+    assert label == "Cast Bolt"
+    assert next_state.hand == ("c0",) and next_state.battlefield == ("c1",)
+    assert next_state.library is state.library
+    assert next_state.opponent_zones is state.opponent_zones
+    assert state.hand == ("c0", "c1")
+
+    move = GoldfishActionIn(
+        type="move_zone", card_id="o0", from_zone="hand", to_zone="graveyard",
+        target="opponent",
+    )
+    next_state, _ = apply_action(state, move, {})
+    assert next_state.opponent_zones.graveyard == ("o0",)
+    assert next_state.opponent_zones.library is state.opponent_zones.library
+    assert next_state.hand is state.hand
+
+
+def test_move_within_a_zone_moves_card_to_the_end():
+    state = GameState(battlefield=["a", "b", "c"])
+    move = GoldfishActionIn(type="move_zone", card_id="a", from_zone="battlefield", to_zone="battlefield")
+    next_state, _ = apply_action(state, move, {})
+    assert next_state.battlefield == ("b", "c", "a")
+
+
+def test_unknown_zone_is_rejected():
+    move = GoldfishActionIn(type="move_zone", card_id="a", from_zone="battlefield", to_zone="sideboard")
+    with pytest.raises(ValueError, match="Unknown zone"):
+        apply_action(GameState(battlefield=["a"]), move, {})
@@ -0,0 +1,114 @@
+import random
+
+import pytest
+
+from app.models.goldfish import GameState, GoldfishActionIn, GoldfishNode, Zones
+from app.services.goldfish import apply_action, draw_opening_hand
+from app.services.goldfish_storage import (
+    CardCodec,
+    apply_delta,
+    card_dictionary,
+    diff_states,
+    encode_state,
+    node_state_cache,
+    session_states,
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    node_state_cache.clear()
+    yield
+    node_state_cache.clear()
+
+
+def _json(state: GameState) -> dict:
+    return state.model_dump(mode="json")
+
+
+def test_draw_delta_is_a_splice_not_a_copy():
+    before = GameState(library=[f"c{i}" for i in range(60)], hand=["x"])
+    after = before.replace(library=before.library[1:], hand=before.hand + ("c0",))
+    delta = diff_states(_json(before), _json(after))
+    assert delta == {"self": {"library": [0, 59], "hand": [1, 0, "c0"]}}
+    assert apply_delta(_json(before), delta) == _json(after)
+
+
+def test_random_zone_changes_round_trip():
+    rng = random.Random(7)
+    for _ in range(200):
+        old = [rng.choice("abc") for _ in range(rng.randrange(8))]
+        new = [rng.choice("abc") for _ in range(rng.randrange(8))]
+        parent = _json(GameState(hand=old, opponent_zones=Zones(exile=new)))
+        child = _json(GameState(hand=new, opponent_zones=Zones(exile=old), life_total=3))
+        assert apply_delta(parent, diff_states(parent, child)) == child
+
+
+def test_keyframe_cadence(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "GOLDFISH_KEYFRAME_INTERVAL", 4)
+    plain = CardCodec()
+    parent, child = _json(GameState(hand=["a"])), _json(GameState())
+    assert encode_state(4, parent, child, plain) == (child, None)
+    assert encode_state(5, parent, child, plain) == (None, {"self": {"hand": [0, 0]}})
+    assert encode_state(5, None, child, plain) == (child, None)
+    # Opponent zones appearing can't be a delta.
+    with_opponent = _json(GameState(opponent_zones=Zones()))
+    assert encode_state(5, parent, with_opponent, plain) == (with_opponent, None)
+    monkeypatch.setattr(settings, "GOLDFISH_KEYFRAME_INTERVAL", 1)
+    assert encode_state(5, parent, child, plain) == (child, None)
+
+
+def test_session_states_replays_from_nearest_keyframe(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "GOLDFISH_KEYFRAME_INTERVAL", 8)
+    state, _ = draw_opening_hand(GameState(library=[f"c{i}" for i in range(20)]))
+    codec = CardCodec(card_dictionary(state))
+    nodes, expected, parent = [], {}, None
+    for depth in range(12):
+        if depth:
+            state, _ = apply_action(state, GoldfishActionIn(type="draw"), {})
+        stored, delta = encode_state(depth, parent, _json(state), codec)
+        nodes.append(
+            GoldfishNode(
+                id=depth + 1, session_id=1, parent_id=depth or None, label="n",
+                state=stored, delta=delta, depth=depth,
+            )
+        )
+        expected[depth + 1] = parent = _json(state)
+    assert [n.state is not None for n in nodes].count(True) == 2  # depths 0 and 8
+    assert isinstance(nodes[0].state["library"], str)
+    random.shuffle(nodes)
+    assert session_states(nodes, codec) == expected
+
+
+def test_codec_packs_zones_against_the_dictionary():
+    ids = [f"{i:08d}-0000-0000-0000-000000000000" for i in range(300)]
+    state = GameState(
+        library=ids[:250], hand=ids[250:], opponent_zones=Zones(exile=ids[:3])
+    )
+    codec = CardCodec(card_dictionary(state))
+    plain = _json(state)
+    packed = codec.pack_state(plain)
+    assert isinstance(packed["library"], str) and packed["life_total"] == 20
+    assert len(str(packed)) * 8 < len(str(plain))
+    assert codec.unpack_state(packed) == plain
+
+    delta = {"self": {"hand": [0, 1, ids[7]]}, "life_total": 3}
+    assert codec.pack_delta(delta) == {"self": {"hand": [0, 1, 7]}, "life_total": 3}
+    assert codec.unpack_delta(codec.pack_delta(delta)) == delta
+
+
+def test_codec_passes_unknown_and_legacy_values_through():
+    codec = CardCodec(["a", "b"])
+    state = _json(GameState(hand=["a", "zzz"], library=["b"]))
+    packed = codec.pack_state(state)
+    assert packed["hand"] == ["a", "zzz"] and isinstance(packed["library"], str)
+    assert codec.unpack_state(packed) == state
+    # A session without a dictionary stores and reads card ids as-is.
+    assert CardCodec(None).pack_state(state) == state
+    assert codec.unpack_delta({"self": {"hand": [0, 0, "a", 1]}}) == {
+        "self": {"hand": [0, 0, "a", "b"]}
+    }
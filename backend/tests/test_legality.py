@@ -0,0 +1,25 @@
+from app.core.legality import FORMAT_BITS, format_key, legality_masks, legality_status
+
+
+def test_format_key_normalizes_deck_format_names():
+    assert format_key("Commander") == "commander"
+    assert format_key("EDH") == "commander"
+    assert format_key("Pauper EDH") == "paupercommander"
+    assert format_key("Old School") == "oldschool"
+    assert format_key("Limited") is None
+    assert format_key(None) is None
+
+
+def test_masks_round_trip_statuses():
+    legalities = {
+        "vintage": "restricted",
+        "legacy": "banned",
+        "commander": "legal",
+        "standard": "not_legal",
+        "someday": "legal",  # not a known format: ignored
+    }
+    masks = legality_masks(legalities)
+    assert masks["legal_mask"] == FORMAT_BITS["vintage"] | FORMAT_BITS["commander"]
+    for fmt, status in legalities.items():
+        if fmt in FORMAT_BITS:
+            assert legality_status(fmt, **masks) == status
@@ -0,0 +1,34 @@
+from app.core.mana import parse_mana_cost
+
+
+def test_plain_cost():
+    cost = parse_mana_cost("{3}{R}{R}")
+
+    assert cost.generic == 3
+    assert cost.pips == {"R": 2}
+    assert cost.mana_value == 5
+
+
+def test_hybrid_phyrexian_and_x_symbols():
+    cost = parse_mana_cost("{X}{2/W}{G/U}{B/P}{C}")
+
+    assert cost.x_count == 1
+    assert cost.hybrid == ("2/W", "G/U")
+    assert cost.phyrexian == ("B/P",)
+    # Hybrid/Phyrexian symbols don't count as plain colored pips.
+    assert cost.pips == {"C": 1}
+    # X is 0, {2/W} is 2, every other symbol is 1.
+    assert cost.mana_value == 5
+
+
+def test_empty_and_missing_costs():
+    assert parse_mana_cost("").mana_value == 0
+    assert parse_mana_cost(None).pips == {}
+
+
+def test_split_card_costs_are_summed():
+    assert parse_mana_cost("{1}{R} // {3}{U}").mana_value == 6
+
+
+def test_same_cost_string_is_parsed_once():
+    assert parse_mana_cost("{1}{U}{U}") is parse_mana_cost("{1}{U}{U}")
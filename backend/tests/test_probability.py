@@ -0,0 +1,58 @@
+import math
+
+import pytest
+from app.services.probability import (
+    hypergeometric_at_least,
+    land_odds_grid,
+    multivariate_at_least,
+)
+
+
+def _scalar_at_least(N, K, n, k):
+    return sum(
+        math.comb(K, i) * math.comb(N - K, n - i) for i in range(k, min(n, K) + 1)
+    ) / math.comb(N, n)
+
+
+def test_at_least_matrix_matches_scalar_hypergeometric():
+    matrix = hypergeometric_at_least(99, 37, [7, 9, 10, 15], 8)
+
+    for row, n in enumerate([7, 9, 10, 15]):
+        for k in range(9):
+            assert matrix[row, k] == pytest.approx(_scalar_at_least(99, 37, n, k))
+
+
+def test_land_odds_grid_covers_every_turn_on_play_and_draw():
+    grid = land_odds_grid(60, 24)
+
+    assert len(grid["on_the_play"]) == 15
+    assert len(grid["on_the_draw"]) == 15
+    # Turn 1 on the play is the bare opening hand; on the draw it's 8 cards.
+    assert grid["on_the_play"][0][2] == pytest.approx(_scalar_at_least(60, 24, 7, 2), abs=1e-4)
+    assert grid["on_the_draw"][0][2] == pytest.approx(_scalar_at_least(60, 24, 8, 2), abs=1e-4)
+    assert all(row[0] == 1.0 for row in grid["on_the_play"])
+
+
+def test_multivariate_two_blue_sources_and_three_lands():
+    # 10 blue lands + 7 other lands in 60; 9 cards seen (turn 3 on the play).
+    p = multivariate_at_least(60, [10, 7], 9, [([0], 2), ([0, 1], 3)])
+
+    expected = 0
+    for blue in range(11):
+        for other in range(8):
+            rest = 9 - blue - other
+            if rest < 0 or blue < 2 or blue + other < 3:
+                continue
+            expected += math.comb(10, blue) * math.comb(7, other) * math.comb(43, rest)
+    assert p == pytest.approx(expected / math.comb(60, 9))
+
+
+def test_multivariate_rejects_categories_exceeding_population():
+    with pytest.raises(ValueError):
+        multivariate_at_least(10, [8, 8], 5, [([0], 1)])
+
+
+def test_multivariate_joint_outcome_cap_does_not_overflow():
+    # 2**70 joint outcomes: a fixed-width product would wrap past the cap.
+    with pytest.raises(ValueError, match="Too many categories"):
+        multivariate_at_least(80, [1] * 70, 7, [([0], 1)])
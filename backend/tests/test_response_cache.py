@@ -0,0 +1,104 @@
+import asyncio
+
+from app.services.cache import NO_EXPIRY, ResponseCache, SQLiteCache
+
+
+def _cache(tmp_path=None, max_entries=10, search_ttl=60.0, disk_max_entries=100):
+    disk = SQLiteCache(str(tmp_path / "cache.db"), disk_max_entries) if tmp_path else None
+    return ResponseCache(
+        ttls={"card": NO_EXPIRY, "search": search_ttl},
+        max_entries=max_entries,
+        disk=disk,
+    )
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = _cache(max_entries=2)
+
+    async def run():
+        await cache.set("card", "a", {"id": "a"})
+        await cache.set("card", "b", {"id": "b"})
+        await cache.get("card", "a")  # "b" is now least recently used
+        await cache.set("card", "c", {"id": "c"})
+        return [(await cache.get("card", k))[0] for k in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [True, False, True]
+    stats = cache.snapshot()["namespaces"]["card"]
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_expired_entries_are_misses():
+    cache = _cache(search_ttl=-1.0)
+
+    async def run():
+        await cache.set("search", "q=bolt", {"data": []})
+        await cache.set("card", "a", {"id": "a"})
+        return (await cache.get("search", "q=bolt"))[0], (await cache.get("card", "a"))[0]
+
+    assert asyncio.run(run()) == (False, True)
+
+
+def test_disk_tier_survives_a_new_process_cache(tmp_path):
+    asyncio.run(_cache(tmp_path).set("card", "a", {"id": "a", "name": "Opt"}))
+
+    # A fresh ResponseCache (e.g. another worker, or after a restart) starts
+    # with an empty memory tier but finds the entry on disk.
+    restarted = _cache(tmp_path)
+    found, value = asyncio.run(restarted.get("card", "a"))
+
+    assert found and value == {"id": "a", "name": "Opt"}
+    assert restarted.snapshot()["namespaces"]["card"]["disk_hits"] == 1
+    assert restarted.snapshot()["memory_entries"] == 1
+
+
+def test_disk_tier_is_lru_bounded(tmp_path):
+    cache = _cache(tmp_path, max_entries=1, disk_max_entries=2)
+
+    async def run():
+        await cache.set("card", "a", {"id": "a"})
+        await cache.set("card", "b", {"id": "b"})
+        await cache.get("card", "a")  # a disk hit: "b" is now least recently used
+        await cache.set("card", "c", {"id": "c"})
+        cache.memory.clear()
+        return [(await cache.get("card", k))[0] for k in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [True, False, True]
+    assert len(cache.disk) == 2
+    assert cache.snapshot()["namespaces"]["card"]["disk_evictions"] == 1
+
+
+def test_disk_tier_purges_expired_rows(tmp_path):
+    disk = SQLiteCache(str(tmp_path / "cache.db"), 100, purge_interval=0.0)
+
+    async def run():
+        await disk.set("search:old", {"data": []}, 1.0)  # long expired
+        await disk.set("card:a", {"id": "a"}, NO_EXPIRY)
+
+    asyncio.run(run())
+    # Gone without "search:old" ever being read again.
+    assert len(disk) == 1
+
+
+def test_disk_reads_batch_their_access_times(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "cache.db")
+    disk = SQLiteCache(path, 100)
+
+    def accessed_at(key):
+        with sqlite3.connect(path) as conn:
+            return conn.execute("SELECT accessed_at FROM cache WHERE key = ?", (key,)).fetchone()[0]
+
+    async def run():
+        await disk.set("card:a", {"id": "a"}, NO_EXPIRY)
+        written = accessed_at("card:a")
+        assert (await disk.get("card:a"))[0]
+        # The hit takes no write lock; the next write records it.
+        assert accessed_at("card:a") == written
+        await disk.set("card:b", {"id": "b"}, NO_EXPIRY)
+        assert accessed_at("card:a") > written
+
+    asyncio.run(run())
+    assert len(disk) == 2
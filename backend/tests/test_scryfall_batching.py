@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services import scryfall
+from app.services.scryfall import ScryfallService, TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def fast_limiter(monkeypatch):
+    monkeypatch.setattr(scryfall, "_rate_limiter", TokenBucket(rate=1000.0, burst=1000))
+
+
+def _collection_handler(calls, fail_first=0, status=429):
+    """Echoes each requested id back as a card, after `fail_first` errors."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) <= fail_first:
+            return httpx.Response(status, headers={"Retry-After": "0"})
+        identifiers = json.loads(request.content)["identifiers"]
+        return httpx.Response(
+            200,
+            json={"data": [{"id": i["id"]} for i in identifiers if "id" in i], "not_found": []},
+        )
+
+    return handler
+
+
+def _service(handler) -> ScryfallService:
+    return ScryfallService(
+        httpx.AsyncClient(base_url="http://scryfall.test", transport=httpx.MockTransport(handler))
+    )
+
+
+def test_get_cards_by_ids_chunks_to_collection_limit():
+    calls = []
+    service = _service(_collection_handler(calls))
+    ids = [f"card-{i}" for i in range(250)]
+
+    cards = asyncio.run(service.get_cards_by_ids(ids))
+
+    assert [c["id"] for c in cards] == ids
+    sizes = sorted(len(json.loads(c.content)["identifiers"]) for c in calls)
+    assert sizes == [25, 75, 75, 75]
+
+
+def test_429_is_retried():
+    calls = []
+    service = _service(_collection_handler(calls, fail_first=2))
+
+    cards = asyncio.run(service.get_cards_by_ids(["a", "b"]))
+
+    assert [c["id"] for c in cards] == ["a", "b"]
+    assert len(calls) == 3
+
+
+def test_get_collection_reports_failed_chunk_as_not_found(monkeypatch):
+    monkeypatch.setattr(scryfall.settings, "SCRYFALL_MAX_RETRIES", 0)
+    calls = []
+    service = _service(_collection_handler(calls, fail_first=1, status=500))
+    identifiers = [{"id": f"card-{i}"} for i in range(80)]
+
+    result = asyncio.run(service.get_collection(identifiers))
+
+    assert len(calls) == 2
+    assert len(result["data"]) + len(result["not_found"]) == 80
+    assert {len(result["data"]), len(result["not_found"])} == {5, 75}
+
+
+def test_token_bucket_paces_beyond_burst():
+    bucket = TokenBucket(rate=100.0, burst=2)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+        return loop.time() - start
+
+    # Two tokens are banked; the remaining three wait ~10ms apiece.
+    assert asyncio.run(run()) >= 0.025
+
+
+def test_search_and_card_lookups_are_cached(monkeypatch):
+    from app.services.cache import NO_EXPIRY, ResponseCache
+
+    cache = ResponseCache(
+        ttls={"card": NO_EXPIRY, "search": 60.0, "rulings": 60.0}, max_entries=10
+    )
+    monkeypatch.setattr(scryfall, "get_response_cache", lambda: cache)
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json={"data": [{"id": "x"}]})
+
+    service = _service(handler)
+
+    async def run():
+        await service.search_cards("t:goblin")
+        await service.search_cards("t:goblin")
+        await service.search_cards("t:elf")
+        await service.get_card_by_id("x")
+        await service.get_card_by_id("x")
+
+    asyncio.run(run())
+
+    assert len(calls) == 3
+    assert cache.snapshot()["namespaces"]["search"]["hits"] == 1
+
+
+def test_concurrent_identical_lookups_share_one_request(monkeypatch):
+    from app.services.cache import NO_EXPIRY, ResponseCache
+
+    cache = ResponseCache(
+        ttls={"card": NO_EXPIRY, "search": 60.0, "rulings": 60.0}, max_entries=10
+    )
+    monkeypatch.setattr(scryfall, "get_response_cache", lambda: cache)
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.01)  # keep the first request in flight
+        return httpx.Response(200, json={"id": "hero"})
+
+    service = _service(handler)
+
+    async def run():
+        return await asyncio.gather(
+            *(service.get_card_by_id("hero") for _ in range(20)),
+            service.get_card_by_id("other"),
+        )
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert all(r == {"id": "hero"} for r in results)
+    assert len(scryfall._single_flight) == 0
+
+
+def test_single_flight_shares_failures():
+    flight = scryfall.SingleFlight()
+    started = []
+
+    async def boom():
+        started.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.do("k", boom) for _ in range(5)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+
+    assert len(started) == 1
+    assert all(isinstance(r, ValueError) for r in results)